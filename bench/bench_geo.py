@@ -0,0 +1,123 @@
+"""세계 지도 경계 단순화 벤치마크: python -m bench.bench_geo [--synthetic] [--cells 40 20] [--points 80]
+
+번들된 `geo/world.geojson` 을, 또는 --synthetic 이거나 파일이 없으면 국경이 구불구불한 격자 모양 합성 국가들을
+`.cache/bench/geo/` 에 만들어 다음을 잽니다.
+- 수준(TOLERANCES)별 첫 단순화 시간, 점 수, GeoJSON 크기
+- 캐시된 결과 다시 읽기 시간
+- 이웃 나라가 공유하던 국경 점이 단순화 뒤에도 양쪽에서 똑같이 남았는지 (틈/겹침 없음)
+"""
+
+import argparse
+import json
+import shutil
+import time
+
+import numpy as np
+
+from bench.bench_pages import ROOT
+from utils import data, geo
+
+WORK_DIR = ROOT / ".cache" / "bench" / "geo"
+
+
+def _wiggle(t, phase):
+    # 양 끝(교차점)은 고정하고 큰 굴곡 + 잔 굴곡을 얹은 국경선
+    return (0.12 * np.sin(5 * np.pi * t + phase) + 0.02 * np.sin(61 * t + 3 * phase)) * np.sin(np.pi * t)
+
+
+def synthetic_world(path, nx, ny, points, countries):
+    """nx × ny 격자 국가 (이웃과 같은 국경 점을 공유), 이름은 MBTI 국가를 돌려 씀"""
+    t = np.linspace(0.0, 1.0, points + 1)
+
+    def h(i, j):
+        return np.c_[i + t, j + _wiggle(t, i * 1.7 + j)]
+
+    def v(i, j):
+        return np.c_[i + _wiggle(t, i + j * 2.3), j + t]
+
+    scale, origin = np.array([360.0 / nx, 150.0 / ny]), np.array([-180.0, -60.0])
+    features = []
+    for i in range(nx):
+        for j in range(ny):
+            ring = np.vstack([h(i, j)[:-1], v(i + 1, j)[:-1], h(i, j + 1)[::-1][:-1], v(i, j)[::-1]])
+            features.append({"type": "Feature", "properties": {"ADMIN": countries[(i * ny + j) % len(countries)]},
+                             "geometry": {"type": "Polygon", "coordinates": [(ring * scale + origin).tolist()]}})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}), encoding="utf-8")
+    return features
+
+
+def vertex_count(geometries):
+    total = 0
+    for g in geometries:
+        if g is None:
+            continue
+        polys = [g["coordinates"]] if g["type"] == "Polygon" else g["coordinates"]
+        total += sum(len(ring) for poly in polys for ring in poly)
+    return total
+
+
+def _keys(geometry, decimals):
+    if geometry is None:
+        return set()
+    polys = [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+    return {tuple(np.round(p, decimals)) for poly in polys for ring in poly for p in ring}
+
+
+def check_shared_borders(features, simplified):
+    """원래 국경을 공유하던 모든 쌍에서, 그 국경 위에 남은 점 집합이 양쪽에서 같은지 -> 확인한 쌍 수
+
+    공유 여부는 원래 좌표 그대로 판단하고 (반올림해야만 겹치는 점은 공유 국경이 아님),
+    비교는 저장 자릿수(geo.DECIMALS)로 한다.
+    """
+    original = [_keys(f.get("geometry"), 9) for f in features]
+    after = [_keys(g, geo.DECIMALS) for g in simplified]
+    owners = {}
+    for k, keys in enumerate(original):
+        for p in keys:
+            owners.setdefault(p, []).append(k)
+    pairs = {(a, b) for ks in owners.values() for a in ks for b in ks if a < b}
+    for a, b in pairs:
+        shared = {tuple(np.round(p, geo.DECIMALS)) for p in original[a] & original[b]}
+        assert after[a] & shared == after[b] & shared, f"국경 불일치: feature {a} / {b}"
+    return len(pairs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cells", nargs=2, type=int, default=(40, 20), metavar=("NX", "NY"))
+    parser.add_argument("--points", type=int, default=80, help="합성 국경선 하나의 점 수")
+    parser.add_argument("--synthetic", action="store_true", help="번들 경계 대신 합성 격자로 측정")
+    args = parser.parse_args()
+
+    countries = data.load_dataset(ROOT / data.DEFAULT_CSV).countries
+    real = ROOT / geo.WORLD_GEOJSON
+    if real.exists() and not args.synthetic:
+        path = real
+        features = json.loads(path.read_text(encoding="utf-8"))["features"]
+        print(f"경계 파일: {path} ({len(features):,}개 feature)")
+    else:
+        path = WORK_DIR / "world.geojson"
+        features = synthetic_world(path, *args.cells, args.points, countries)
+        print(f"합성 경계: {args.cells[0]}×{args.cells[1]} 격자, 국경선당 {args.points}점")
+    cache_dir = WORK_DIR / "cache"
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    print(f"원본: {vertex_count(f.get('geometry') for f in features):,}점, "
+          f"{path.stat().st_size / 1024:,.0f} KB")
+
+    for level, tolerance in geo.TOLERANCES.items():
+        t0 = time.perf_counter()
+        out = geo.simplified_geojson(countries, level, path=path, cache_dir=cache_dir)
+        build_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        geo.simplified_geojson(countries, level, path=path, cache_dir=cache_dir)
+        cached_s = time.perf_counter() - t0
+        pairs = check_shared_borders(features, geo.simplify_features(features, tolerance))
+        size_kb = len(json.dumps(out, separators=(",", ":"))) / 1024
+        print(f"{level:<7} 허용 오차 {tolerance:<5} 단순화 {build_s:6.2f}s  캐시 {cached_s * 1000:6.1f}ms  "
+              f"{vertex_count(f['geometry'] for f in out['features']):>9,}점  {size_kb:8,.0f} KB  "
+              f"국경 일치 {pairs:,}쌍")
+
+
+if __name__ == "__main__":
+    main()
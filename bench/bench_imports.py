@@ -0,0 +1,102 @@
+"""페이지별 import 시간 프로파일: python -m bench.bench_imports [--top 15]
+
+각 페이지를 `python -X importtime` 자식 프로세스에서 AppTest 로 한 번 렌더링하고,
+streamlit/AppTest 자체를 불러온 뒤부터 페이지가 끌어온 모듈만 골라 최상위 모듈별 누적 시간을 보여 줍니다.
+(streamlit import 는 모든 페이지가 공통으로 내는 비용이라 따로 한 줄로 표시)
+
+페이지별 예산(IMPORT_BUDGET_MS)을 넘으면 종료 코드 1 — 무거운 모듈이 다시 최상단 import 로 들어오는 것을 막습니다.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+from bench.bench_pages import RUN_TIMEOUT, ROOT, prepare_workspace
+
+PAGES = (
+    "main.py",
+    "pages/00_지도.py",
+    "pages/01_상하이.py",
+    "pages/02_전세계 mbti 시각화.py",
+    "pages/03_상관관계.py",
+)
+# 첫 렌더 중 페이지가 새로 불러오는 모듈 import 시간 합 (streamlit 제외, pandas ~350ms 포함)
+# scipy.stats 가 최상단 import 로 돌아오면 pages/03 이 ~1.5초가 되어 예산을 넘는다
+IMPORT_BUDGET_MS = {
+    "main.py": 700,
+    "pages/00_지도.py": 1300,
+    "pages/01_상하이.py": 1400,
+    "pages/02_전세계 mbti 시각화.py": 700,
+    "pages/03_상관관계.py": 800,
+}
+MARKER = "#bench-imports: page start"
+
+
+def worker(workspace, page):
+    t0 = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    base_ms = (time.perf_counter() - t0) * 1e3
+
+    sys.path.insert(0, workspace)
+    at = AppTest.from_file(f"{workspace}/{page}", default_timeout=RUN_TIMEOUT)
+    print(MARKER, file=sys.stderr, flush=True)
+    t0 = time.perf_counter()
+    at.run()
+    print(f"{base_ms:.1f} {(time.perf_counter() - t0) * 1e3:.1f} {len(at.exception)}")
+
+
+def parse_importtime(stderr):
+    """`-X importtime` 출력에서 마커 이후의 최상위 모듈 -> 누적 ms"""
+    _, _, after = stderr.partition(MARKER)
+    modules = {}
+    for line in after.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if name.startswith(" ") and not name.startswith("  "):     # 들여쓰기 없는 줄 = 최상위 import
+            name = name.strip()
+            modules[name] = modules.get(name, 0.0) + int(cumulative) / 1e3
+    return modules
+
+
+def profile(workspace, page):
+    cmd = [sys.executable, "-X", "importtime", "-m", "bench.bench_imports", "--worker", str(workspace), page]
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, timeout=RUN_TIMEOUT)
+    if proc.returncode != 0 or not proc.stdout.strip():
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    base_ms, render_ms, n_exceptions = proc.stdout.split()[-3:]
+    return float(base_ms), float(render_ms), int(n_exceptions), parse_importtime(proc.stderr)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(sys.argv[2], sys.argv[3])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="+", default=list(PAGES))
+    parser.add_argument("--top", type=int, default=10, help="페이지별로 보여 줄 무거운 모듈 수")
+    args = parser.parse_args()
+
+    workspace = prepare_workspace(1)
+    over = []
+    for page in args.pages:
+        base_ms, render_ms, n_exceptions, modules = profile(workspace, page)
+        total = sum(modules.values())
+        budget = IMPORT_BUDGET_MS.get(page)
+        status = "" if budget is None else ("  예산 초과!" if total > budget else f"  (예산 {budget:,}ms)")
+        print(f"{page}: 페이지 import {total:,.0f}ms / 첫 렌더 {render_ms:,.0f}ms"
+              f" (streamlit+AppTest {base_ms:,.0f}ms 별도){status}")
+        if n_exceptions:
+            print(f"  페이지 예외 {n_exceptions}건")
+        for name, ms in sorted(modules.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {ms:8.1f}ms  {name}")
+        if budget is not None and total > budget:
+            over.append(page)
+    if over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
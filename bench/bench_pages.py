@@ -0,0 +1,284 @@
+"""페이지 재실행 지연 벤치마크: python -m bench.bench_pages [--scales 1 10 100 1000] [--save]
+
+main.py, pages/02, pages/03, pages/04 를 Streamlit AppTest 로 헤드리스 실행하며 다음을 잽니다.
+- cold_start: 프로세스 시작부터 첫 렌더 완료까지 (import + 캐시 채우기 포함)
+- first_render: 첫 `at.run()` 시간
+- warm_rerun: 입력 변경 없는 재실행
+- 위젯별 재실행: 사용자가 값을 바꿨을 때의 재실행 시간
+- peak_rss_mb: 최대 상주 메모리, figure_bytes: 렌더된 Plotly 스펙 크기 합
+- restart_first_render: 디스크 캐시(.cache/)를 남긴 채 새 프로세스로 다시 띄웠을 때의 첫 렌더
+
+데이터는 실제 파일 규모의 1×/10×/100×/1000× 로 합성하며 `.cache/bench/` 에 만들어 재사용합니다.
+페이지/배율마다 별도 프로세스에서 측정하므로 Streamlit 캐시와 import 상태가 서로 섞이지 않습니다.
+--save 로 결과를 bench/baselines/pages.json 에 기준값으로 저장하고, 이후 실행은 기준값과 비교해
+허용 범위를 넘은 항목을 회귀로 표시합니다(하나라도 있으면 종료 코드 1).
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+BENCH_DIR = ROOT / ".cache" / "bench"
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "pages.json"
+APP_FILES = ("main.py", "pages", "utils", "pois", "regions.csv", "geo")
+PAGES = ("main.py", "pages/02_전세계 mbti 시각화.py", "pages/03_상관관계.py", "pages/04_세계 지도.py")
+SCALES = (1, 10, 100, 1000)
+BASE_COUNTRIES = 158
+BASE_FITNESS_ROWS = 300
+RUN_TIMEOUT = 900           # 페이지/배율 하나당 최대 측정 시간 (초)
+
+# 회귀 판정: 기준값 대비 비율을 넘고, 절대 차이도 하한을 넘어야 회귀로 본다 (측정 잡음 완화)
+TOLERANCE = 1.5
+ABS_FLOOR = {"s": 0.05, "peak_rss_mb": 20.0, "figure_bytes": 10_000}
+
+# (이름, 위젯 종류, 라벨, 동작): 동작은 select_index 인덱스 또는 set_value 값
+# format_func 가 있는 위젯은 AppTest 가 표시 문자열로 값을 넣으므로 원래 값(set_value)으로 지정
+INTERACTIONS = {
+    "main.py": [
+        ("country", "selectbox", "국가를 선택하세요:", ("index", -1)),
+        ("mbti_type", "selectbox", "MBTI 유형을 선택하세요:", ("index", 5)),
+        ("render_mode", "selectbox", "표시 방식", ("value", "heatmap")),
+        ("outlier_mode", "radio", "이상치 처리 방식", ("value", "clip")),
+        ("client_mode", "toggle", "⚡ 브라우저에서 바로 전환 (국가/유형을 바꿔도 서버 재실행 없음)", ("value", True)),
+    ],
+    "pages/02_전세계 mbti 시각화.py": [
+        ("country", "selectbox", "국가 선택", ("index", -1)),
+        ("metric", "selectbox", "유사 국가 거리 기준", ("value", "cosine")),
+        ("n_clusters", "slider", "군집 수", ("value", 6)),
+        ("show_pca", "checkbox", "PCA 3D 보기", ("value", False)),
+        ("client_mode", "toggle", "⚡ 브라우저에서 국가 전환 (서버 재실행 없음)", ("value", True)),
+    ],
+    "pages/03_상관관계.py": [
+        ("x_column", "selectbox", "X축 속성 선택", ("index", 2)),
+        ("top_pair", "selectbox", "상관관계가 높은 속성쌍 선택", ("index", 1)),
+        ("method", "radio", "상관계수 방식", ("value", "spearman")),
+        ("scatter_mode", "radio", "산점도 표시 방식", ("value", "density")),
+    ],
+    "pages/04_세계 지도.py": [
+        ("color_mode", "radio", "색 기준", ("value", "top")),
+        ("detail_level", "selectbox", "경계 세부 수준", ("value", "medium")),
+    ],
+}
+
+
+# ------------------------------
+# 합성 데이터
+# ------------------------------
+def synthetic_mbti(path, scale, seed=0):
+    """실제 CSV 의 국가별 분포에 잡음을 섞어 158×scale 개 국가를 만든다 (결측 0.1% 포함)"""
+    from utils import data
+
+    base_values, base_countries = data.parse_csv(ROOT / data.DEFAULT_CSV)
+    rng = np.random.default_rng(seed)
+    reps = int(np.ceil(BASE_COUNTRIES * scale / len(base_countries)))
+    values = np.tile(np.nan_to_num(base_values, nan=1 / 16), (reps, 1))[:BASE_COUNTRIES * scale].astype(np.float64)
+    values *= rng.lognormal(0.0, 0.15, values.shape)
+    values /= values.sum(axis=1, keepdims=True)
+    values[rng.random(values.shape) < 0.001] = np.nan
+    countries = [name if k == 0 else f"{name} #{k}"
+                 for k in range(reps) for name in base_countries][:len(values)]
+    lines = [",".join(["Country", *data.MBTI_TYPES])]
+    for name, row in zip(countries, values):
+        lines.append(",".join([f'"{name}"' if "," in name else name,
+                               *("" if np.isnan(v) else f"{v:.4f}" for v in row)]))
+    Path(path).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def synthetic_fitness(path, scale, seed=0):
+    """이름/나이/체중/BMI/걸음 수/심박 (서로 상관된 수치형 5열) 300×scale 행 XLSX"""
+    from openpyxl import Workbook
+
+    rng = np.random.default_rng(seed)
+    n = BASE_FITNESS_ROWS * scale
+    age = rng.integers(18, 70, n)
+    weight = rng.normal(70, 12, n)
+    bmi = weight / rng.normal(1.72, 0.08, n) ** 2
+    steps = np.clip(rng.normal(9000, 2500, n) - (age - 40) * 60, 500, None)
+    hr = 75 - steps / 1000 + rng.normal(0, 4, n)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("data")
+    ws.append(["name", "age", "weight", "bmi", "steps", "hr"])
+    for row in zip((f"p{i}" for i in range(n)), age.tolist(), weight.tolist(),
+                   bmi.tolist(), steps.tolist(), hr.tolist()):
+        ws.append(row)
+    wb.save(path)
+
+
+def prepare_workspace(scale):
+    """앱 파일 사본 + 합성 데이터가 있는 배율별 작업 폴더 (데이터는 없을 때만 생성)"""
+    ws = BENCH_DIR / f"{scale}x"
+    ws.mkdir(parents=True, exist_ok=True)
+    for name in APP_FILES:
+        src, dst = ROOT / name, ws / name
+        if dst.is_dir():
+            shutil.rmtree(dst)
+        if src.is_dir():
+            shutil.copytree(src, dst, ignore=shutil.ignore_patterns("__pycache__"))
+        else:
+            shutil.copy2(src, dst)
+    if not (ws / "countriesMBTI_16types.csv").exists():
+        synthetic_mbti(ws / "countriesMBTI_16types.csv", scale)
+    if not (ws / "fitness data.xlsx").exists():
+        synthetic_fitness(ws / "fitness data.xlsx", scale)
+    return ws
+
+
+# ------------------------------
+# 측정 (자식 프로세스)
+# ------------------------------
+def figure_bytes(at):
+    return sum(len(e.proto.spec) for e in at.get("plotly_chart"))
+
+
+def find_widget(at, kind, label):
+    for w in getattr(at, kind):
+        if w.label == label:
+            return w
+    raise LookupError(f"위젯을 찾을 수 없습니다: {kind} {label!r}")
+
+
+def apply(widget, action):
+    how, arg = action
+    if how == "index":
+        return widget.select_index(arg % len(widget.options))
+    return widget.set_value(arg)
+
+
+def measure(workspace, page, launched_at, restart=False):
+    import resource
+
+    os.chdir(workspace)
+    sys.path.insert(0, str(workspace))
+    if not restart:
+        shutil.rmtree(Path(workspace) / ".cache", ignore_errors=True)   # 디스크 캐시도 비운 콜드 스타트
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(Path(workspace) / page), default_timeout=RUN_TIMEOUT)
+    t0 = time.perf_counter()
+    at.run()
+    first_render = time.perf_counter() - t0
+    if restart:
+        # 앞선 측정이 남긴 디스크 캐시로 재시작한 첫 방문자
+        return {"restart_first_render_s": first_render, "exception": [str(e.value) for e in at.exception]}
+    result = {
+        "cold_start_s": time.time() - launched_at,
+        "first_render_s": first_render,
+        "figure_bytes": figure_bytes(at),
+        "exception": [str(e.value) for e in at.exception],
+    }
+    t0 = time.perf_counter()
+    at.run()
+    result["warm_rerun_s"] = time.perf_counter() - t0
+    for name, kind, label, action in INTERACTIONS[page]:
+        widget = find_widget(at, kind, label)
+        if widget.disabled:         # 예: 국가 수가 많아 클라이언트 모드를 쓸 수 없는 배율
+            continue
+        t0 = time.perf_counter()
+        apply(widget, action).run()
+        result[f"{name}_s"] = time.perf_counter() - t0
+        result["figure_bytes"] = max(result["figure_bytes"], figure_bytes(at))
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+def _run_worker(workspace, page, *extra):
+    cmd = [sys.executable, "-m", "bench.bench_pages", "--worker", str(workspace), page, repr(time.time()), *extra]
+    try:
+        proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, timeout=RUN_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return {"error": f"시간 초과 ({RUN_TIMEOUT}s)"}
+    lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        return {"error": (proc.stderr.strip().splitlines() or ["알 수 없는 오류"])[-1]}
+    return json.loads(lines[-1])
+
+
+def run_page(workspace, page):
+    result = _run_worker(workspace, page)
+    if "error" not in result:
+        restart = _run_worker(workspace, page, "--restart")
+        result["restart_first_render_s"] = restart.get("restart_first_render_s")
+        result["exception"] = result["exception"] + restart.get("exception", [])
+    return result
+
+
+# ------------------------------
+# 기준값 비교
+# ------------------------------
+def metric_floor(metric):
+    return ABS_FLOOR["s"] if metric.endswith("_s") else ABS_FLOOR.get(metric, 0.0)
+
+
+def regressions(result, baseline, tolerance=TOLERANCE):
+    out = []
+    for metric, base in baseline.items():
+        cur = result.get(metric)
+        if not isinstance(base, (int, float)) or not isinstance(cur, (int, float)):
+            continue
+        if cur > base * tolerance and cur - base > metric_floor(metric):
+            out.append(f"{metric} {base:,.3f} -> {cur:,.3f}")
+    return out
+
+
+def format_row(key, result):
+    if "error" in result:
+        return f"{key:<42} 실패: {result['error']}"
+    widgets = " ".join(f"{k[:-2]}={v * 1e3:.0f}ms" for k, v in result.items()
+                       if k.endswith("_s") and k not in ("cold_start_s", "first_render_s", "warm_rerun_s",
+                                                         "restart_first_render_s"))
+    restart = result.get("restart_first_render_s")
+    restart = f"{restart:6.2f}s" if isinstance(restart, (int, float)) else "    -"
+    return (f"{key:<42} cold {result['cold_start_s']:6.2f}s | first {result['first_render_s']:6.2f}s"
+            f" | restart {restart}"
+            f" | warm {result['warm_rerun_s'] * 1e3:6.0f}ms | {widgets}"
+            f" | {result['peak_rss_mb']:,.0f}MB | fig {result['figure_bytes'] / 1024:,.0f}KB")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        workspace, page, launched_at = sys.argv[2], sys.argv[3], float(sys.argv[4])
+        print(json.dumps(measure(workspace, page, launched_at, restart="--restart" in sys.argv[5:])))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES))
+    parser.add_argument("--pages", nargs="+", default=list(PAGES))
+    parser.add_argument("--save", action="store_true", help="이번 결과를 기준값으로 저장")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else {}
+    results, flagged = {}, []
+    for scale in args.scales:
+        workspace = prepare_workspace(scale)
+        for page in args.pages:
+            key = f"{page}@{scale}x"
+            results[key] = run_page(workspace, page)
+            print(format_row(key, results[key]), flush=True)
+            if results[key].get("exception"):
+                print(f"{'':<42} 페이지 예외: {results[key]['exception']}")
+            for msg in regressions(results[key], baseline.get(key, {}), args.tolerance):
+                flagged.append(f"{key}: {msg}")
+
+    if args.save:
+        BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        baseline.update(results)
+        BASELINE_PATH.write_text(json.dumps(baseline, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+        print(f"기준값 저장: {BASELINE_PATH.relative_to(ROOT)}")
+    if flagged:
+        print("\n회귀 의심 항목:")
+        print("\n".join(f"  {m}" for m in flagged))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""응답자 집계 벤치마크: python -m bench.bench_respondents [--rows 1000000 10000000] [--files 4]
+
+합성 응답 CSV(국가, MBTI, 응답 시각)를 `.cache/bench/respondents/` 에 만들고 다음을 잽니다.
+- 첫 집계: 모든 파일을 읽는 시간, 초당 행 수, 최대 상주 메모리
+- 재집계: 변경 없음(체크포인트만 읽음) / 새 파일 하나 추가 후
+작은 파일로 pandas groupby 결과와 개수가 같은지도 확인합니다.
+"""
+
+import argparse
+import resource
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from bench.bench_pages import ROOT
+from utils import data, respondents
+
+WORK_DIR = ROOT / ".cache" / "bench" / "respondents"
+
+
+def synthetic_responses(path, rows, seed=0):
+    """실제 국가 목록과 분포를 따르는 응답 rows 건 (유형 표기 흔들림, 무효 응답 약간 포함)"""
+    values, countries = data.parse_csv(ROOT / data.DEFAULT_CSV)
+    p = np.nan_to_num(values.astype(np.float64), nan=1 / 16)
+    p /= p.sum(axis=1, keepdims=True)
+    cum = np.cumsum(p, axis=1)
+    labels = np.array(list(data.MBTI_TYPES) + ["intj-a", " ENFP-T", "XXXX"], dtype=object)
+    rng = np.random.default_rng(seed)
+    block = 500_000
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("country,mbti,timestamp\n")
+        for start in range(0, rows, block):
+            n = min(block, rows - start)
+            c = rng.integers(0, len(countries), n)
+            t = (cum[c] < rng.random(n)[:, None]).sum(axis=1).clip(0, 15)
+            noise = rng.random(n)
+            t = np.where(noise < 0.002, 16 + (noise * 1500).astype(int) % 3, t)
+            names = np.asarray(countries, dtype=object)[c]
+            ts = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 3e7, n), unit="s")
+            pd.DataFrame({"country": names, "mbti": labels[t], "timestamp": ts}).to_csv(f, header=False, index=False)
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def check_small(tmp):
+    path = tmp / "small.csv"
+    synthetic_responses(path, 20_000, seed=1)
+    counts = respondents.count_file(path, chunk_rows=3_000)
+    frame = pd.read_csv(path, dtype=str)
+    frame["type"] = respondents.type_index(pd.Index(frame["mbti"]))
+    frame = frame[frame["type"] >= 0]
+    expected = frame.groupby(["country", "type"]).size().unstack(fill_value=0)
+    got = pd.DataFrame(counts.counts, index=counts.countries).loc[expected.index, expected.columns]
+    assert (got.to_numpy() == expected.to_numpy()).all(), "집계 개수가 pandas groupby 와 다릅니다"
+    assert counts.rows == 20_000 and counts.invalid == 20_000 - len(frame)
+    print(f"검증: 20,000건 groupby 와 일치 (무효 {counts.invalid}건)")
+
+
+def run(rows, n_files):
+    src = WORK_DIR / f"{rows}"
+    if not src.exists():
+        src.mkdir(parents=True)
+        for k in range(n_files + 1):
+            synthetic_responses(src / f"part-{k:03d}.csv", rows // n_files, seed=k)
+    inputs = WORK_DIR / "inputs"
+    ckpt = WORK_DIR / "checkpoints"
+    shutil.rmtree(inputs, ignore_errors=True)
+    shutil.rmtree(ckpt, ignore_errors=True)
+    inputs.mkdir()
+    for k in range(n_files):
+        (inputs / f"part-{k:03d}.csv").symlink_to(src / f"part-{k:03d}.csv")
+
+    rss0 = peak_rss_mb()
+    t0 = time.perf_counter()
+    counts, _ = respondents.aggregate_files([inputs], ckpt)
+    t_first = time.perf_counter() - t0
+    rss1 = peak_rss_mb()
+
+    t0 = time.perf_counter()
+    respondents.aggregate_files([inputs], ckpt)
+    t_same = time.perf_counter() - t0
+
+    (inputs / f"part-{n_files:03d}.csv").symlink_to(src / f"part-{n_files:03d}.csv")
+    t0 = time.perf_counter()
+    _, info = respondents.aggregate_files([inputs], ckpt)
+    t_new = time.perf_counter() - t0
+
+    print(f"{counts.rows:>12,}행 {n_files}개 파일 | 첫 집계 {t_first:6.2f}s ({counts.rows / t_first / 1e6:5.2f}M행/s)"
+          f" | 변경 없음 {t_same * 1e3:6.1f}ms | 새 파일 1개 {t_new:5.2f}s (다시 센 파일 {len(info['counted'])}개)"
+          f" | 최대 RSS {rss1:,.0f}MB (+{rss1 - rss0:,.0f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--files", type=int, default=4)
+    args = parser.parse_args()
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+    check_small(WORK_DIR)
+    for rows in args.rows:
+        run(rows, args.files)
+
+
+if __name__ == "__main__":
+    main()
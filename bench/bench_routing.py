@@ -0,0 +1,61 @@
+"""일정 경로 계산 벤치마크: python -m bench.bench_routing [--sizes 1000 3000 5000] [--days 4]
+
+상하이 도심 주변에 임의 POI를 만들어 단계별(군집/거리 행렬/최근접 이웃/2-opt) 시간과
+전체 plan_itinerary 시간을 출력합니다. 2-opt 시간 예산을 끈 결과(--full)와 거리를 비교할 수 있습니다.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from utils import routing
+
+CENTER = (31.2304, 121.4737)
+
+
+def synthetic_pois(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # 도심에 몰린 명소 + 외곽에 흩어진 명소
+    k = n * 3 // 4
+    lat = np.concatenate([rng.normal(CENTER[0], 0.04, k), rng.uniform(CENTER[0] - 0.3, CENTER[0] + 0.3, n - k)])
+    lon = np.concatenate([rng.normal(CENTER[1], 0.05, k), rng.uniform(CENTER[1] - 0.35, CENTER[1] + 0.35, n - k)])
+    return lat, lon
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def run(n, days, full):
+    lat, lon = synthetic_pois(n)
+    labels, t_cluster = timed(routing.cluster_days, lat, lon, days)
+    idx = np.flatnonzero(labels == np.bincount(labels).argmax())
+    D, t_matrix = timed(routing.haversine_matrix, lat[idx], lon[idx])
+    route, t_nn = timed(routing.nearest_neighbor_route, D)
+    _, t_2opt = timed(routing.two_opt, route, D, time_limit=routing.DEFAULT_TIME_BUDGET / days)
+
+    plans, t_total = timed(routing.plan_itinerary, lat, lon, days)
+    km = sum(p.distance_km for p in plans)
+    print(f"{n:>7,} POI | 군집 {t_cluster * 1e3:7.1f}ms | 최대 군집 {len(idx):>5,}곳: 거리행렬 {t_matrix * 1e3:6.1f}ms"
+          f" 최근접 {t_nn * 1e3:6.1f}ms 2-opt {t_2opt * 1e3:6.1f}ms | 전체 {t_total * 1e3:7.1f}ms, {km:,.1f} km")
+    if full:
+        plans, t_full = timed(routing.plan_itinerary, lat, lon, days, time_budget=None)
+        km_full = sum(p.distance_km for p in plans)
+        print(f"{'':>11} 시간 예산 없음: {t_full * 1e3:7.1f}ms, {km_full:,.1f} km ({(km / km_full - 1) * 100:+.2f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 2000, 5000])
+    parser.add_argument("--days", type=int, default=4)
+    parser.add_argument("--full", action="store_true", help="시간 예산 없이 2-opt를 끝까지 돌린 결과와 비교")
+    args = parser.parse_args()
+    for n in args.sizes:
+        run(n, args.days, args.full)
+
+
+if __name__ == "__main__":
+    main()
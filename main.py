@@ -1,13 +1,14 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import numpy as np
+
+from utils import charts, client, cube as mbti_cube, data, export, figures, outliers, perf, resultcache, rollup, similarity
 
 st.set_page_config(
     page_title="🌍 국가별 MBTI 분석",
     layout="wide",
     page_icon="🌈"
 )
+perf.begin("main")
 
 # ---- 스타일 정의 ----
 st.markdown("""
@@ -32,12 +33,13 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ---- 데이터 불러오기 ----
-@st.cache_data
-def load_data():
-    df = pd.read_csv("countriesMBTI_16types.csv")
-    return df
+@perf.cached(st.cache_resource)
+def load_dataset(stamp):
+    # stamp(mtime, 크기)가 바뀌면 사이드카 검사/재생성, 아니면 프로세스 내 공유 객체 재사용
+    return data.load_dataset(data.DEFAULT_CSV)
 
-df = load_data()
+dataset = load_dataset(data.dataset_stamp(data.DEFAULT_CSV))
+df = dataset.frame(source_order=True)
 
 st.title("🌍 국가별 MBTI 데이터 분석 대시보드")
 st.markdown("이 페이지는 **결측치, 이상치 처리** 후 **국가별 MBTI 분포 및 MBTI별 국가 순위**를 시각화합니다.")
@@ -46,11 +48,53 @@ st.markdown("이 페이지는 **결측치, 이상치 처리** 후 **국가별 MB
 with st.expander("📄 데이터 미리보기"):
     st.dataframe(df.head())
 
-# ---- 결측치 처리 ----
+# ---- 결측치/이상치 처리 (데이터 버전 + 처리 방식별 캐시) ----
+OUTLIER_MODE_LABELS = {
+    "sequential": "열 순서대로 제거 (기존 방식)",
+    "simultaneous": "모든 열 동시 적용",
+    "clip": "경계값으로 자르기 (winsorize)",
+}
+
+@perf.cached(st.cache_data)
+@resultcache.cached()
+def clean_data(_dataset, version, mode):
+    values, missing_before = outliers.impute_mean(_dataset.values)
+    # sequential 은 열 순서에 따라 결과가 달라지므로 원래 CSV 열 순서로 검사
+    result = outliers.remove_outliers(values, mode=mode, order=_dataset.source_order)
+    cleaned = pd.DataFrame(result.values, columns=list(_dataset.types))
+    cleaned.insert(0, "Country", [c for c, k in zip(_dataset.countries, result.keep) if k])
+    return cleaned, missing_before, result.rows_removed, result.cells_flagged
+
+@perf.cached(st.cache_resource)
+def load_cube(_cleaned, version, mode):
+    # 정제된 데이터 버전마다 한 번만 만들고 모든 세션이 공유
+    types = [c for c in _cleaned.columns if c != "Country"]
+    return mbti_cube.build_cube(_cleaned[types].to_numpy(), _cleaned["Country"], types)
+
 st.subheader("🧹 결측치 처리")
-missing_before = df.isnull().sum().sum()
-df = df.fillna(df.mean(numeric_only=True))
-missing_after = df.isnull().sum().sum()
+outlier_mode = st.radio(
+    "이상치 처리 방식",
+    list(OUTLIER_MODE_LABELS),
+    format_func=OUTLIER_MODE_LABELS.get,
+    horizontal=True,
+)
+df, missing_before, rows_removed, cells_flagged = clean_data(dataset, dataset.version, outlier_mode)
+with perf.span("결측치 재확인"):
+    missing_after = df.isnull().sum().sum()
+cube = load_cube(df, dataset.version, outlier_mode)
+cube_version = f"{dataset.version}:{outlier_mode}"
+
+@perf.cached(st.cache_resource)
+def start_figure_warmup(_cube, version):
+    # MBTI_FIGURE_PREWARM=1 이면 모든 국가/유형 차트를 백그라운드에서 미리 생성
+    if figures.prewarm_enabled():
+        figures.warm_up_async(_cube, version, ["pie", "ranking"])
+
+start_figure_warmup(cube, cube_version)
+
+@perf.cached(st.cache_resource)
+def load_similarity(_cube, version):
+    return similarity.SimilarityIndex(_cube.values, _cube.countries, "euclidean")
 
 col1, col2 = st.columns(2)
 with col1:
@@ -60,106 +104,127 @@ with col2:
 
 # ---- 이상치 처리 (IQR) ----
 st.subheader("⚠️ 이상치 처리 (IQR 기반)")
-numeric_cols = df.select_dtypes(include=[np.number]).columns
-
-for col in numeric_cols:
-    Q1 = df[col].quantile(0.25)
-    Q3 = df[col].quantile(0.75)
-    IQR = Q3 - Q1
-    lower = Q1 - 1.5 * IQR
-    upper = Q3 + 1.5 * IQR
-    df = df[(df[col] >= lower) & (df[col] <= upper)]
+col1, col2 = st.columns(2)
+with col1:
+    st.metric("제거된 국가(행) 수", rows_removed)
+with col2:
+    st.metric("경계를 벗어난 값(셀) 수", cells_flagged)
 
 st.success("이상치 처리가 완료되었습니다.")
 
-# ---- MBTI 열 목록 ----
-mbti_cols = [c for c in df.columns if c.upper() in [
-    "INTJ","INTP","ENTJ","ENTP",
-    "INFJ","INFP","ENFJ","ENFP",
-    "ISTJ","ISFJ","ESTJ","ESFJ",
-    "ISTP","ISFP","ESTP","ESFP"
-]]
-
-# ---- 국가별 MBTI 분포 (파이 차트) ----
-st.subheader("🌐 국가별 MBTI 분포 분석")
-
-country_list = sorted(df["Country"].unique())
-selected_country = st.selectbox("국가를 선택하세요:", country_list)
-
-country_df = df[df["Country"] == selected_country]
-
-if len(mbti_cols) > 0:
-    melted_df = country_df.melt(
-        id_vars=["Country"],
-        value_vars=mbti_cols,
-        var_name="MBTI",
-        value_name="비율"
+# 정제된 데이터 내보내기 (버튼을 눌렀을 때만 직렬화, 처리 방식/형식별 파일 캐시)
+col1, col2 = st.columns([1, 3])
+with col1:
+    export_fmt = st.selectbox("내보내기 형식", list(export.FORMATS), format_func=str.upper)
+with col2:
+    st.download_button(
+        f"정제된 데이터 {export_fmt.upper()} 다운로드",
+        export.deferred(dataset, "cleaned", export_fmt, mode=outlier_mode),
+        file_name=export.file_name("cleaned", export_fmt, mode=outlier_mode),
+        mime=export.FORMATS[export_fmt][0],
     )
 
-    melted_df = melted_df.groupby("MBTI")["비율"].mean().reset_index()
-    melted_df = melted_df.sort_values("비율", ascending=False)
-    top_type = melted_df.iloc[0]["MBTI"]
+# ---- 화면 구역 (st.fragment) ----
+# 각 구역은 자기 위젯이 바뀔 때 그 구역만 다시 실행된다.
+# 이상치 처리 방식처럼 위쪽 입력이 바뀌면 전체가 다시 실행되고, 구역에는 캐시된 cube 가 인자로 전달된다.
+RENDER_MODE_LABELS = {
+    "auto": "자동 (데이터 크기 기준)",
+    "grouped": "국가별 그룹 막대",
+    "heatmap": "히트맵 (국가 × 유형)",
+    "top_n": "유형별 상위 10개국 + 기타",
+}
+
+@perf.fragment
+def country_section(cube, cube_version):
+    # ---- 국가별 MBTI 분포 (파이 차트) ----
+    st.subheader("🌐 국가별 MBTI 분포 분석")
+
+    selected_country = st.selectbox("국가를 선택하세요:", cube.sorted_countries)
+    if len(cube.types) == 0:
+        st.warning("MBTI 유형 열을 찾을 수 없습니다.")
+        return
+    top_type = cube.top_type(selected_country)
 
     # 원 그래프
-    fig = px.pie(
-        melted_df,
-        names="MBTI",
-        values="비율",
-        color="MBTI",
-        color_discrete_sequence=px.colors.qualitative.Safe,
-        title=f"🇨🇳 {selected_country}의 MBTI 비율 분포"
-    )
-    fig.update_traces(textinfo="percent+label", pull=[0.1 if i == 0 else 0 for i in range(len(mbti_cols))])
-    fig.update_layout(title_x=0.5)
-    st.plotly_chart(fig, use_container_width=True)
+    fig = figures.get_figure("pie", selected_country, cube, cube_version)
+    perf.plotly_chart(fig, "파이", use_container_width=True)
 
     st.markdown(f"💡 이 국가에서 가장 많은 유형은 **{top_type}** 입니다.")
-else:
-    st.warning("MBTI 유형 열을 찾을 수 없습니다.")
-
-# ---- MBTI 선택 시 국가 순위 그래프 ----
-st.subheader("📈 MBTI별 국가 순위")
-
-selected_mbti = st.selectbox("MBTI 유형을 선택하세요:", mbti_cols)
-
-mbti_country_df = df[["Country", selected_mbti]].groupby("Country")[selected_mbti].mean().reset_index()
-mbti_country_df = mbti_country_df.sort_values(selected_mbti, ascending=False)
 
-fig3 = px.bar(
-    mbti_country_df,
-    x="Country",
-    y=selected_mbti,
-    text_auto=".2f",
-    color=selected_mbti,
-    color_continuous_scale="RdYlBu_r",
-    title=f"{selected_mbti} 유형이 많은 국가 순위"
+    with st.expander(f"🔎 {selected_country}와(과) MBTI 분포가 비슷한 국가"):
+        with perf.span("유사 국가 조회"):
+            similar = load_similarity(cube, cube_version).query(selected_country, k=5)
+        st.dataframe(similar, hide_index=True)
+
+@perf.fragment
+def ranking_section(cube, cube_version):
+    # ---- MBTI 선택 시 국가 순위 그래프 ----
+    st.subheader("📈 MBTI별 국가 순위")
+
+    selected_mbti = st.selectbox("MBTI 유형을 선택하세요:", list(cube.types))
+
+    fig3 = figures.get_figure("ranking", selected_mbti, cube, cube_version)
+    perf.plotly_chart(fig3, "유형별 순위", use_container_width=True)
+
+def client_sections(cube, cube_version):
+    # 모든 국가/유형 값을 드롭다운 버튼에 담은 figure 를 한 번만 보내고, 전환은 브라우저에서
+    st.subheader("🌐 국가별 MBTI 분포 분석")
+    fig = figures.figure_cache().get(("client_pie", cube_version), lambda: client.pie_switcher(cube))
+    perf.plotly_chart(fig, "파이 (클라이언트)", use_container_width=True)
+    st.caption("차트 왼쪽 위 목록에서 국가를 고르면 서버를 거치지 않고 바로 바뀝니다. "
+               "비슷한 국가 목록은 클라이언트 전환을 끄면 볼 수 있습니다.")
+
+    st.subheader("📈 MBTI별 국가 순위")
+    fig3 = figures.figure_cache().get(("client_ranking", cube_version), lambda: client.ranking_switcher(cube))
+    perf.plotly_chart(fig3, "유형별 순위 (클라이언트)", use_container_width=True)
+
+VIEW_LABELS = {"types": "16유형", "axes": "성향 축 (E/I·S/N·T/F·J/P)"}
+GROUPING_LABELS = {"country": "국가별", "continent": "대륙별"}
+WEIGHTING_LABELS = {"equal": "국가 단순 평균", "population": "인구 가중"}
+
+@perf.cached(st.cache_resource)
+def load_rollup_cube(_cube, version, regions_stamp, view, grouping, weighting):
+    # 축 비율/대륙 묶음을 행렬 곱으로 한 번에 계산해 기존 차트가 그대로 쓰는 큐브로 만듦
+    result = rollup.rollup_by(_cube.values, _cube.countries, _cube.types, grouping, weighting)
+    values, columns = result.view(view, _cube.types)
+    return mbti_cube.build_cube(values, result.names, columns)
+
+@perf.fragment
+def all_countries_section(cube, cube_version):
+    # ---- 전체 국가 평균 비교 ----
+    st.subheader("📊 전 세계 MBTI 평균 비교")
+
+    c1, c2, c3, c4 = st.columns(4)
+    render_mode = c1.selectbox("표시 방식", list(RENDER_MODE_LABELS), format_func=RENDER_MODE_LABELS.get)
+    view = c2.selectbox("보기", rollup.VIEWS, format_func=VIEW_LABELS.get)
+    grouping = c3.selectbox("묶음 단위", rollup.GROUPINGS, format_func=GROUPING_LABELS.get)
+    weighting = c4.radio("대륙 평균 가중치", rollup.WEIGHTINGS, format_func=WEIGHTING_LABELS.get,
+                         disabled=grouping == "country")
+    if view != "types" or grouping != "country":
+        cube = load_rollup_cube(cube, cube_version, data.dataset_stamp(rollup.DEFAULT_REGIONS),
+                                view, grouping, weighting)
+    if render_mode == "auto":
+        render_mode = charts.choose_mode(len(cube.countries), len(cube.types))
+        st.caption(f"{GROUPING_LABELS[grouping][:-1]} {len(cube.countries)}개 기준 자동 선택: {RENDER_MODE_LABELS[render_mode]}")
+
+    with perf.span(f"전체 국가 차트 생성:{render_mode}"):
+        fig2 = charts.all_countries_figure(cube, render_mode)
+    if view != "types" or grouping != "country":
+        fig2.update_layout(title=f"{GROUPING_LABELS[grouping]} MBTI {VIEW_LABELS[view]} 비교")
+    perf.plotly_chart(fig2, "전체 국가", use_container_width=True)
+
+client_mode = st.toggle(
+    "⚡ 브라우저에서 바로 전환 (국가/유형을 바꿔도 서버 재실행 없음)",
+    value=False,
+    disabled=not client.supported(cube),
+    help=f"국가 {client.CLIENT_LIMIT}개 이하일 때 사용할 수 있습니다.",
 )
-fig3.update_traces(marker_line_width=1.2, marker_line_color="#333", textposition="outside")
-fig3.update_layout(
-    title_x=0.5,
-    xaxis_title="국가",
-    yaxis_title="비율 (%)",
-    plot_bgcolor="#ffffff",
-    paper_bgcolor="#ffffff",
-    font=dict(size=13)
-)
-st.plotly_chart(fig3, use_container_width=True)
-
-# ---- 전체 국가 평균 비교 ----
-st.subheader("📊 전 세계 MBTI 평균 비교")
-
-avg_df = df.groupby("Country")[mbti_cols].mean().reset_index()
-avg_df = avg_df.melt(id_vars=["Country"], var_name="MBTI", value_name="비율")
-
-fig2 = px.bar(
-    avg_df,
-    x="MBTI",
-    y="비율",
-    color="Country",
-    barmode="group",
-    title="국가별 MBTI 평균 비율 비교"
-)
-fig2.update_layout(title_x=0.5, plot_bgcolor="#fff")
-st.plotly_chart(fig2, use_container_width=True)
+if client_mode and client.supported(cube):
+    client_sections(cube, cube_version)
+else:
+    country_section(cube, cube_version)
+    ranking_section(cube, cube_version)
+all_countries_section(cube, cube_version)
 
 st.caption("© 2025 국가별 MBTI 데이터 분석 대시보드")
+perf.finish()
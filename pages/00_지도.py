@@ -1,40 +1,52 @@
 import streamlit as st
-import folium
-from streamlit_folium import st_folium
+
+from utils import data, perf, poi
 
 st.set_page_config(page_title="서울 관광명소 Top10", layout="wide")
+perf.begin("00_map")
 
 st.title("🌏 외국인들이 좋아하는 서울의 주요 관광지 Top10")
 
-# 서울 주요 관광지 Top10 (한국관광공사 및 서울관광재단 자료 기반)
-places = [
-    {"name": "경복궁", "lat": 37.579617, "lon": 126.977041, "desc": "조선의 대표 궁궐, 전통과 역사의 상징"},
-    {"name": "명동", "lat": 37.563757, "lon": 126.982669, "desc": "쇼핑과 길거리 음식의 천국"},
-    {"name": "남산타워 (N서울타워)", "lat": 37.551169, "lon": 126.988227, "desc": "서울의 랜드마크, 야경 명소"},
-    {"name": "북촌 한옥마을", "lat": 37.582604, "lon": 126.983998, "desc": "전통 한옥이 잘 보존된 마을"},
-    {"name": "홍대 거리", "lat": 37.556332, "lon": 126.923611, "desc": "젊음과 예술의 거리"},
-    {"name": "인사동", "lat": 37.574008, "lon": 126.984733, "desc": "한국 전통 공예와 문화의 거리"},
-    {"name": "청계천", "lat": 37.569155, "lon": 126.978300, "desc": "도심 속 힐링 산책로"},
-    {"name": "동대문디자인플라자 (DDP)", "lat": 37.566477, "lon": 127.009128, "desc": "미래적 디자인의 대표 공간"},
-    {"name": "롯데월드타워", "lat": 37.513068, "lon": 127.102531, "desc": "초고층 전망대와 쇼핑 복합공간"},
-    {"name": "잠실 롯데월드", "lat": 37.511000, "lon": 127.098000, "desc": "서울의 대표 놀이공원"},
-]
+# 서울 주요 관광지 (한국관광공사 및 서울관광재단 자료 기반), pois/seoul.csv
+POI_PATH = "pois/seoul.csv"
+MAP_KEY = "seoul_map"
+DEFAULT_ZOOM = 12
+
+
+@perf.cached(st.cache_resource)
+def load_store(path, stamp):
+    return poi.load_store(path)
+
+
+@perf.cached(st.cache_data, max_entries=256)
+def viewport_query(path, stamp, snapped_bounds):
+    # (도시, 줌에 맞춘 타일 범위) 별 조회 결과(POI 인덱스) 캐시
+    return load_store(path, stamp).query(*snapped_bounds)
+
+
+stamp = data.dataset_stamp(POI_PATH)
+store = load_store(POI_PATH, stamp)
+
+# folium/streamlit_folium 은 import 에만 1초 넘게 걸려, 제목을 먼저 그린 뒤 여기서 불러옴
+with st.spinner("지도를 불러오는 중..."), perf.span("folium import"):
+    import folium
+    from streamlit_folium import st_folium
+
+# 직전 지도 화면(범위/줌)에 들어오는 관광지만 조회
+south, west, north, east, zoom = poi.viewport_from_state(st.session_state.get(MAP_KEY), store, DEFAULT_ZOOM)
+idx = viewport_query(POI_PATH, stamp, poi.snap_bounds(south, west, north, east, zoom))
+with perf.span("마커 레이어 생성"):
+    markers = poi.marker_layer(store, idx, poi.zoom_bucket(zoom), icon_color="blue", icon="info-sign", name="관광지")
 
 # 지도 중심 좌표
 seoul_center = [37.5665, 126.9780]
 
-# 지도 생성
-m = folium.Map(location=seoul_center, zoom_start=12, tiles="CartoDB positron")
-
-# 마커 추가
-for place in places:
-    popup_html = f"<b>{place['name']}</b><br>{place['desc']}"
-    folium.Marker(
-        [place["lat"], place["lon"]],
-        tooltip=place["name"],
-        popup=popup_html,
-        icon=folium.Icon(color="blue", icon="info-sign")
-    ).add_to(m)
+# 지도 생성 (마커는 feature group으로 따로 보내 지도 전체를 다시 그리지 않음)
+m = folium.Map(location=seoul_center, zoom_start=DEFAULT_ZOOM, tiles="CartoDB positron")
 
 # Streamlit에 folium 지도 표시
-st_folium(m, width=1000, height=700)
+with perf.span("지도 전송"):
+    st_folium(m, width=1000, height=700, key=MAP_KEY, feature_group_to_add=markers,
+              returned_objects=["bounds", "zoom"])
+st.caption(f"현재 화면의 관광지 {len(idx):,}곳 / 전체 {len(store):,}곳")
+perf.finish()
@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
-import folium
-from streamlit_folium import st_folium
+
+from utils import data, perf, poi, routing
 
 # 기본 설정
 st.set_page_config(page_title="상하이 여행 계획", layout="wide")
+perf.begin("01_shanghai")
 
 st.title("🧳 상하이 여행 계획 페이지")
 st.markdown("중국 상하이를 여행하기 위한 일정, 예산, 방문지 정보를 한눈에 정리합니다.")
@@ -25,46 +26,81 @@ st.write(f"**여행 일수:** {days}일 / **예산:** {budget:,}원 / **시기:*
 # --- 추천 방문지 데이터 ---
 st.header("📍 추천 방문지 Top10")
 
-places = [
-    {"name": "와이탄(外滩, The Bund)", "lat": 31.2401, "lon": 121.4905, "desc": "상하이의 대표 야경 명소"},
-    {"name": "동방명주탑 (东方明珠塔)", "lat": 31.2397, "lon": 121.4998, "desc": "상하이 랜드마크 전망대"},
-    {"name": "예원 (豫园)", "lat": 31.2272, "lon": 121.4925, "desc": "전통 중국식 정원"},
-    {"name": "난징루 보행가 (南京路步行街)", "lat": 31.2381, "lon": 121.4900, "desc": "쇼핑 거리와 야경 명소"},
-    {"name": "상하이 박물관", "lat": 31.2304, "lon": 121.4737, "desc": "중국 예술과 문화의 중심"},
-    {"name": "티안즈팡 (田子坊)", "lat": 31.2075, "lon": 121.4669, "desc": "예술 거리와 카페 골목"},
-    {"name": "신톈디 (新天地)", "lat": 31.2205, "lon": 121.4750, "desc": "유럽풍 레스토랑 거리"},
-    {"name": "상하이 디즈니랜드", "lat": 31.1440, "lon": 121.6570, "desc": "세계 최대 규모의 디즈니랜드 중 하나"},
-    {"name": "푸동 리버사이드 공원", "lat": 31.2427, "lon": 121.5111, "desc": "도시 스카이라인 조망 명소"},
-    {"name": "상하이 타워 (上海中心大厦)", "lat": 31.2336, "lon": 121.5055, "desc": "세계 2위 높이의 초고층 빌딩"},
-]
+POI_PATH = "pois/shanghai.csv"
+MAP_KEY = "shanghai_map"
+DEFAULT_ZOOM = 12
+
+
+@perf.cached(st.cache_resource)
+def load_store(path, stamp):
+    return poi.load_store(path)
+
+
+@perf.cached(st.cache_data, max_entries=256)
+def viewport_query(path, stamp, snapped_bounds):
+    # (도시, 줌에 맞춘 타일 범위) 별 조회 결과(POI 인덱스) 캐시
+    return load_store(path, stamp).query(*snapped_bounds)
+
+
+@perf.cached(st.cache_data, max_entries=64)
+def plan_days(path, stamp, days):
+    # 일자별 (방문지 이름 목록, 이동 거리 km)
+    store = load_store(path, stamp)
+    plans = routing.plan_itinerary(store.lat, store.lon, days, start=store.center)
+    return [(store.names[p.stops].tolist(), p.distance_km) for p in plans]
+
+
+def format_stops(names, limit=12):
+    text = " → ".join(names[:limit])
+    return text + (f" 외 {len(names) - limit}곳" if len(names) > limit else "")
+
+
+stamp = data.dataset_stamp(POI_PATH)
+store = load_store(POI_PATH, stamp)
 
 # --- 지도 표시 ---
 st.subheader("🗺️ 상하이 주요 명소 지도")
 
-shanghai_center = [31.2304, 121.4737]
-m = folium.Map(location=shanghai_center, zoom_start=12, tiles="CartoDB positron")
+# folium/streamlit_folium 은 import 에만 1초 넘게 걸려, 위쪽 입력 영역을 먼저 그린 뒤 여기서 불러옴
+with st.spinner("지도를 불러오는 중..."), perf.span("folium import"):
+    import folium
+    from streamlit_folium import st_folium
 
-for p in places:
-    folium.Marker(
-        [p["lat"], p["lon"]],
-        tooltip=p["name"],
-        popup=f"<b>{p['name']}</b><br>{p['desc']}",
-        icon=folium.Icon(color="red", icon="star")
-    ).add_to(m)
+south, west, north, east, zoom = poi.viewport_from_state(st.session_state.get(MAP_KEY), store, DEFAULT_ZOOM)
+idx = viewport_query(POI_PATH, stamp, poi.snap_bounds(south, west, north, east, zoom))
+with perf.span("마커 레이어 생성"):
+    markers = poi.marker_layer(store, idx, poi.zoom_bucket(zoom), icon_color="red", icon="star", name="명소")
 
-st_folium(m, width=1000, height=600)
+shanghai_center = [31.2304, 121.4737]
+m = folium.Map(location=shanghai_center, zoom_start=DEFAULT_ZOOM, tiles="CartoDB positron")
+
+with perf.span("지도 전송"):
+    st_folium(m, width=1000, height=600, key=MAP_KEY, feature_group_to_add=markers,
+              returned_objects=["bounds", "zoom"])
+st.caption(f"현재 화면의 명소 {len(idx):,}곳 / 전체 {len(store):,}곳")
 
 # --- 일정표 (DataFrame 입력) ---
 st.header("🕓 여행 일정표 작성")
 st.markdown("방문지와 시간 계획을 자유롭게 추가하세요.")
 
+auto_plan = st.toggle("🧭 추천 방문지로 일정 자동 채우기 (이동 동선 최적화)", value=False)
+if auto_plan:
+    plans = plan_days(POI_PATH, stamp, int(days))
+    stops = [format_stops(names) for names, _ in plans]
+    st.caption("일자별로 가까운 명소끼리 묶고 이동 거리가 짧은 순서로 배치했습니다. "
+               f"총 직선 이동 거리 약 {sum(km for _, km in plans):,.1f} km")
+else:
+    stops = ["" for _ in range(days)]
+
 schedule = pd.DataFrame({
     "날짜": [f"Day {i+1}" for i in range(days)],
-    "주요 방문지": ["" for _ in range(days)],
+    "주요 방문지": stops,
     "식사 장소": ["" for _ in range(days)],
     "예상 교통수단": ["" for _ in range(days)],
     "예상 비용 (원)": [0 for _ in range(days)]
 })
+if auto_plan:
+    schedule.insert(2, "이동 거리 (km)", [round(km, 1) for _, km in plans])
 
 edited_schedule = st.data_editor(schedule, num_rows="dynamic")
 
@@ -87,3 +123,4 @@ st.markdown("""
 
 # --- 마무리 ---
 st.success("✈️ 상하이 여행 준비 완료! 멋진 여행을 즐기세요.")
+perf.finish()
@@ -4,177 +4,225 @@
 
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
+
+from utils import client, cube as mbti_cube, data, export, figures, perf, reduction, rollup, similarity
 
 st.set_page_config(layout="wide", page_title="MBTI by Country — Interactive 3D", initial_sidebar_state="expanded")
+perf.begin('02_world')
 
 # ------------------------
 # 유틸리티 함수
 # ------------------------
 
-@st.cache_data
-def load_data(path='countriesMBTI_16types.csv'):
-    df = pd.read_csv(path)
-    return df
-
-
-def gradient_colors_except_top(values, top_color='#ff0000', cmap=px.colors.sequential.Viridis):
-    """값 리스트에서 최대값(=1등)은 top_color로, 나머지는 cmap 그라데이션으로 반환"""
-    vals = np.array(values, dtype=float)
-    idx_max = np.nanargmax(vals)
-    # normalize excluding max for cmap mapping
-    others = vals.copy()
-    others[idx_max] = np.nan
-    minv = np.nanmin(others)
-    maxv = np.nanmax(others)
-    colors = []
-    for i, v in enumerate(vals):
-        if i == idx_max:
-            colors.append(top_color)
-        else:
-            # normalize to 0-1
-            if np.isnan(v) or maxv==minv:
-                t = 0.5
-            else:
-                t = (v - minv) / (maxv - minv)
-            # map to colormap
-            cmap_index = int(t * (len(cmap)-1))
-            colors.append(cmap[cmap_index])
-    return colors
-
-
-# 3D 서피스 생성: x: MBTI, y: [0,1], z: [zeros ; values]
-def country_surface_figure(mbti_labels, values):
-    # build z as 2 x N so surface looks like vertical ridges
-    z = np.vstack([np.zeros(len(values)), values])
-
-    x = np.arange(len(values))
-    y = np.array([0, 1])
-
-    # colorscale: we will build per-vertex colors by mapping value to color
-    # For a surface we can pass a colorscale and use `surfacecolor`.
-    surfacecolor = np.vstack([np.zeros(len(values)), values])
-
-    # Ensure the top is red: create a custom colorscale that ends with red at max
-    # We'll use Viridis for gradient then override the top
-    cs = px.colors.sequential.Viridis
-
-    fig = go.Figure(data=[
-        go.Surface(
-            z=z,
-            x=x,
-            y=y,
-            surfacecolor=surfacecolor,
-            colorscale=cs,
-            showscale=True,
-            cmin=0,
-            cmax=max(1.0, np.nanmax(values)),
-            hovertemplate='MBTI: %{x}<br>높이: %{z}<extra></extra>'
-        )
-    ])
-
-    # overlay annotations for MBTI names at y=1.05 plane
-    annotations = []
-    for i, label in enumerate(mbti_labels):
-        annotations.append(dict(x=i, y=1.05, z=max(values)*0.02, text=label, showarrow=False))
-
-    fig.update_layout(
-        scene=dict(
-            xaxis=dict(title='MBTI Index', tickmode='array', tickvals=list(range(len(mbti_labels))), ticktext=mbti_labels),
-            yaxis=dict(visible=False),
-            zaxis=dict(title='Value')
-        ),
-        margin=dict(l=0, r=0, t=30, b=0),
-    )
-    return fig
+@perf.cached(st.cache_resource)
+def load_dataset(stamp, path=data.DEFAULT_CSV):
+    return data.load_dataset(path)
+
+
+@perf.cached(st.cache_resource)
+def load_cube(_dataset, version):
+    return mbti_cube.build_cube(_dataset.values, _dataset.countries, _dataset.types)
+
+
+@perf.cached(st.cache_resource)
+def load_similarity(_dataset, version, metric):
+    return similarity.SimilarityIndex(_dataset.values, _dataset.countries, metric)
+
+
+@perf.cached(st.cache_resource)
+def load_rollup(_dataset, version, regions_stamp, grouping, weighting):
+    # 국가별 성향 축 비율 / 대륙별 유형·축 평균 (행렬 곱 한 번), 데이터 버전별 1회
+    return rollup.rollup_by(_dataset.values, _dataset.countries, _dataset.types, grouping, weighting)
 
 
-# 3D PCA 산점도
-def pca_3d_figure(df_mbti, country_names, n_components=3):
-    scaler = StandardScaler()
-    Xs = scaler.fit_transform(df_mbti.fillna(0).values)
-    pca = PCA(n_components=n_components, random_state=42)
-    Xp = pca.fit_transform(Xs)
-    pc_cols = [f'PC{i+1}' for i in range(Xp.shape[1])]
-    plot_df = pd.DataFrame(Xp, columns=pc_cols)
-    plot_df['Country'] = country_names
+@perf.cached(st.cache_data)
+def load_continents(_dataset, version, regions_stamp):
+    return rollup.region_names(_dataset.countries, rollup.continent_of())
 
-    fig = px.scatter_3d(plot_df, x='PC1', y='PC2', z='PC3', hover_name='Country', title='Countries in PCA 3D space (MBTI 기반)')
+
+@perf.cached(st.cache_resource)
+def load_reduction(_dataset, version, method, n_clusters):
+    # 데이터 버전/파라미터별 1회 계산, 디스크(.cache/)에도 저장되어 새 프로세스에서 재사용
+    return reduction.load_reduction(_dataset, method=method, n_clusters=n_clusters)
+
+
+# 3D PCA 산점도 (군집 레이블로 색 구분), plotly.express 는 PCA 보기를 켤 때만 불러옴
+def pca_3d_figure(result, country_names):
+    import plotly.express as px
+
+    pc_cols = [f'PC{i+1}' for i in range(result.projection.shape[1])]
+    plot_df = pd.DataFrame(result.projection, columns=pc_cols)
+    plot_df['Country'] = list(country_names)
+    plot_df['Cluster'] = [f'군집 {c + 1}' for c in result.labels]
+
+    fig = px.scatter_3d(plot_df, x='PC1', y='PC2', z='PC3', hover_name='Country',
+                        color=None if result.method == 'none' else 'Cluster',
+                        title='Countries in PCA 3D space (MBTI 기반)')
     fig.update_layout(margin=dict(l=0, r=0, t=30, b=0))
     return fig
 
 
 # 전세계 평균 3D 막대(대신 surface로 구현하여 입체감 제공)
-def global_mean_surface(df_mbti):
-    means = df_mbti.mean().values
-    labels = df_mbti.columns.tolist()
+def global_mean_surface(cube):
+    means = cube.mean
+    labels = list(cube.types)
     # create simple surface similar to country view
-    return country_surface_figure(labels, means)
+    return figures.country_surface_figure(labels, means)
+
+
+# 대륙 평균 surface (16유형 또는 성향 축 8개)
+def region_surface(result, region, view, type_names):
+    values, labels = result.view(view, type_names)
+    return figures.country_surface_figure(list(labels), values[result.names.index(region)])
 
 
 # ------------------------
 # 앱 본문
 # ------------------------
 
-df = load_data()
-mbti_cols = [c for c in df.columns if c != 'Country']
+dataset = load_dataset(data.dataset_stamp(data.DEFAULT_CSV))
+cube = load_cube(dataset, dataset.version)
+
+
+@perf.cached(st.cache_resource)
+def start_figure_warmup(_cube, version):
+    # MBTI_FIGURE_PREWARM=1 이면 모든 국가의 surface/막대 차트를 백그라운드에서 미리 생성
+    if figures.prewarm_enabled():
+        figures.warm_up_async(_cube, version, ["surface", "bar"])
+
+
+start_figure_warmup(cube, dataset.version)
 
 st.title('국가별 MBTI 분포 — 인터랙티브 3D 대시보드')
 st.markdown('파일: `countriesMBTI_16types.csv` 에서 읽어옵니다.')
 
-# 사이드바 컨트롤
+EXPORT_SUBSET_LABELS = {'raw': '원본 전체', 'cleaned': '정제 데이터 (결측치/이상치 처리)',
+                        'country': '국가 하나', 'top_n': '유형별 상위 N개국'}
+OUTLIER_MODE_LABELS = {'sequential': '열 순서대로 제거', 'simultaneous': '모든 열 동시 적용', 'clip': '경계값으로 자르기'}
+
+# 사이드바: 데이터 내보내기 (컨트롤은 각 구역 안에 있어 그 구역만 다시 실행됨)
+# 직렬화는 버튼을 누를 때 한 번만, 결과 파일은 (버전, 범위, 필터, 형식) 별로 재사용
 with st.sidebar:
     st.header('컨트롤')
-    country = st.selectbox('국가 선택', df['Country'].sort_values().tolist())
-    show_pca = st.checkbox('PCA 3D 보기', value=True)
-    show_global = st.checkbox('전세계 평균 보기', value=True)
     st.markdown('원하면 데이터 다운로드')
-    st.download_button('데이터 CSV 다운로드', df.to_csv(index=False), file_name='countriesMBTI_16types.csv')
+    export_subset = st.selectbox('내보낼 범위', export.SUBSETS, format_func=EXPORT_SUBSET_LABELS.get)
+    export_fmt = st.radio('형식', list(export.FORMATS), format_func=str.upper, horizontal=True)
+    export_filters = {}
+    if export_subset == 'cleaned':
+        export_filters['mode'] = st.selectbox('이상치 처리 방식', list(OUTLIER_MODE_LABELS), format_func=OUTLIER_MODE_LABELS.get)
+    elif export_subset == 'country':
+        export_filters['country'] = st.selectbox('내보낼 국가', cube.sorted_countries)
+    elif export_subset == 'top_n':
+        export_filters['top_n'] = st.slider('유형별 국가 수 (N)', min_value=1, max_value=30, value=10)
+    st.download_button(f'데이터 {export_fmt.upper()} 다운로드',
+                       export.deferred(dataset, export_subset, export_fmt, **export_filters),
+                       file_name=export.file_name(export_subset, export_fmt, **export_filters),
+                       mime=export.FORMATS[export_fmt][0])
+
+
+@perf.fragment
+def country_section(cube, dataset):
+    # 왼쪽: 선택 국가 MBTI (입체 surface) + 비슷한 국가
+    c1, c2 = st.columns(2)
+    country = c1.selectbox('국가 선택', cube.sorted_countries)
+    similarity_metric = c2.selectbox('유사 국가 거리 기준', similarity.METRICS,
+                                     format_func={'euclidean': '유클리드', 'cosine': '코사인', 'jensenshannon': 'Jensen-Shannon'}.get)
 
-# 메인 레이아웃
+    st.subheader(f'{country} — MBTI 분포 (입체)')
+    # Surface figure + 정확한 값 표시용 2D 막대 (1등 red, 나머지 그라데이션), 국가별 캐시
+    surf_fig = figures.get_figure("surface", country, cube, dataset.version)
+    bar_fig = figures.get_figure("bar", country, cube, dataset.version)
+
+    perf.plotly_chart(surf_fig, '국가 surface', use_container_width=True, theme='streamlit')
+    perf.plotly_chart(bar_fig, '국가 막대', use_container_width=True, theme='streamlit')
+
+    axes = load_rollup(dataset, dataset.version, data.dataset_stamp(rollup.DEFAULT_REGIONS), 'country', 'equal')
+    shares = axes.axes[cube.country_index[country]]
+    for col, k in zip(st.columns(len(rollup.AXES)), range(0, len(rollup.AXIS_LETTERS), 2)):
+        col.metric(f'{rollup.AXIS_LETTERS[k]} / {rollup.AXIS_LETTERS[k + 1]}',
+                   f'{shares[k]:.0%} / {shares[k + 1]:.0%}')
+
+    st.subheader(f'{country}와(과) 비슷한 국가')
+    sim_index = load_similarity(dataset, dataset.version, similarity_metric)
+    with perf.span('유사 국가 조회'):
+        similar = sim_index.query(country, k=5)
+    st.dataframe(similar, hide_index=True)
+
+
+@perf.fragment
+def global_section(cube, dataset):
+    version = dataset.version
+    if not st.checkbox('전세계 평균 보기', value=True):
+        return
+    regions_stamp = data.dataset_stamp(rollup.DEFAULT_REGIONS)
+    continents = load_continents(dataset, version, regions_stamp)
+    c1, c2, c3 = st.columns(3)
+    region = c1.selectbox('평균 범위', ('전세계', *continents))
+    view = c2.selectbox('평균 보기', rollup.VIEWS, format_func={'types': '16유형', 'axes': '성향 축'}.get)
+    weighting = c3.radio('대륙 가중치', rollup.WEIGHTINGS, format_func={'equal': '단순 평균', 'population': '인구 가중'}.get,
+                         disabled=region == '전세계')
+    if region == '전세계' and view == 'types':
+        st.subheader('전세계 MBTI 평균 (입체)')
+        with perf.span('전세계 평균 surface 생성'):
+            gm_fig = figures.figure_cache().get(('global_mean', version), lambda: global_mean_surface(cube))
+    elif region == '전세계':
+        st.subheader('전세계 MBTI 성향 축 평균 (입체)')
+        gm_fig = figures.figure_cache().get(('global_axes', version), lambda: figures.country_surface_figure(
+            list(rollup.AXIS_LETTERS), rollup.axis_shares(cube.mean[None], cube.types)[0]))
+    else:
+        st.subheader(f'{region} MBTI 평균 (입체)')
+        result = load_rollup(dataset, version, regions_stamp, 'continent', weighting)
+        with perf.span('대륙 평균 surface 생성'):
+            gm_fig = figures.figure_cache().get(('region_mean', version, region, view, weighting),
+                                                lambda: region_surface(result, region, view, dataset.types))
+    perf.plotly_chart(gm_fig, '전세계 평균', use_container_width=True, theme='streamlit')
+
+
+@perf.fragment
+def pca_section(dataset):
+    if not st.checkbox('PCA 3D 보기', value=True):
+        return
+    c1, c2 = st.columns(2)
+    cluster_method = c1.selectbox('군집화 방식', reduction.CLUSTER_METHODS,
+                                  format_func={'kmeans': 'k-means', 'hierarchical': '계층적 (Ward)', 'none': '사용 안 함'}.get)
+    n_clusters = c2.slider('군집 수', min_value=2, max_value=8, value=4, disabled=cluster_method == 'none')
+
+    st.subheader('국가 군집 (PCA 3D)')
+    red = load_reduction(dataset, dataset.version, cluster_method, n_clusters)
+    with perf.span('PCA 3D 생성'):
+        pca_fig = figures.figure_cache().get(('pca_3d', dataset.version, cluster_method, n_clusters),
+                                             lambda: pca_3d_figure(red, dataset.countries))
+    perf.plotly_chart(pca_fig, 'PCA 3D', use_container_width=True, theme='streamlit')
+    st.caption('설명 분산 비율: ' + ', '.join(
+        f'PC{i+1} {v:.1%}' for i, v in enumerate(red.explained_variance_ratio)))
+    with st.expander('주성분 로딩'):
+        st.dataframe(pd.DataFrame(red.loadings.T, index=list(dataset.types),
+                                  columns=[f'PC{i+1}' for i in range(red.loadings.shape[0])]))
+
+
+# 메인 레이아웃: 구역마다 자기 위젯이 바뀔 때만 다시 실행
 col1, col2 = st.columns([1,1])
 
-# 왼쪽: 선택 국가 MBTI (입체 surface)
 with col1:
-    st.subheader(f'{country} — MBTI 분포 (입체)')
-    row = df[df['Country'] == country].iloc[0]
-    labels = mbti_cols
-    values = row[labels].astype(float).values
-
-    # 색 구성: 1등 red, 나머지 그라데이션 (표시용 범례 따로)
-    colors = gradient_colors_except_top(values, top_color='#ff0000')
-
-    # Surface figure
-    surf_fig = country_surface_figure(labels, values)
-
-    # Add a 2D bar below for 정확한 값 표시 (Plotly bar) with color per bar
-    bar_fig = go.Figure()
-    bar_fig.add_trace(go.Bar(x=labels, y=values, marker_color=colors, text=values, textposition='auto'))
-    bar_fig.update_layout(title=f'{country} MBTI 비율 (상세 막대)', xaxis_title='MBTI', yaxis_title='값', margin=dict(l=0,r=0,t=30,b=0))
-
-    st.plotly_chart(surf_fig, use_container_width=True, theme='streamlit')
-    st.plotly_chart(bar_fig, use_container_width=True, theme='streamlit')
+    client_mode = st.toggle('⚡ 브라우저에서 국가 전환 (서버 재실행 없음)', value=False,
+                            disabled=not client.supported(cube))
+    if client_mode and client.supported(cube):
+        switch_fig = figures.figure_cache().get(('client_country', dataset.version),
+                                                lambda: client.country_switcher(cube))
+        perf.plotly_chart(switch_fig, '국가 surface+막대 (클라이언트)', use_container_width=True, theme='streamlit')
+        st.caption('차트 왼쪽 위 목록에서 국가를 고르면 바로 바뀝니다. 비슷한 국가 목록은 전환 모드를 끄면 볼 수 있습니다.')
+    else:
+        country_section(cube, dataset)
 
 # 오른쪽: 전세계 평균 + PCA
 with col2:
-    if show_global:
-        st.subheader('전세계 MBTI 평균 (입체)')
-        gm_fig = global_mean_surface(df[mbti_cols])
-        st.plotly_chart(gm_fig, use_container_width=True, theme='streamlit')
-
-    if show_pca:
-        st.subheader('국가 군집 (PCA 3D)')
-        pca_fig = pca_3d_figure(df[mbti_cols], df['Country'])
-        st.plotly_chart(pca_fig, use_container_width=True, theme='streamlit')
+    global_section(cube, dataset)
+    pca_section(dataset)
 
 # 하단: 요약 통계
 st.markdown('---')
 st.subheader('요약 통계')
-global_stats = df[mbti_cols].agg(['mean','std','min','max']).T.reset_index().rename(columns={'index':'MBTI'})
+global_stats = cube.summary_frame
 st.dataframe(global_stats)
 
 # 끝: 다운로드 버튼 및 requirements 안내
@@ -186,7 +234,7 @@ streamlit
 pandas
 numpy
 plotly
-scikit-learn
 ''', language='text')
 
 st.markdown('앱 준비 완료. 동일 폴더에 `countriesMBTI_16types.csv`가 있어야 합니다.')
+perf.finish()
@@ -1,12 +1,17 @@
+import os
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
 
+from utils import bootstrap, correlation, data, figures, indicators, ingest, perf, resultcache, rollup, scatter
+
 # ==============================
 # 페이지 설정
 # ==============================
 st.set_page_config(page_title="상관관계 분석 도구", layout="wide")
+perf.begin("03_correlation")
 st.markdown(
     """
     <style>
@@ -37,8 +42,91 @@ st.markdown("""
 # 데이터 불러오기
 # ==============================
 default_path = "fitness data.xlsx"
-st.info(f"기본 데이터 사용 중: `{default_path}`")
-df = pd.read_excel(default_path)
+
+@perf.cached(st.cache_data, show_spinner="데이터를 Parquet으로 변환하는 중...")
+def ingest_default(path, stamp):
+    # stamp(mtime, 크기)가 같으면 해시 계산 없이 바로 캐시 경로 반환
+    return ingest.ingest(path)
+
+@perf.cached(st.cache_data, show_spinner="업로드 파일을 Parquet으로 변환하는 중...")
+def ingest_upload(filename, digest, _content):
+    return ingest.ingest(_content, filename)
+
+@perf.cached(st.cache_resource)
+def load_numeric(parquet_path):
+    # Parquet 스키마에서 수치형 열만 골라 그 열만 읽음
+    return ingest.read_columns(parquet_path, ingest.numeric_columns(parquet_path))
+
+uploaded = st.file_uploader("CSV / XLSX / Parquet 파일 업로드 (선택)", type=["csv", "xlsx", "parquet"])
+if uploaded is not None:
+    content = uploaded.getvalue()
+    st.info(f"업로드한 데이터 사용 중: `{uploaded.name}`")
+    parquet_path = ingest_upload(uploaded.name, ingest.source_hash(content), content)
+elif os.path.exists(default_path):
+    st.info(f"기본 데이터 사용 중: `{default_path}`")
+    parquet_path = ingest_default(default_path, data.dataset_stamp(default_path))
+else:
+    st.error(f"기본 데이터 파일 `{default_path}`이(가) 없습니다. 분석할 파일을 업로드하세요.")
+    st.stop()
+df = load_numeric(parquet_path)
+
+@perf.cached(st.cache_resource)
+@resultcache.cached()
+def load_ranks(parquet_path):
+    # 열 순위는 데이터별 1회만 계산 (스피어만 = 순위 행렬의 피어슨)
+    frame = load_numeric(parquet_path)
+    cols = frame.select_dtypes(include=[np.number]).columns.tolist()
+    return pd.DataFrame(correlation.rank_columns(frame[cols]), columns=cols)
+
+@perf.cached(st.cache_resource)
+@resultcache.cached()
+def load_top_pairs(parquet_path, method="pearson", k=10):
+    # 데이터(Parquet 내용 해시)와 방식별 1회 계산, X/Y 선택 변경 시에는 재계산하지 않음
+    frame = load_numeric(parquet_path)
+    cols = frame.select_dtypes(include=[np.number]).columns.tolist()
+    ranks = load_ranks(parquet_path).to_numpy() if method == "spearman" else None
+    i, j, r = correlation.method_top_k_pairs(frame[cols], method, k=k, ranks=ranks)
+    return [(cols[a], cols[b], v, abs(v)) for a, b, v in zip(i, j, r)]
+
+@perf.cached(st.cache_data)
+@resultcache.cached()
+def pair_corr(parquet_path, x, y, method):
+    frame = load_numeric(parquet_path)
+    if method == "spearman" and not frame[[x, y]].isna().any().any():
+        ranks = load_ranks(parquet_path)
+        return correlation.pair_corr(ranks[x].to_numpy(), ranks[y].to_numpy(), "pearson")
+    return correlation.pair_corr(frame[x].to_numpy(), frame[y].to_numpy(), method)
+
+@perf.cached(st.cache_data, show_spinner="부트스트랩 신뢰구간 계산 중...")
+@resultcache.cached()
+def bootstrap_stats(parquet_path, pairs, method, n_resamples, seed):
+    # (데이터, 속성쌍, 방식, 반복 수, seed) 별로 캐시 -> 같은 seed면 재계산 없음
+    frame = load_numeric(parquet_path)
+    cols = list(dict.fromkeys(c for pair in pairs for c in pair))
+    pos = {c: i for i, c in enumerate(cols)}
+    return bootstrap.bootstrap_pairs(frame[cols].to_numpy(dtype=float, na_value=np.nan),
+                                     [(pos[a], pos[b]) for a, b in pairs],
+                                     method, n_resamples, seed)
+
+CORR_METHOD_LABELS = {
+    "pearson": "피어슨 (선형)",
+    "spearman": "스피어만 (순위)",
+    "kendall": "켄달 tau-b (순위)",
+}
+
+@perf.cached(st.cache_data)
+@resultcache.cached()
+def fit_pair(parquet_path, x, y):
+    # 열 쌍별 OLS(기울기, 절편, R²)를 전체 데이터로 1회 계산
+    frame = load_numeric(parquet_path)
+    return scatter.ols_fit(frame[x].to_numpy(), frame[y].to_numpy())
+
+SCATTER_MODE_LABELS = {
+    "auto": "자동",
+    "points": "모든 점",
+    "density": "밀도 (2D 히스토그램)",
+    "sample": "층화 표본",
+}
 
 # 수치형 변수 필터링
 numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
@@ -49,24 +137,40 @@ if len(numeric_cols) < 2:
 # ==============================
 # 1️⃣ 개별 속성 간 상관관계 분석
 # ==============================
+corr_method = st.radio("상관계수 방식", list(CORR_METHOD_LABELS),
+                       format_func=CORR_METHOD_LABELS.get, horizontal=True)
+relation_kind = "선형" if corr_method == "pearson" else "단조(순위)"
+with st.expander("불확실성 (부트스트랩 신뢰구간 / 순열 검정) 설정"):
+    n_resamples = st.select_slider("반복 수", options=[1000, 2000, 5000, 10000], value=2000)
+    boot_seed = st.number_input("난수 seed", min_value=0, value=0, step=1)
+show_uncertainty = corr_method in bootstrap.METHODS
+
+scatter_mode = st.radio("산점도 표시 방식", list(SCATTER_MODE_LABELS),
+                        format_func=SCATTER_MODE_LABELS.get, horizontal=True)
+if scatter_mode == "auto":
+    scatter_mode = scatter.choose_mode(len(df))
+    if scatter_mode != "points":
+        st.caption(f"행 수가 {scatter.POINT_LIMIT:,}개를 넘어 밀도 모드로 표시합니다. 추세선은 전체 데이터 기준입니다.")
+
 st.header("1️⃣ 두 속성 간 상관관계 분석")
 col1, col2 = st.columns(2)
 x_col = col1.selectbox("X축 속성 선택", numeric_cols)
 y_col = col2.selectbox("Y축 속성 선택", numeric_cols, index=min(1, len(numeric_cols)-1))
 
 if x_col and y_col:
-    corr_value = df[x_col].corr(df[y_col])
+    corr_value = pair_corr(parquet_path, x_col, y_col, corr_method)
     st.subheader(f"📊 {x_col} vs {y_col}")
 
-    fig = px.scatter(df, x=x_col, y=y_col, trendline="ols",
-                     opacity=0.7,
-                     title=f"{x_col} ↔ {y_col} 산점도 (상관계수: {corr_value:.4f})",
-                     labels={x_col: x_col, y_col: y_col},
-                     color_discrete_sequence=["#AEC6CF"])  # 파스텔 블루
-    fig.update_traces(marker=dict(size=10, color="#AEC6CF"),
-                      selector=dict(mode='markers'))
-    fig.update_traces(line=dict(color="#FFB347"), selector=dict(mode='lines'))  # 파스텔 오렌지
-    st.plotly_chart(fig, use_container_width=True)
+    fit = fit_pair(parquet_path, x_col, y_col)
+    with perf.span("산점도 생성"):
+        fig = scatter.scatter_figure(
+            df[x_col].to_numpy(), df[y_col].to_numpy(), x_col, y_col,
+            fit, scatter_mode,
+            point_color="#AEC6CF",  # 파스텔 블루
+            line_color="#FFB347",   # 파스텔 오렌지
+            title=f"{x_col} ↔ {y_col} 산점도 (상관계수: {corr_value:.4f})",
+        )
+    perf.plotly_chart(fig, "산점도", use_container_width=True)
 
     # 상관관계 해석
     def interpret_corr(r):
@@ -83,41 +187,53 @@ if x_col and y_col:
     direction, strength = interpret_corr(corr_value)
     relation_text = (
         f"**상관계수:** {corr_value:.4f}\n\n"
-        f"- 두 변수는 **{direction}({strength})** 관계입니다.\n"
+        f"- 두 변수는 **{relation_kind} {direction}({strength})** 관계입니다.\n"
         f"- 즉, `{x_col}`이 증가하면 `{y_col}`은 "
         f"{'함께 증가' if corr_value>0 else '감소' if corr_value<0 else '별다른 변화 없음'}하는 경향이 있습니다."
     )
     st.markdown(relation_text)
 
+    if show_uncertainty and x_col != y_col:
+        res = bootstrap_stats(parquet_path, ((x_col, y_col),), corr_method, n_resamples, int(boot_seed))[0]
+        st.markdown(
+            f"- {bootstrap.CONFIDENCE:.0%} 부트스트랩 신뢰구간: **[{res.ci_low:.4f}, {res.ci_high:.4f}]** "
+            f"/ 순열 검정 p-value: **{res.p_value:.4f}** (반복 {res.n_resamples:,}회)"
+        )
+        if res.ci_low <= 0 <= res.ci_high:
+            st.warning("신뢰구간이 0을 포함합니다. 이 상관관계는 우연에 의한 것일 수 있습니다.")
+    elif not show_uncertainty:
+        st.caption("부트스트랩 신뢰구간은 피어슨/스피어만 방식에서만 제공합니다.")
+
 # ==============================
 # 2️⃣ 상관계수 Top10 속성쌍 분석
 # ==============================
 st.header("2️⃣ 상관계수 상위 10개 속성쌍 분석")
 
-corr_matrix = df[numeric_cols].corr()
-pairs = []
-for i in range(len(numeric_cols)):
-    for j in range(i + 1, len(numeric_cols)):
-        a, b = numeric_cols[i], numeric_cols[j]
-        val = corr_matrix.loc[a, b]
-        pairs.append((a, b, val, abs(val)))
-
-top_pairs = sorted(pairs, key=lambda x: x[3], reverse=True)[:10]
+top_pairs = load_top_pairs(parquet_path, corr_method)
 top_df = pd.DataFrame(top_pairs, columns=["속성1", "속성2", "상관계수", "절대값"])
-st.dataframe(top_df.style.format({"상관계수": "{:.4f}", "절대값": "{:.4f}"}))
+if show_uncertainty and top_pairs:
+    boot_results = bootstrap_stats(parquet_path, tuple((a, b) for a, b, _, _ in top_pairs),
+                                   corr_method, n_resamples, int(boot_seed))
+    top_df["CI 하한"] = [r.ci_low for r in boot_results]
+    top_df["CI 상한"] = [r.ci_high for r in boot_results]
+    top_df["p-value"] = [r.p_value for r in boot_results]
+st.dataframe(top_df.style.format({"상관계수": "{:.4f}", "절대값": "{:.4f}", "CI 하한": "{:.4f}",
+                                  "CI 상한": "{:.4f}", "p-value": "{:.4f}"}))
 
 pair_options = [f"{a} ↔ {b} (r={v:.3f})" for a, b, v, _ in top_pairs]
 selected_pair = st.selectbox("상관관계가 높은 속성쌍 선택", pair_options)
 
 # Top10 속성 전체 히트맵 생성
-top_attrs = list(set([a for a, b, _, _ in top_pairs] + [b for a, b, _, _ in top_pairs]))
+top_attrs = list(dict.fromkeys([a for a, b, _, _ in top_pairs] + [b for a, b, _, _ in top_pairs]))
 st.subheader("📊 Top10 속성 전체 히트맵")
+with perf.span("Top10 상관 행렬"):
+    top_corr = correlation.method_corr_matrix(df[top_attrs], corr_method)
 fig_heat = px.imshow(
-    corr_matrix.loc[top_attrs, top_attrs],
+    pd.DataFrame(top_corr, index=top_attrs, columns=top_attrs),
     color_continuous_scale=px.colors.sequential.Peach
 )
 fig_heat.update_layout(coloraxis_colorbar=dict(title="상관계수"))
-st.plotly_chart(fig_heat, use_container_width=True)
+perf.plotly_chart(fig_heat, "Top10 히트맵", use_container_width=True)
 
 if selected_pair:
     idx = pair_options.index(selected_pair)
@@ -125,13 +241,15 @@ if selected_pair:
     st.subheader(f"📈 {a} ↔ {b} (r={v:.4f})")
 
     # 산점도 출력
-    fig2 = px.scatter(df, x=a, y=b, trendline="ols",
-                      opacity=0.7,
-                      color_discrete_sequence=["#77DD77"])  # 파스텔 그린
-    fig2.update_traces(marker=dict(size=10, color="#77DD77"),
-                       selector=dict(mode='markers'))
-    fig2.update_traces(line=dict(color="#FF6961"), selector=dict(mode='lines'))  # 파스텔 레드
-    st.plotly_chart(fig2, use_container_width=True)
+    fit2 = fit_pair(parquet_path, a, b)
+    with perf.span("속성쌍 산점도 생성"):
+        fig2 = scatter.scatter_figure(
+            df[a].to_numpy(), df[b].to_numpy(), a, b,
+            fit2, scatter_mode,
+            point_color="#77DD77",  # 파스텔 그린
+            line_color="#FF6961",   # 파스텔 레드
+        )
+    perf.plotly_chart(fig2, "속성쌍 산점도", use_container_width=True)
 
     sign_text = "양의 상관관계" if v > 0 else "음의 상관관계"
     degree_text = (
@@ -142,8 +260,88 @@ if selected_pair:
         "거의 없음"
     )
 
-    st.markdown(f"**상관관계 유형:** {sign_text} ({degree_text})")
+    st.markdown(f"**상관관계 유형:** {relation_kind} {sign_text} ({degree_text})")
     st.markdown(f"**해석:** `{a}`가 증가할수록 `{b}`는 {'함께 증가' if v > 0 else '감소'}하는 경향이 있습니다.")
 
+# ==============================
+# 3️⃣ MBTI 유형 × 국가 지표 상관관계
+# ==============================
+st.header("3️⃣ MBTI 유형 × 국가 지표 상관관계")
+st.markdown("`countriesMBTI_16types.csv` 의 16유형 비율과 국가별 외부 지표(GDP, 행복 지수 등)를 국가 이름으로 결합해 "
+            "16 × 지표 상관 블록을 계산합니다. 지표의 결측은 쌍마다 공통 국가만으로 계산합니다.")
+HEATMAP_LIMIT = 40          # 히트맵에 보일 최대 지표 수 (|r| 이 큰 지표 우선)
+
+@perf.cached(st.cache_resource)
+def load_mbti(stamp):
+    return data.load_dataset(data.DEFAULT_CSV)
+
+@perf.cached(st.cache_data)
+def join_indicator_table(_dataset, version, indicator_path, country_col):
+    return indicators.join_indicators(_dataset.countries, pd.read_parquet(indicator_path), country_col)
+
+@perf.cached(st.cache_data)
+@resultcache.cached()
+def indicator_corr(_dataset, version, indicator_path, country_col, method):
+    # (MBTI 버전, 지표 파일, 국가 열, 방식) 별 1회: 마스크 행렬곱 한 번으로 16 × 지표 전체
+    joined = join_indicator_table(_dataset, version, indicator_path, country_col)
+    return indicators.cross_corr(_dataset.values, joined.values, method)
+
+mbti_dataset = load_mbti(data.dataset_stamp(data.DEFAULT_CSV))
+indicator_file = st.file_uploader("국가 지표 파일 업로드 (국가 열 + 수치형 지표 열)", type=["csv", "xlsx", "parquet"],
+                                  key="indicator_file")
+if indicator_file is not None:
+    indicator_content = indicator_file.getvalue()
+    indicator_path = ingest_upload(indicator_file.name, ingest.source_hash(indicator_content), indicator_content)
+else:
+    st.caption(f"지표 파일이 없으면 `{rollup.DEFAULT_REGIONS}` 의 인구를 예시 지표로 사용합니다.")
+    indicator_path = ingest_default(rollup.DEFAULT_REGIONS, data.dataset_stamp(rollup.DEFAULT_REGIONS))
+
+indicator_text_cols = ingest.text_columns(indicator_path)
+if not indicator_text_cols:
+    st.error("지표 파일에 국가 이름 열(문자열)이 없습니다.")
+else:
+    guess = indicators.find_country_column(pd.DataFrame(columns=indicator_text_cols))
+    country_col = st.selectbox("국가 이름 열", indicator_text_cols, index=indicator_text_cols.index(guess))
+    indicator_method = corr_method if corr_method in indicators.METHODS else "spearman"
+    if indicator_method != corr_method:
+        st.caption("켄달 방식은 지표 교차 상관에서 지원하지 않아 스피어만으로 계산합니다.")
+
+    joined = join_indicator_table(mbti_dataset, mbti_dataset.version, indicator_path, country_col)
+    with perf.span("지표 교차 상관"):
+        cross_r, cross_n = indicator_corr(mbti_dataset, mbti_dataset.version, indicator_path, country_col,
+                                          indicator_method)
+    m1, m2, m3 = st.columns(3)
+    m1.metric("결합된 국가", f"{joined.matched} / {len(mbti_dataset.countries)}")
+    m2.metric("수치형 지표", len(joined.indicators))
+    m3.metric("맞지 않은 지표 행", len(joined.unmatched))
+    if joined.unmatched or joined.missing:
+        with st.expander("국가 이름 결합 결과"):
+            st.markdown("**지표 표에만 있는 이름:** " + (", ".join(joined.unmatched) or "없음"))
+            st.markdown("**지표가 없는 MBTI 국가:** " + (", ".join(joined.missing) or "없음"))
+
+    if joined.indicators:
+        shown = indicators.strongest_columns(cross_r, HEATMAP_LIMIT)
+        if len(shown) < len(joined.indicators):
+            st.caption(f"지표 {len(joined.indicators):,}개 중 |상관계수|가 큰 {len(shown)}개만 히트맵에 표시합니다.")
+
+        def cross_heatmap():
+            fig = px.imshow(
+                pd.DataFrame(cross_r[:, shown], index=list(mbti_dataset.types),
+                             columns=[joined.indicators[k] for k in shown]),
+                color_continuous_scale="RdBu_r", zmin=-1, zmax=1, aspect="auto",
+            )
+            fig.update_layout(coloraxis_colorbar=dict(title="상관계수"),
+                              height=max(450, 28 * len(mbti_dataset.types)))
+            return fig
+
+        with perf.span("MBTI×지표 히트맵 생성"):
+            fig_cross = figures.figure_cache().get(
+                ("indicator_heatmap", mbti_dataset.version, indicator_path, country_col, indicator_method),
+                cross_heatmap)
+        perf.plotly_chart(fig_cross, "MBTI×지표 히트맵", use_container_width=True)
+        st.dataframe(indicators.top_cells(cross_r, cross_n, mbti_dataset.types, joined.indicators)
+                     .style.format({"상관계수": "{:.4f}"}), hide_index=True)
+
 st.markdown("---")
-st.markdown("출처: Pandas(Pearson 상관계수), Plotly(시각화), Streamlit(인터페이스)")
+st.markdown(f"출처: NumPy({CORR_METHOD_LABELS[corr_method]} 상관계수), Plotly(시각화), Streamlit(인터페이스)")
+perf.finish()
@@ -0,0 +1,63 @@
+import streamlit as st
+
+from utils import cube as mbti_cube, data, figures, geo, perf
+
+st.set_page_config(page_title="MBTI 세계 지도", layout="wide")
+perf.begin("04_world_map")
+
+st.title("🗺️ 세계 지도로 보는 MBTI 유형")
+
+COLOR_LABELS = {"share": "유형별 비율", "top": "국가별 최다 유형"}
+LEVEL_LABELS = {"low": "낮음 (가장 빠름)", "medium": "보통", "high": "높음 (경계가 정밀)"}
+
+
+@perf.cached(st.cache_resource)
+def load_dataset(stamp, path=data.DEFAULT_CSV):
+    return data.load_dataset(path)
+
+
+@perf.cached(st.cache_resource)
+def load_cube(_dataset, version):
+    return mbti_cube.build_cube(_dataset.values, _dataset.countries, _dataset.types)
+
+
+@perf.cached(st.cache_resource)
+def load_geojson(_countries, version, geo_stamp, level):
+    # 단순화 + 이름 결합은 (경계 파일, 데이터, 수준) 별 1회, 결과는 .cache/geo/ 에도 저장
+    return geo.simplified_geojson(_countries, level)
+
+
+dataset = load_dataset(data.dataset_stamp(data.DEFAULT_CSV))
+version = dataset.version
+cube = load_cube(dataset, version)
+
+col1, col2 = st.columns(2)
+mode = col1.radio("색 기준", geo.MODES, format_func=COLOR_LABELS.get, horizontal=True)
+has_geometry = geo.available()
+level = col2.selectbox("경계 세부 수준", tuple(geo.TOLERANCES), index=0, format_func=LEVEL_LABELS.get,
+                       disabled=not has_geometry)
+
+geojson, geo_stamp = None, None
+if has_geometry:
+    geo_stamp = data.dataset_stamp(geo.WORLD_GEOJSON)
+    with perf.span("경계 불러오기"):
+        geojson = load_geojson(dataset.countries, version, geo_stamp, level)
+else:
+    st.caption(f"`{geo.WORLD_GEOJSON}` 이 없어 Plotly 내장 국경으로 그립니다 (국가 이름으로 결합).")
+
+built = []
+with perf.span("세계 지도 figure"):
+    fig = figures.figure_cache().get(
+        ("world_map", mode, geo_stamp and level, geo_stamp, version),
+        lambda: built.append(1) or geo.world_choropleth(cube, mode, geojson))
+perf.record_cache("figure:world_map", hit=not built)
+perf.plotly_chart(fig, "세계 지도", use_container_width=True)
+
+if mode == "share":
+    st.caption("드롭다운에서 유형을 바꾸면 브라우저에서 색만 바뀝니다 (서버 재실행 없음).")
+if geojson is not None:
+    shown = {f["id"] for f in geojson["features"]}
+    hidden = [c for c in cube.countries if c not in shown]
+    st.caption(f"지도에 표시된 국가 {len(shown):,} / {len(cube.countries):,}"
+               + (f" (경계 축척이 작아 빠진 나라: {', '.join(hidden)})" if hidden else ""))
+perf.finish()
@@ -0,0 +1,145 @@
+"""상관계수의 부트스트랩 신뢰구간과 순열 검정 p-value.
+
+복원 추출 재표본은 (반복 수 × n) 가중치(각 행이 뽑힌 횟수) 행렬 W로 표현해
+`W @ [x, y, x², y², xy, mask]` 행렬곱 한 번으로 모든 속성쌍의 재표본 상관계수를 구합니다.
+순열 검정은 표준화한 x와 섞은 y의 내적으로 계산합니다 (순열은 평균/노름을 바꾸지 않음).
+재표본은 크기가 데이터로만 정해지는 묶음으로 나눠 공유 스레드 풀(`workers`)에서 계산하고 쌍별 통계를 이어 붙입니다.
+묶음마다 seed에서 갈라낸 난수열을 쓰고, 결측 쌍의 순열은 쌍 위치별로 따로 갈라내므로
+워커 수와 상관없이 같은 seed는 같은 결과를 냅니다.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from utils import correlation, workers
+
+METHODS = ("pearson", "spearman")   # 켄달은 재표본마다 정렬이 필요해 제외
+DEFAULT_RESAMPLES = 10_000
+CONFIDENCE = 0.95
+_MAX_BATCH_CELLS = 1_000_000     # 묶음 하나의 가중치 행렬 크기 (워커마다 하나씩 잡힘)
+_BATCH_RESAMPLES = 1_000        # 묶음 하나의 최대 재표본 수 (작은 데이터도 여러 워커로 나뉘도록)
+
+
+@dataclass(frozen=True)
+class BootstrapResult:
+    r: float
+    ci_low: float
+    ci_high: float
+    p_value: float
+    n_resamples: int
+
+
+def _features(X, pairs):
+    """쌍마다 [x, y, x², y², xy, mask] 열 (결측 쌍은 0/마스크 0)"""
+    cols = []
+    for i, j in pairs:
+        m = ~(np.isnan(X[:, i]) | np.isnan(X[:, j]))
+        x = np.where(m, X[:, i], 0.0)
+        y = np.where(m, X[:, j], 0.0)
+        cols += [x, y, x * x, y * y, x * y, m.astype(np.float64)]
+    return np.column_stack(cols)
+
+
+def _corr_from_sums(S):
+    """(B, 6) 합계 -> (B,) 상관계수"""
+    sx, sy, sxx, syy, sxy, n = S.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / n
+        r = cov / np.sqrt((sxx - sx * sx / n) * (syy - sy * sy / n))
+    return np.clip(r, -1.0, 1.0)
+
+
+def _resample_weights(rng, b, n):
+    """복원 추출 b번 -> (b, n) 뽑힌 횟수 행렬"""
+    idx = rng.integers(0, n, size=(b, n))
+    idx += (np.arange(b) * n)[:, None]
+    return np.bincount(idx.ravel(), minlength=b * n).reshape(b, n).astype(np.float64)
+
+
+def _standardized(x):
+    x = x - x.mean()
+    norm = np.sqrt(x @ x)
+    return x / norm if norm > 0 else x
+
+
+def _batch_job(job):
+    """재표본 묶음 하나 -> ((b, 쌍 수) 재표본 상관계수, 쌍별 순열 극단값 수)
+
+    묶음마다 받은 SeedSequence 를 [재표본, 공유 순열, 쌍 0, 쌍 1, ...] 으로 나누므로
+    결측 쌍의 순열은 (묶음 번호, 호출자 목록에서의 쌍 위치) 로만 정해진다.
+    """
+    F, Z, full, r, b, seq = job
+    n = F.shape[0]
+    boot_ss, shared_ss, *pair_ss = seq.spawn(2 + len(Z))
+    S = _resample_weights(np.random.default_rng(boot_ss), b, n) @ F      # (b, 6 * 쌍 수)
+    boot = np.column_stack([_corr_from_sums(S[:, 6 * k:6 * k + 6]) for k in range(len(Z))])
+
+    shared = np.random.default_rng(shared_ss).permuted(np.broadcast_to(np.arange(n), (b, n)), axis=1)
+    extreme = np.zeros(len(Z), dtype=np.int64)
+    for k, (zx, zy) in enumerate(Z):
+        if full[k]:
+            perm = shared
+        else:
+            perm = np.random.default_rng(pair_ss[k]).permuted(np.broadcast_to(np.arange(len(zy)), (b, len(zy))), axis=1)
+        extreme[k] = np.count_nonzero(np.abs(zy[perm] @ zx) >= abs(r[k]) - 1e-12)
+    return boot, extreme
+
+
+def _batch_jobs(X, pairs, n_resamples, seed):
+    F = _features(X, pairs)
+    full = F[:, 5::6].all(axis=0)                  # 결측 없는 쌍 (순열 공유 가능)
+    r = np.array([_corr_from_sums(F[:, 6 * k:6 * k + 6].sum(axis=0)[None, :])[0] for k in range(len(pairs))])
+    Z = []
+    for k, (i, j) in enumerate(pairs):
+        m = F[:, 6 * k + 5] > 0
+        Z.append((_standardized(X[m, i]), _standardized(X[m, j])))
+    # 묶음 크기는 데이터 크기로만 정해지므로 워커 수가 바뀌어도 같은 seed는 같은 재표본/순열을 만든다
+    batch = max(1, min(_BATCH_RESAMPLES, _MAX_BATCH_CELLS // max(X.shape[0], 1)))
+    starts = range(0, n_resamples, batch)
+    seqs = np.random.SeedSequence(seed).spawn(len(starts))
+    jobs = [(F, Z, full, r, min(batch, n_resamples - s), seq) for s, seq in zip(starts, seqs)]
+    return r, jobs
+
+
+def _summarize(r, results, n_resamples, confidence):
+    boot = np.concatenate([b for b, _ in results])
+    extreme = np.sum([e for _, e in results], axis=0)
+    alpha = (1 - confidence) / 2
+    lo, hi = np.nanquantile(boot, [alpha, 1 - alpha], axis=0)
+    return [
+        BootstrapResult(float(r[k]), float(lo[k]), float(hi[k]), float((extreme[k] + 1) / (n_resamples + 1)), n_resamples)
+        for k in range(len(r))
+    ]
+
+
+def bootstrap_pairs_serial(X, pairs, n_resamples=DEFAULT_RESAMPLES, seed=0, confidence=CONFIDENCE):
+    X = np.asarray(X, dtype=np.float64)
+    r, jobs = _batch_jobs(X, pairs, n_resamples, seed)
+    return _summarize(r, [_batch_job(job) for job in jobs], n_resamples, confidence)
+
+
+def _prepare(X, method):
+    if method not in METHODS:
+        raise ValueError(f"부트스트랩을 지원하지 않는 방식: {method!r} (가능: {', '.join(METHODS)})")
+    X = np.asarray(X, dtype=np.float64)
+    if method == "spearman":
+        # 원본 순위를 재표본에 그대로 사용 (재표본마다 다시 순위를 매기지 않는 근사)
+        X = correlation.rank_columns(X)
+    return X
+
+
+def bootstrap_pairs(X, pairs, method="pearson", n_resamples=DEFAULT_RESAMPLES, seed=0, processes=None):
+    """(i, j) 열 쌍들의 부트스트랩 결과, 재표본 묶음이 여럿이면 공유 스레드 풀로 분할"""
+    X = _prepare(X, method)
+    pairs = [tuple(p) for p in pairs]
+    r, jobs = _batch_jobs(X, pairs, n_resamples, seed)
+    if min(processes or workers.max_workers(), len(jobs)) <= 1:
+        results = [_batch_job(job) for job in jobs]
+    else:
+        results = workers.map_jobs(_batch_job, jobs)
+    return _summarize(r, results, n_resamples, CONFIDENCE)
+
+
+def bootstrap_corr(x, y, method="pearson", n_resamples=DEFAULT_RESAMPLES, seed=0):
+    return bootstrap_pairs(np.column_stack([x, y]), [(0, 1)], method, n_resamples, seed, processes=1)[0]
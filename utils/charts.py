@@ -0,0 +1,117 @@
+"""전체 국가 비교 차트의 렌더링 방식 선택.
+
+국가 수가 늘면 `barmode="group"` 막대 그래프는 국가마다 trace가 하나씩 생겨
+figure JSON과 브라우저 렌더링 비용이 선형으로 커집니다.
+figure를 만들기 전에 payload 크기를 추정해 예산 안에서 가장 자세한 방식을 고릅니다.
+
+- ``grouped``: 기존 국가별 그룹 막대 (국가 수만큼 trace)
+- ``heatmap``: 국가 × 유형 단일 trace 히트맵
+- ``top_n``: 유형별 상위 N개국 + 나머지 평균("기타"), 국가 수와 무관하게 크기 일정
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+
+MODES = ("grouped", "heatmap", "top_n")
+DEFAULT_BUDGET_BYTES = 200_000
+
+# `fig.to_json()` 실측(국가 158~7,900개, 16유형)에 맞춘 JSON 크기 (레이아웃/템플릿 고정 비용 포함)
+_BASE_BYTES = 7_000
+_GROUPED_TRACE_BYTES = 200
+_GROUPED_BAR_BYTES = 25
+_HEATMAP_ROW_BYTES = 24     # y 라벨(국가 이름)
+_HEATMAP_CELL_BYTES = 5
+_TOP_N_BAR_BYTES = 38       # 다중 범주 x 라벨 두 개 + 값
+
+
+def estimate_payload(mode, n_countries, n_types, top_n=10):
+    if mode == "grouped":
+        return _BASE_BYTES + n_countries * (_GROUPED_TRACE_BYTES + n_types * _GROUPED_BAR_BYTES)
+    if mode == "heatmap":
+        return _BASE_BYTES + n_countries * (_HEATMAP_ROW_BYTES + n_types * _HEATMAP_CELL_BYTES)
+    return _BASE_BYTES + n_types * (top_n + 1) * _TOP_N_BAR_BYTES
+
+
+def choose_mode(n_countries, n_types, budget=DEFAULT_BUDGET_BYTES, top_n=10):
+    """예산 안에 들어가는 첫 번째 방식 (grouped -> heatmap -> top_n)"""
+    for mode in MODES[:-1]:
+        if estimate_payload(mode, n_countries, n_types, top_n) <= budget:
+            return mode
+    return "top_n"
+
+
+def grouped_bar_figure(cube):
+    import plotly.express as px
+
+    fig = px.bar(
+        cube.long_frame,
+        x="MBTI",
+        y="비율",
+        color="Country",
+        barmode="group",
+        title="국가별 MBTI 평균 비율 비교"
+    )
+    fig.update_layout(title_x=0.5, plot_bgcolor="#fff")
+    return fig
+
+
+def heatmap_figure(cube):
+    fig = go.Figure(go.Heatmap(
+        z=cube.values,
+        x=list(cube.types),
+        y=list(cube.countries),
+        colorscale="RdYlBu_r",
+        colorbar=dict(title="비율"),
+        hovertemplate="%{y}<br>%{x}: %{z:.4f}<extra></extra>",
+    ))
+    fig.update_layout(
+        title="국가별 MBTI 평균 비율 비교 (히트맵)",
+        title_x=0.5,
+        height=max(500, min(16 * len(cube.countries), 4000)),
+        yaxis=dict(autorange="reversed"),
+        plot_bgcolor="#fff",
+    )
+    return fig
+
+
+def top_n_figure(cube, n=10):
+    """유형별 상위 n개국과 나머지 국가 평균을 다중 범주 x축 단일 trace로 그림"""
+    n = min(n, len(cube.countries))
+    top_idx = cube.rank_by_type[:, :n]                        # (유형, n)
+    cols = np.arange(len(cube.types))[:, None]
+    top_vals = cube.values[top_idx, cols]                     # (유형, n)
+    rest_idx = cube.rank_by_type[:, n:]
+    if rest_idx.shape[1]:
+        rest_mean = np.nanmean(cube.values[rest_idx, cols], axis=1)
+    else:
+        rest_mean = np.full(len(cube.types), np.nan)
+
+    names = np.asarray(cube.countries, dtype=object)[top_idx]
+    labels = np.column_stack([names, np.full(len(cube.types), "기타(평균)", dtype=object)])
+    values = np.column_stack([top_vals, rest_mean])
+    types = np.repeat(np.asarray(cube.types, dtype=object), n + 1)
+    colors = np.tile(np.r_[np.zeros(n), 1.0], len(cube.types))
+
+    fig = go.Figure(go.Bar(
+        x=[types, labels.reshape(-1)],
+        y=values.reshape(-1),
+        marker=dict(color=colors, colorscale=[[0, "#636efa"], [1, "#bbbbbb"]]),
+        hovertemplate="%{x}<br>비율: %{y:.4f}<extra></extra>",
+    ))
+    fig.update_layout(
+        title=f"유형별 상위 {n}개국 MBTI 비율 (나머지는 평균)",
+        title_x=0.5,
+        plot_bgcolor="#fff",
+        xaxis=dict(tickangle=-60),
+    )
+    return fig
+
+
+def all_countries_figure(cube, mode, top_n=10):
+    if mode == "grouped":
+        return grouped_bar_figure(cube)
+    if mode == "heatmap":
+        return heatmap_figure(cube)
+    if mode == "top_n":
+        return top_n_figure(cube, top_n)
+    raise ValueError(f"알 수 없는 렌더링 방식: {mode!r} (가능: {', '.join(MODES)})")
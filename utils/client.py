@@ -0,0 +1,120 @@
+"""클라이언트 전환 모드: 모든 국가/유형 데이터를 figure 하나에 실어 보내고 브라우저에서 전환.
+
+Plotly `updatemenus` 드롭다운의 각 버튼이 trace 데이터(restyle)와 제목(relayout)을 들고 있어,
+국가나 유형을 바꿔도 Streamlit 스크립트가 다시 실행되지 않고 서버 왕복도 없습니다.
+값 행렬이 작을 때(국가 CLIENT_LIMIT 개 이하)만 쓰며, 그보다 크면 서버 렌더링 방식을 씁니다.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly import colors as pcolors
+from plotly.subplots import make_subplots
+
+from utils.figures import gradient_colors_except_top
+
+CLIENT_LIMIT = 400          # 드롭다운 버튼 수 / payload 를 감당할 수 있는 최대 국가 수
+DECIMALS = 4                # 버튼에 싣는 값의 자릿수 (원본 CSV 와 같은 정밀도)
+
+
+def supported(cube):
+    return 0 < len(cube.countries) <= CLIENT_LIMIT and len(cube.types) > 0
+
+
+def _round(values):
+    return np.round(np.asarray(values, dtype=float), DECIMALS).tolist()
+
+
+def _dropdown(buttons, active):
+    return [dict(type="dropdown", buttons=buttons, active=active, showactive=True,
+                 x=0.0, xanchor="left", y=1.18, yanchor="top")]
+
+
+def _country_order(cube):
+    names = cube.sorted_countries
+    return names, [cube.country_index[c] for c in names]
+
+
+def pie_switcher(cube, initial=None):
+    """국가 선택 드롭다운이 달린 MBTI 비율 파이 차트 (main.py 국가별 분포)"""
+    names, rows = _country_order(cube)
+    types = list(cube.types)
+    palette = pcolors.qualitative.Safe
+    colors = [palette[j % len(palette)] for j in range(len(types))]
+
+    def state(i):
+        top = int(cube.order_by_country[i, 0])
+        pull = [0.1 if j == top else 0 for j in range(len(types))]
+        title = f"🇨🇳 {cube.countries[i]}의 MBTI 비율 분포 (최다 유형: {types[top]})"
+        return {"values": [_round(cube.values[i])], "pull": [pull]}, {"title.text": title}
+
+    start = names.index(initial) if initial in names else 0
+    data, layout = state(rows[start])
+    fig = go.Figure(go.Pie(labels=types, values=data["values"][0], pull=data["pull"][0], sort=True,
+                           marker=dict(colors=colors), textinfo="percent+label"))
+    buttons = [dict(label=name, method="update", args=list(state(i))) for name, i in zip(names, rows)]
+    fig.update_layout(title=dict(text=layout["title.text"], x=0.5), updatemenus=_dropdown(buttons, start),
+                      margin=dict(t=90))
+    return fig
+
+
+def ranking_switcher(cube, initial=None):
+    """MBTI 유형 선택 드롭다운이 달린 국가 순위 막대 (main.py 유형별 순위)"""
+    types = list(cube.types)
+    countries = np.asarray(cube.countries, dtype=object)
+
+    def state(j):
+        order = cube.rank_by_type[j]
+        vals = _round(cube.values[order, j])
+        return ({"x": [countries[order].tolist()], "y": [vals], "marker.color": [vals]},
+                {"title.text": f"{types[j]} 유형이 많은 국가 순위"})
+
+    start = types.index(initial) if initial in types else 0
+    data, layout = state(start)
+    fig = go.Figure(go.Bar(
+        x=data["x"][0], y=data["y"][0], texttemplate="%{y:.2f}", textposition="outside",
+        marker=dict(color=data["marker.color"][0], colorscale="RdYlBu_r", showscale=True,
+                    line=dict(width=1.2, color="#333")),
+    ))
+    buttons = [dict(label=t, method="update", args=list(state(j))) for j, t in enumerate(types)]
+    fig.update_layout(
+        title=dict(text=layout["title.text"], x=0.5), updatemenus=_dropdown(buttons, start),
+        xaxis_title="국가", yaxis_title="비율 (%)", plot_bgcolor="#ffffff", paper_bgcolor="#ffffff",
+        margin=dict(t=90),
+    )
+    return fig
+
+
+def country_switcher(cube, initial=None):
+    """국가 선택 드롭다운 하나로 입체 surface 와 상세 막대를 함께 바꾸는 figure (pages/02)"""
+    names, rows = _country_order(cube)
+    types = list(cube.types)
+    n = len(types)
+    cmax_floor = 1.0
+
+    def state(i):
+        vals = _round(cube.values[i])
+        z = [[0.0] * n, vals]
+        return ({"z": [z, None], "surfacecolor": [z, None], "cmax": [max(cmax_floor, max(vals)), None],
+                 "y": [[0, 1], vals], "marker.color": [None, gradient_colors_except_top(vals, top_color="#ff0000")]},
+                {"title.text": f"{cube.countries[i]} — MBTI 분포 (입체 / 상세 막대)"})
+
+    start = names.index(initial) if initial in names else 0
+    data, layout = state(rows[start])
+    fig = make_subplots(rows=2, cols=1, specs=[[{"type": "scene"}], [{"type": "xy"}]],
+                        row_heights=[0.6, 0.4], vertical_spacing=0.06)
+    fig.add_trace(go.Surface(
+        z=data["z"][0], x=list(range(n)), y=[0, 1], surfacecolor=data["surfacecolor"][0],
+        colorscale=pcolors.sequential.Viridis, cmin=0, cmax=data["cmax"][0], showscale=False,
+        hovertemplate="MBTI: %{x}<br>높이: %{z}<extra></extra>",
+    ), row=1, col=1)
+    fig.add_trace(go.Bar(x=types, y=data["y"][1], marker_color=data["marker.color"][1],
+                         texttemplate="%{y:.4f}", textposition="auto", showlegend=False), row=2, col=1)
+    # restyle 값은 [surface, 막대] 순서이며, None 은 그 trace 에 없는 속성 자리
+    buttons = [dict(label=name, method="update", args=list(state(i))) for name, i in zip(names, rows)]
+    fig.update_layout(
+        title=dict(text=layout["title.text"]), updatemenus=_dropdown(buttons, start), height=800,
+        scene=dict(xaxis=dict(title="MBTI Index", tickmode="array", tickvals=list(range(n)), ticktext=types),
+                   yaxis=dict(visible=False), zaxis=dict(title="Value")),
+        margin=dict(l=0, r=0, t=90, b=0),
+    )
+    return fig
@@ -0,0 +1,370 @@
+"""상관계수 엔진 (피어슨 / 스피어만 / 켄달).
+
+열 수가 수천 개여도 전체 k×k 행렬을 메모리에 두지 않도록, 열 블록마다
+상삼각 부분만 계산해 `argpartition` 으로 상위 k개 후보만 남깁니다.
+
+- 결측치가 없는 경우: 표준화한 float32 행렬의 곱 `Z.T @ Z`
+- 결측치가 있는 경우: pandas `DataFrame.corr()` 와 같은 pairwise-complete 방식을
+  마스크 행렬곱으로 계산 (float64)
+
+스피어만은 열 순위를 한 번 계산해 두고 순위 행렬에 같은 피어슨 엔진을 적용하며,
+결측치가 있는 열이 낀 쌍만 pandas 처럼 두 열의 공통 행에서 순위를 다시 매겨 계산합니다.
+켄달 tau-b는 병합 정렬 방식(O(n log n))으로 쌍마다 계산하고 쌍이 많으면 공유 스레드 풀(`workers`)에 나눕니다.
+"""
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+from utils import workers
+
+DEFAULT_BLOCK = 256
+METHODS = ("pearson", "spearman", "kendall")
+POOL_MIN_PAIRS = 64         # 켄달 쌍이 이보다 많으면 공유 스레드 풀 사용
+
+@functools.lru_cache(maxsize=None)
+def _scipy_kendalltau():
+    # scipy.stats 는 import 만 1초 가까이 걸리므로 켄달을 처음 계산할 때 불러옴 (없으면 NumPy 구현)
+    try:
+        from scipy.stats import kendalltau
+    except ImportError:
+        return None
+    return kendalltau
+
+
+def _as_matrix(X):
+    if isinstance(X, pd.DataFrame):
+        X = X.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.asarray(X, dtype=np.float64)
+
+
+def standardize(X):
+    """열을 평균 0, 노름 1로 맞춘 float32 행렬 (Z.T @ Z 가 곧 상관행렬), 분산 0인 열은 0"""
+    X = _as_matrix(X)
+    Xc = X - X.mean(axis=0)
+    norm = np.sqrt((Xc ** 2).sum(axis=0))
+    valid = norm > 0
+    Z = np.zeros_like(Xc, dtype=np.float32)
+    Z[:, valid] = Xc[:, valid] / norm[valid]
+    return Z, valid
+
+
+def masked_corr(Xa, Xb, min_periods=1):
+    """결측치가 있는 두 열 묶음 사이의 pairwise-complete 상관행렬 (a 열 × b 열)"""
+    Ma = ~np.isnan(Xa)
+    Mb = ~np.isnan(Xb)
+    A = np.where(Ma, Xa, 0.0)
+    B = np.where(Mb, Xb, 0.0)
+    Maf = Ma.astype(np.float64)
+    Mbf = Mb.astype(np.float64)
+    n = Maf.T @ Mbf
+    sa = A.T @ Mbf
+    sb = Maf.T @ B
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = A.T @ B - sa * sb / n
+        var_a = (A ** 2).T @ Mbf - sa ** 2 / n
+        var_b = Maf.T @ (B ** 2) - sb ** 2 / n
+        r = cov / np.sqrt(var_a * var_b)
+    r[(n < max(min_periods, 2)) | (var_a <= 0) | (var_b <= 0)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def corr_matrix(X):
+    """전체 상관행렬 (열 수가 적은 부분집합용)"""
+    X = _as_matrix(X)
+    if np.isnan(X).any():
+        return masked_corr(X, X)
+    Z, valid = standardize(X)
+    r = (Z.T @ Z).astype(np.float64)
+    r[~valid, :] = np.nan
+    r[:, ~valid] = np.nan
+    np.fill_diagonal(r, np.where(valid, 1.0, np.nan))
+    return np.clip(r, -1.0, 1.0)
+
+
+def corr_frame(df, columns):
+    return pd.DataFrame(corr_matrix(df[list(columns)]), index=list(columns), columns=list(columns))
+
+
+def top_k_pairs(X, k=10, block=DEFAULT_BLOCK):
+    """|r| 상위 k개 열 쌍 -> (i, j, r) 배열 (i < j, |r| 내림차순)
+
+    열 블록 [s, e) 마다 `s` 이후 열과의 상관만 계산하므로 한 번에 block × 열 수 만큼만 메모리를 씀.
+    """
+    X = _as_matrix(X)
+    p = X.shape[1]
+    has_nan = np.isnan(X).any()
+    if not has_nan:
+        Z, valid = standardize(X)
+
+    best_i = np.empty(0, dtype=np.int64)
+    best_j = np.empty(0, dtype=np.int64)
+    best_r = np.empty(0, dtype=np.float64)
+    for s in range(0, p, block):
+        e = min(s + block, p)
+        if has_nan:
+            R = masked_corr(X[:, s:e], X[:, s:])
+        else:
+            R = (Z[:, s:e].T @ Z[:, s:]).astype(np.float64)
+            R[~valid[s:e], :] = np.nan
+            R[:, ~valid[s:]] = np.nan
+        # 상삼각(대각 제외)만 남김: 행 a(=s+a), 열 b(=s+b) 에서 b > a
+        R[np.tril_indices(e - s, 0, R.shape[1])] = np.nan
+        score = np.abs(R).ravel()
+        score = np.where(np.isnan(score), -1.0, score)
+        kk = min(k, score.size)
+        if kk == 0:
+            continue
+        cand = np.argpartition(score, score.size - kk)[score.size - kk:]
+        cand = cand[score[cand] >= 0]
+        a, b = np.divmod(cand, R.shape[1])
+        best_i = np.concatenate([best_i, a + s])
+        best_j = np.concatenate([best_j, b + s])
+        best_r = np.concatenate([best_r, R.ravel()[cand]])
+        if len(best_r) > k:
+            keep = np.argpartition(-np.abs(best_r), k - 1)[:k]
+            best_i, best_j, best_r = best_i[keep], best_j[keep], best_r[keep]
+
+    order = np.lexsort((best_j, best_i, -np.abs(best_r)))
+    return best_i[order], best_j[order], best_r[order]
+
+
+def rank_columns(X):
+    """열별 평균 순위 (동점은 평균, NaN은 NaN 유지) - pandas rank(method="average")와 동일"""
+    X = _as_matrix(X)
+    R = np.full(X.shape, np.nan)
+    for c in range(X.shape[1]):
+        col = X[:, c]
+        ok = np.flatnonzero(~np.isnan(col))
+        if len(ok) == 0:
+            continue
+        order = ok[np.argsort(col[ok], kind="stable")]
+        v = col[order]
+        # 동점 구간 [start, end) 의 평균 순위 = (start + end + 1) / 2
+        new_group = np.r_[True, v[1:] != v[:-1]]
+        starts = np.flatnonzero(new_group)
+        ends = np.r_[starts[1:], len(v)]
+        group = np.cumsum(new_group) - 1
+        R[order, c] = ((starts + ends + 1) / 2.0)[group]
+    return R
+
+
+def _tie_pairs(sorted_values):
+    """정렬된 배열에서 동점 쌍 수 sum t(t-1)/2"""
+    if len(sorted_values) == 0:
+        return 0
+    _, counts = np.unique(sorted_values, return_counts=True)
+    return int((counts * (counts - 1) // 2).sum())
+
+
+def _count_inversions(a):
+    """i < j 이고 a[i] > a[j] 인 쌍의 수 (정수 배열), 상향식 병합 정렬을 레벨 단위로 벡터화"""
+    # 값을 0..n-1 순위로 압축해 (쌍 번호 * span + 값) 키가 겹치지 않게 함
+    a = np.unique(np.asarray(a), return_inverse=True)[1].astype(np.int64).ravel()
+    n = len(a)
+    span = n + 1
+    inversions = 0
+    width = 1
+    while width < n:
+        pair = np.arange(n) // (2 * width)
+        in_right = (np.arange(n) // width) % 2 == 1
+        keys = pair * span + a
+        left_keys = keys[~in_right]
+        right_keys = keys[in_right]
+        if len(right_keys):
+            # 같은 쌍의 왼쪽 구간에서 오른쪽 원소보다 큰 원소 수
+            left_end = np.searchsorted(left_keys, (pair[in_right] + 1) * span, side="left")
+            le = np.searchsorted(left_keys, right_keys, side="right")
+            inversions += int((left_end - le).sum())
+        # 각 쌍을 병합 (이미 정렬된 두 구간이므로 stable sort가 선형 병합처럼 동작)
+        a = np.sort(keys, kind="stable") - pair * span
+        width *= 2
+    return inversions
+
+
+def kendall_tau(x, y):
+    """켄달 tau-b (결측 쌍 제외), 병합 정렬 기반 O(n log n)
+
+    scipy가 있으면 같은 알고리즘의 컴파일된 구현(scipy.stats.kendalltau)을 쓰고,
+    없으면 NumPy 벡터화 병합 정렬로 계산한다.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[ok], y[ok]
+    n = len(x)
+    if n < 2:
+        return np.nan
+    kendalltau = _scipy_kendalltau()
+    if kendalltau is not None:
+        return float(kendalltau(x, y).statistic)
+    return _kendall_tau_numpy(x, y)
+
+
+def _kendall_tau_numpy(x, y):
+    n = len(x)
+    # y를 정수 순위로 바꾸고 (x, y) 순으로 정렬
+    y_rank = np.unique(y, return_inverse=True)[1].astype(np.int64)
+    order = np.lexsort((y_rank, x))
+    xs, ys = x[order], y_rank[order]
+    n0 = n * (n - 1) // 2
+    x_ties = _tie_pairs(xs)
+    y_ties = _tie_pairs(np.sort(ys))
+    joint = np.r_[True, (xs[1:] != xs[:-1]) | (ys[1:] != ys[:-1])]
+    joint_ties = int(((lambda c: c * (c - 1) // 2)(np.diff(np.r_[np.flatnonzero(joint), n]))).sum())
+    discordant = _count_inversions(ys)
+    denom = np.sqrt(float(n0 - x_ties) * float(n0 - y_ties))
+    if denom == 0:
+        return np.nan
+    return float((n0 - x_ties - y_ties + joint_ties - 2 * discordant) / denom)
+
+
+def _kendall_pairs(job):
+    X, pairs = job
+    return [kendall_tau(X[:, i], X[:, j]) for i, j in pairs]
+
+
+def kendall_matrix(X, processes=None):
+    """모든 열 쌍의 켄달 tau-b 행렬, 쌍이 많으면 공유 스레드 풀로 분산"""
+    X = _as_matrix(X)
+    p = X.shape[1]
+    pairs = [(i, j) for i in range(p) for j in range(i + 1, p)]
+    processes = processes or workers.max_workers()
+    if processes > 1 and len(pairs) >= POOL_MIN_PAIRS:
+        chunks = [pairs[c::processes] for c in range(processes)]
+        results = workers.map_jobs(_kendall_pairs, [(X, chunk) for chunk in chunks])
+        taus = {}
+        for chunk, res in zip(chunks, results):
+            taus.update(zip(chunk, res))
+        values = [taus[pr] for pr in pairs]
+    else:
+        values = _kendall_pairs((X, pairs))
+    R = np.eye(p)
+    if pairs:
+        i, j = np.array(pairs).T
+        R[i, j] = values
+        R[j, i] = values
+    return R
+
+
+def _spearman_nan_rows(X):
+    """결측치가 있는 열 c 마다 (c, 상대 열들, 공통 행에서 다시 순위를 매긴 스피어만 r)
+
+    전체 행 기준 순위는 결측 행이 빠진 뒤의 순위와 달라서, c 가 있는 행만으로 상대 열들을 함께 다시 순위화한다.
+    그 행들에서도 결측이 있는 상대 열(다른 결측 열)은 쌍마다 따로 계산하고, 결측 열끼리의 쌍은 c < d 쪽에서 한 번만 낸다.
+    """
+    nan_cols = np.isnan(X).any(axis=0)
+    for c in np.flatnonzero(nan_cols):
+        others = np.flatnonzero(~nan_cols | (np.arange(X.shape[1]) > c))
+        sub = X[~np.isnan(X[:, c])]
+        if len(sub) < 2:
+            yield c, others, np.full(len(others), np.nan)
+            continue
+        dirty = np.isnan(sub[:, others]).any(axis=0)
+        r = np.empty(len(others))
+        full = others[~dirty]
+        Z, valid = standardize(rank_columns(sub[:, np.r_[c, full]]))
+        r_full = (Z[:, 1:].T @ Z[:, 0]).astype(np.float64)
+        r_full[~valid[1:] | ~valid[0]] = np.nan
+        r[~dirty] = np.clip(r_full, -1.0, 1.0)
+        r[dirty] = [pair_corr(X[:, c], X[:, d], "spearman") for d in others[dirty]]
+        yield c, others, r
+
+
+def spearman_matrix(X, ranks=None):
+    """스피어만 상관행렬 (결측 열이 낀 쌍은 공통 행에서 다시 순위화)"""
+    X = _as_matrix(X)
+    R = corr_matrix(rank_columns(X) if ranks is None else ranks)
+    for c, others, r in _spearman_nan_rows(X):
+        R[c, others] = r
+        R[others, c] = r
+    return R
+
+
+def spearman_top_k_pairs(X, k=10, ranks=None):
+    """스피어만 |r| 상위 k개 쌍: 결측 없는 열끼리는 순위 행렬의 블록 계산, 결측 열이 낀 쌍은 공통 행 기준으로 다시 계산"""
+    X = _as_matrix(X)
+    ranks = rank_columns(X) if ranks is None else np.asarray(ranks, dtype=np.float64)
+    nan_cols = np.isnan(X).any(axis=0)
+    if not nan_cols.any():
+        return top_k_pairs(ranks, k)
+    clean = np.flatnonzero(~nan_cols)
+    i, j, r = top_k_pairs(ranks[:, clean], k)
+    best_i, best_j, best_r = clean[i], clean[j], r
+    for c, others, r in _spearman_nan_rows(X):
+        best_i = np.concatenate([best_i, np.minimum(c, others)])
+        best_j = np.concatenate([best_j, np.maximum(c, others)])
+        best_r = np.concatenate([best_r, r])
+        score = np.where(np.isnan(best_r), -1.0, np.abs(best_r))
+        keep = np.argsort(-score, kind="stable")[:k]
+        keep = keep[score[keep] >= 0]
+        best_i, best_j, best_r = best_i[keep], best_j[keep], best_r[keep]
+    order = np.lexsort((best_j, best_i, -np.abs(best_r)))
+    return best_i[order], best_j[order], best_r[order]
+
+
+def spearman_cross(Xa, Xb, min_periods=1):
+    """두 열 묶음 사이의 pairwise-complete 스피어만 (a 열 × b 열), 쌍마다 공통 행에서 순위를 다시 매김
+
+    b 열을 결측 위치가 같은 묶음으로 나눠 묶음마다 그 행들에서 한 번에 순위를 매기고,
+    그 행들에서도 결측이 있는 a 열만 쌍별로 계산한다.
+    """
+    Xa, Xb = _as_matrix(Xa), _as_matrix(Xb)
+    R = np.full((Xa.shape[1], Xb.shape[1]), np.nan)
+    if Xb.shape[1] == 0:
+        return R
+    masks, group = np.unique(~np.isnan(Xb), axis=1, return_inverse=True)
+    group = np.asarray(group).ravel()
+    need = max(min_periods, 2)
+    for g in range(masks.shape[1]):
+        rows, cols = masks[:, g], np.flatnonzero(group == g)
+        if rows.sum() < need:
+            continue
+        sub = Xa[rows]
+        dirty = np.isnan(sub).any(axis=0)
+        R[np.ix_(~dirty, cols)] = masked_corr(rank_columns(sub[:, ~dirty]), rank_columns(Xb[np.ix_(rows, cols)]))
+        for a in np.flatnonzero(dirty):
+            if (~np.isnan(sub[:, a])).sum() >= need:
+                R[a, cols] = [pair_corr(sub[:, a], Xb[rows, b], "spearman") for b in cols]
+    return R
+
+
+def method_corr_matrix(X, method="pearson", ranks=None):
+    """method별 상관행렬, 스피어만은 미리 계산한 ranks를 넘기면 재사용"""
+    if method == "pearson":
+        return corr_matrix(X)
+    if method == "spearman":
+        return spearman_matrix(X, ranks)
+    if method == "kendall":
+        return kendall_matrix(X)
+    raise ValueError(f"알 수 없는 상관계수 방식: {method!r} (가능: {', '.join(METHODS)})")
+
+
+def method_top_k_pairs(X, method="pearson", k=10, ranks=None):
+    if method == "pearson":
+        return top_k_pairs(X, k)
+    if method == "spearman":
+        return spearman_top_k_pairs(X, k, ranks)
+    R = method_corr_matrix(X, method)
+    i, j = np.triu_indices(R.shape[0], 1)
+    r = R[i, j]
+    score = np.where(np.isnan(r), -1.0, np.abs(r))
+    keep = np.argsort(-score, kind="stable")[:k]
+    keep = keep[score[keep] >= 0]
+    return i[keep], j[keep], r[keep]
+
+
+def pair_corr(x, y, method="pearson"):
+    """두 열의 상관계수 (결측 쌍 제외)"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[ok], y[ok]
+    if method == "kendall":
+        return kendall_tau(x, y)
+    if method == "spearman":
+        x, y = rank_columns(x[:, None])[:, 0], rank_columns(y[:, None])[:, 0]
+    elif method != "pearson":
+        raise ValueError(f"알 수 없는 상관계수 방식: {method!r} (가능: {', '.join(METHODS)})")
+    return corr_matrix(np.column_stack([x, y]))[0, 1]
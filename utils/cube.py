@@ -0,0 +1,109 @@
+"""국가 × MBTI 사전 계산 분석 큐브.
+
+데이터 버전마다 한 번만 만들어 두고 (st.cache_resource로 세션 간 공유)
+위젯 변경 시에는 pandas reshape 없이 배열 조회만 합니다.
+
+- 유형별 국가 순위 (argsort, 내림차순)
+- 국가별 유형 정렬 순서와 1위 유형
+- 전 세계 평균/표준편차/최소/최대/사분위수
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+@dataclass(frozen=True)
+class MBTICube:
+    values: np.ndarray          # (국가, 유형)
+    countries: tuple
+    types: tuple
+    rank_by_type: np.ndarray    # (유형, 국가) 각 유형에서 비율이 높은 국가 인덱스 순
+    order_by_country: np.ndarray  # (국가, 유형) 각 국가에서 비율이 높은 유형 인덱스 순
+    mean: np.ndarray
+    std: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    quantiles: np.ndarray       # (len(QUANTILES), 유형)
+
+    @cached_property
+    def country_index(self):
+        return {name: i for i, name in enumerate(self.countries)}
+
+    @cached_property
+    def type_index(self):
+        return {name: j for j, name in enumerate(self.types)}
+
+    @cached_property
+    def sorted_countries(self):
+        return sorted(self.countries)
+
+    def top_type(self, country):
+        i = self.country_index[country]
+        return self.types[self.order_by_country[i, 0]]
+
+    def country_profile(self, country):
+        """국가 하나의 유형별 비율 (내림차순) -> DataFrame[MBTI, 비율]"""
+        i = self.country_index[country]
+        order = self.order_by_country[i]
+        return pd.DataFrame({
+            "MBTI": np.asarray(self.types)[order],
+            "비율": self.values[i, order],
+        })
+
+    def ranking(self, mbti):
+        """유형 하나에 대한 국가 순위 (내림차순) -> DataFrame[Country, mbti]"""
+        j = self.type_index[mbti]
+        order = self.rank_by_type[j]
+        return pd.DataFrame({
+            "Country": np.asarray(self.countries, dtype=object)[order],
+            mbti: self.values[order, j],
+        })
+
+    @cached_property
+    def long_frame(self):
+        """모든 국가 × 유형 long 형식 -> DataFrame[Country, MBTI, 비율] (유형 우선 순서)"""
+        n, m = self.values.shape
+        return pd.DataFrame({
+            "Country": np.tile(np.asarray(self.countries, dtype=object), m),
+            "MBTI": np.repeat(np.asarray(self.types, dtype=object), n),
+            "비율": self.values.T.reshape(-1),
+        })
+
+    @cached_property
+    def summary_frame(self):
+        """유형별 요약 통계 -> DataFrame[MBTI, mean, std, min, max, 25%, 50%, 75%]"""
+        out = pd.DataFrame({
+            "MBTI": list(self.types),
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min,
+            "max": self.max,
+        })
+        for q, row in zip(QUANTILES, self.quantiles):
+            out[f"{q:.0%}"] = row
+        return out
+
+
+def build_cube(values, countries, types):
+    values = np.asarray(values, dtype=np.float32)
+    # NaN은 순위에서 맨 뒤로 가도록 -inf로 두고 내림차순 정렬
+    ranked = np.where(np.isnan(values), -np.inf, values)
+    rank_by_type = np.argsort(-ranked.T, axis=1, kind="stable")
+    order_by_country = np.argsort(-ranked, axis=1, kind="stable")
+    return MBTICube(
+        values=values,
+        countries=tuple(countries),
+        types=tuple(types),
+        rank_by_type=rank_by_type,
+        order_by_country=order_by_country,
+        mean=np.nanmean(values, axis=0),
+        std=np.nanstd(values, axis=0, ddof=1),
+        min=np.nanmin(values, axis=0),
+        max=np.nanmax(values, axis=0),
+        quantiles=np.nanquantile(values, QUANTILES, axis=0),
+    )
@@ -0,0 +1,179 @@
+"""countriesMBTI_16types.csv 공용 데이터 계층.
+
+CSV를 한 번만 파싱해 float32 행렬(국가 × 16유형), 국가 인덱스, 고정된 유형 순서로 만들고
+CSV 옆 `.cache/` 디렉터리에 `.npy` 사이드카로 저장합니다.
+이후에는 사이드카를 메모리 맵으로 열기 때문에 페이지마다 텍스트를 다시 파싱하지 않고,
+여러 프로세스가 같은 페이지 캐시를 공유합니다.
+CSV 헤더의 원래 유형 순서는 `source_types` 로 남겨 미리보기와 열 순서에 의존하는 처리에 씁니다.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CSV = "countriesMBTI_16types.csv"
+CACHE_DIRNAME = ".cache"
+
+# 고정된 유형 순서 (CSV 열 순서와 무관하게 항상 이 순서로 행렬을 구성)
+MBTI_TYPES = (
+    "INTJ", "INTP", "ENTJ", "ENTP",
+    "INFJ", "INFP", "ENFJ", "ENFP",
+    "ISTJ", "ISFJ", "ESTJ", "ESFJ",
+    "ISTP", "ISFP", "ESTP", "ESFP",
+)
+
+
+@dataclass(frozen=True)
+class MBTIDataset:
+    """국가 × MBTI 비율 행렬과 메타데이터"""
+    values: np.ndarray      # (국가 수, 16) float32, 읽기 전용
+    countries: tuple        # 행 순서의 국가 이름
+    types: tuple            # 열 순서의 MBTI 유형
+    version: str            # CSV 내용 해시 (캐시 키로 사용)
+    source_types: tuple = MBTI_TYPES    # CSV 헤더에 나온 유형 순서 (표시/열 순서 의존 처리용)
+
+    @cached_property
+    def country_index(self):
+        return {name: i for i, name in enumerate(self.countries)}
+
+    @cached_property
+    def type_index(self):
+        return {name: j for j, name in enumerate(self.types)}
+
+    @cached_property
+    def source_order(self):
+        """source_types 순서대로의 열 인덱스 (values[:, source_order] 가 CSV 열 순서)"""
+        return np.array([self.type_index[t] for t in self.source_types], dtype=np.intp)
+
+    def row(self, country):
+        """국가 한 개의 16유형 벡터 (복사 없는 view)"""
+        return self.values[self.country_index[country]]
+
+    def column(self, mbti):
+        """유형 한 개의 국가별 벡터 (복사 없는 view)"""
+        return self.values[:, self.type_index[mbti]]
+
+    def frame(self, source_order=False):
+        """기존 페이지 코드가 쓰던 `Country` + 16유형 DataFrame (source_order=True 면 CSV 열 순서)"""
+        if source_order:
+            df = pd.DataFrame(self.values[:, self.source_order], columns=list(self.source_types))
+        else:
+            df = pd.DataFrame(self.values, columns=list(self.types), copy=False)
+        df.insert(0, "Country", list(self.countries))
+        return df
+
+
+def dataset_stamp(path=DEFAULT_CSV):
+    """파일을 읽지 않고 stat만으로 얻는 버전 표식 (st.cache 키 용도)"""
+    st_ = os.stat(path)
+    return st_.st_mtime_ns, st_.st_size
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_dir_for(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRNAME)
+
+
+def _sidecar_paths(path):
+    base = os.path.join(cache_dir_for(path), os.path.splitext(os.path.basename(path))[0])
+    return base + ".values.npy", base + ".meta.json"
+
+
+def source_types(path=DEFAULT_CSV):
+    """CSV 헤더에 나온 순서의 MBTI 유형 (헤더 한 줄만 읽음)"""
+    columns = pd.read_csv(path, nrows=0).columns
+    return tuple(c for c in columns if c in MBTI_TYPES)
+
+
+def parse_csv(path=DEFAULT_CSV):
+    """CSV를 파싱해 (float32 행렬, 국가 튜플)을 반환"""
+    df = pd.read_csv(path, dtype={t: "float32" for t in MBTI_TYPES})
+    missing = [t for t in MBTI_TYPES if t not in df.columns]
+    if "Country" not in df.columns or missing:
+        raise ValueError(f"{path}: 필요한 열이 없습니다 (Country, {', '.join(missing)})")
+    values = np.ascontiguousarray(df[list(MBTI_TYPES)].to_numpy(dtype=np.float32))
+    countries = tuple(sys.intern(str(c)) for c in df["Country"])
+    return values, countries
+
+
+def _atomic_write(target, write):
+    tmp = f"{target}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, target)
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_dataset(path=DEFAULT_CSV):
+    """사이드카가 최신이면 메모리 맵으로 열고, 아니면 CSV를 파싱해 다시 만든다."""
+    values_path, meta_path = _sidecar_paths(path)
+    mtime_ns, size = dataset_stamp(path)
+    meta = _read_meta(meta_path)
+
+    if (meta is not None and os.path.exists(values_path) and tuple(meta.get("types", ())) == MBTI_TYPES
+            and "source_types" in meta):
+        fresh = meta["mtime_ns"] == mtime_ns and meta["size"] == size
+        if not fresh:
+            # mtime만 바뀌고 내용이 같으면 (checkout, touch 등) 재파싱 없이 메타만 갱신
+            sha = file_sha256(path)
+            if sha == meta["sha256"]:
+                meta.update(mtime_ns=mtime_ns, size=size)
+                try:
+                    _atomic_write(meta_path, lambda p: _dump_meta(p, meta))
+                except OSError:
+                    pass
+                fresh = True
+        if fresh:
+            values = np.load(values_path, mmap_mode="r")
+            countries = tuple(sys.intern(c) for c in meta["countries"])
+            return MBTIDataset(values, countries, MBTI_TYPES, meta["sha256"], tuple(meta["source_types"]))
+
+    values, countries = parse_csv(path)
+    source = source_types(path)
+    sha = file_sha256(path)
+    meta = {
+        "mtime_ns": mtime_ns,
+        "size": size,
+        "sha256": sha,
+        "types": list(MBTI_TYPES),
+        "source_types": list(source),
+        "countries": list(countries),
+    }
+    try:
+        os.makedirs(cache_dir_for(path), exist_ok=True)
+        _atomic_write(values_path, lambda p: _save_npy(p, values))
+        _atomic_write(meta_path, lambda p: _dump_meta(p, meta))
+        values = np.load(values_path, mmap_mode="r")
+    except OSError:
+        # 읽기 전용 배포 환경에서는 메모리에 파싱한 결과를 그대로 사용
+        values.setflags(write=False)
+    return MBTIDataset(values, countries, MBTI_TYPES, sha, source)
+
+
+def _save_npy(path, values):
+    with open(path, "wb") as f:
+        np.save(f, values)
+
+
+def _dump_meta(path, meta):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
@@ -0,0 +1,176 @@
+"""데이터 내보내기: (데이터 버전, 부분집합, 필터, 형식) 단위로 한 번만 직렬화해 파일로 캐시.
+
+페이지는 `st.download_button(data=callable)` 로 이 모듈을 호출하므로, 버튼을 누르기 전에는
+직렬화가 전혀 일어나지 않습니다. 만든 파일은 `.cache/exports/` 에 남아 다음 요청과
+다른 세션/프로세스에서 그대로 재사용됩니다.
+
+- 형식: CSV / Parquet / JSON (레코드 배열)
+- 부분집합: raw(원본), cleaned(결측치 평균 대체 + 이상치 처리), country(국가 하나), top_n(유형별 상위 N개국)
+- 값은 float64 로 바꾸고 원본 CSV 의 소수 자릿수로 반올림해 씀 (float32 잡음 `0.0430999994` 방지)
+- 큰 표는 `CHUNK_ROWS` 행씩 나눠 파일에 이어 쓰므로 전체를 하나의 문자열로 만들지 않습니다.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils import data, outliers
+
+CHUNK_ROWS = 50_000
+# 같은 (버전, 범위, 필터) 라도 만드는 방식이 바뀌면 올려서 이전 캐시 파일을 쓰지 않게 함
+EXPORT_REVISION = 4
+EXPORT_DIR = os.path.join(data.CACHE_DIRNAME, "exports")
+FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "json": ("application/json", ".json"),
+}
+SUBSETS = ("raw", "cleaned", "country", "top_n")
+# 범위별로 결과에 영향을 주는 필터 (나머지는 캐시 키에서 뺀다)
+SUBSET_FILTERS = {"raw": (), "cleaned": ("mode",), "country": ("country",), "top_n": ("top_n",)}
+MAX_DECIMALS = 8            # 자릿수를 못 찾으면 (float32 유효숫자 7자리 정도면 0~1 비율은 이걸로 충분)
+
+
+def _check(fmt, subset):
+    if fmt not in FORMATS:
+        raise ValueError(f"알 수 없는 내보내기 형식: {fmt!r} (가능: {', '.join(FORMATS)})")
+    if subset not in SUBSETS:
+        raise ValueError(f"알 수 없는 내보내기 범위: {subset!r} (가능: {', '.join(SUBSETS)})")
+
+
+def cleaned_frame(dataset, mode="sequential"):
+    """main.py 와 같은 정제 단계 (열 평균 대체 -> IQR 이상치 처리) 결과 -> DataFrame[Country, 유형...] (CSV 열 순서)"""
+    values, _ = outliers.impute_mean(dataset.values)
+    result = outliers.remove_outliers(values, mode=mode, order=dataset.source_order)
+    frame = pd.DataFrame(result.values[:, dataset.source_order], columns=list(dataset.source_types))
+    frame.insert(0, "Country", [c for c, k in zip(dataset.countries, result.keep) if k])
+    return frame
+
+
+def country_frame(dataset, country):
+    """국가 하나의 유형별 비율 (내림차순, 결측은 마지막) -> DataFrame[MBTI, 비율]"""
+    row = np.asarray(dataset.row(country), dtype=np.float64)
+    order = np.argsort(-row, kind="stable")
+    return pd.DataFrame({"MBTI": np.asarray(dataset.types, dtype=object)[order], "비율": row[order]})
+
+
+def top_n_frame(dataset, n=10):
+    """유형별 상위 n개국 -> DataFrame[MBTI, 순위, Country, 비율]"""
+    values = np.asarray(dataset.values, dtype=np.float64)
+    n = min(n, len(values))
+    # 유형마다 -값 기준 상위 n개 (결측은 정렬 시 뒤로)
+    order = np.argsort(-values, axis=0, kind="stable")[:n]           # (n, 유형)
+    m = values.shape[1]
+    return pd.DataFrame({
+        "MBTI": np.repeat(np.asarray(dataset.types, dtype=object), n),
+        "순위": np.tile(np.arange(1, n + 1), m),
+        "Country": np.asarray(dataset.countries, dtype=object)[order.T.reshape(-1)],
+        "비율": values[order, np.arange(m)].T.reshape(-1),
+    })
+
+
+def source_decimals(values, limit=MAX_DECIMALS):
+    """float32 값이 원본에서 가졌던 소수 자릿수 (그 자릿수로 반올림해도 float32 값이 그대로인 최소값, 없으면 limit)"""
+    v32 = np.asarray(values, dtype=np.float32)
+    v32 = v32[~np.isnan(v32)]
+    v = v32.astype(np.float64)
+    for d in range(limit):
+        if np.array_equal(np.round(v, d).astype(np.float32), v32):
+            return d
+    return limit
+
+
+def round_floats(frame, decimals):
+    """실수 열을 float64 로 바꾸고 decimals 자리로 반올림한 frame (나머지 열은 그대로)"""
+    cols = frame.select_dtypes(include=[np.floating]).columns
+    return frame.assign(**{c: np.round(frame[c].to_numpy(dtype=np.float64), decimals) for c in cols})
+
+
+def subset_frame(dataset, subset, mode="sequential", country=None, top_n=10):
+    if subset == "raw":
+        frame = dataset.frame(source_order=True)
+    elif subset == "cleaned":
+        frame = cleaned_frame(dataset, mode)
+    elif subset == "country":
+        frame = country_frame(dataset, country)
+    elif subset == "top_n":
+        frame = top_n_frame(dataset, top_n)
+    else:
+        raise ValueError(f"알 수 없는 내보내기 범위: {subset!r} (가능: {', '.join(SUBSETS)})")
+    return round_floats(frame, source_decimals(dataset.values))
+
+
+def _chunks(frame, chunk_rows):
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def write_frame(frame, fmt, path, chunk_rows=CHUNK_ROWS):
+    """frame 을 chunk_rows 행씩 path 에 이어 쓴다"""
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.Schema.from_pandas(frame.head(0), preserve_index=False)
+        with pq.ParquetWriter(path, schema) as writer:
+            for chunk in _chunks(frame, chunk_rows):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        return
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            f.write(frame.head(0).to_csv(index=False))
+            for chunk in _chunks(frame, chunk_rows):
+                f.write(chunk.to_csv(index=False, header=False))
+        else:
+            # 청크별 레코드 배열의 대괄호를 떼고 이어 붙여 하나의 JSON 배열로 만든다
+            f.write("[")
+            first = True
+            for chunk in _chunks(frame, chunk_rows):
+                body = chunk.to_json(orient="records", force_ascii=False)[1:-1]
+                if body:
+                    f.write(body if first else "," + body)
+                    first = False
+            f.write("]")
+
+
+def export_key(version, subset, fmt, **filters):
+    payload = json.dumps({"version": version, "subset": subset, "fmt": fmt, "revision": EXPORT_REVISION, **filters},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def export_file(dataset, subset, fmt, export_dir=EXPORT_DIR, **filters):
+    """(버전, 범위, 필터, 형식) 별 캐시 파일 경로 (없을 때만 만든다)"""
+    _check(fmt, subset)
+    filters = {k: v for k, v in filters.items() if k in SUBSET_FILTERS[subset]}
+    _, ext = FORMATS[fmt]
+    target = os.path.join(export_dir, f"{subset}-{export_key(dataset.version, subset, fmt, **filters)}{ext}")
+    if os.path.exists(target):
+        return target
+    os.makedirs(export_dir, exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    write_frame(subset_frame(dataset, subset, **filters), fmt, tmp)
+    os.replace(tmp, target)
+    return target
+
+
+def file_name(subset, fmt, country=None, top_n=10, mode=None):
+    stem = {
+        "raw": "countriesMBTI_16types",
+        "cleaned": f"countriesMBTI_16types_cleaned_{mode or 'sequential'}",
+        "country": f"mbti_{country}".replace(" ", "_"),
+        "top_n": f"mbti_top{top_n}_by_type",
+    }[subset]
+    return stem + FORMATS[fmt][1]
+
+
+def deferred(dataset, subset, fmt, **filters):
+    """st.download_button(data=...) 용 콜백: 버튼을 눌렀을 때만 캐시 파일을 만들고 그 내용을 돌려준다"""
+    def load():
+        with open(export_file(dataset, subset, fmt, **filters), "rb") as f:
+            return f.read()
+    return load
@@ -0,0 +1,240 @@
+"""국가/유형별 차트 팩토리와 직렬화된 figure LRU 캐시.
+
+figure는 (차트 종류, 국가 또는 유형, 데이터 버전) 키로 JSON 문자열 형태로 보관합니다.
+JSON은 불변이라 세션/스레드 간에 안전하게 공유되고, 꺼낼 때는 검증 없이
+`go.Figure`로 되살리기 때문에 국가를 바꿀 때 드는 비용은 캐시 조회 한 번뿐입니다.
+`warm_up_async`로 프로세스 시작 시 모든 국가 × 차트 종류를 미리 만들어 둘 수 있습니다.
+메모리에 없는 figure 는 디스크 결과 캐시(`resultcache`)에서 먼저 찾으므로 재시작 후에도 다시 만들지 않습니다
+(키에 utils 패키지 전체와 빌드 함수가 있는 파일의 내용 해시가 들어가 코드가 바뀌면 새로 만듦).
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly import colors as pcolors
+
+from utils import perf, resultcache
+
+DEFAULT_MAXSIZE = 1024
+PREWARM_ENV = "MBTI_FIGURE_PREWARM"
+
+
+def gradient_colors_except_top(values, top_color='#ff0000', cmap=pcolors.sequential.Viridis):
+    """값 리스트에서 최대값(=1등)은 top_color로, 나머지는 cmap 그라데이션으로 반환"""
+    vals = np.asarray(values, dtype=float)
+    idx_max = np.nanargmax(vals)
+    # normalize excluding max for cmap mapping
+    others = vals.copy()
+    others[idx_max] = np.nan
+    minv = np.nanmin(others) if np.isfinite(others).any() else np.nan
+    maxv = np.nanmax(others) if np.isfinite(others).any() else np.nan
+    if np.isnan(minv) or maxv == minv:
+        t = np.full(vals.shape, 0.5)
+    else:
+        # 최대값 자리는 범위를 벗어나므로 잘라 두고 아래에서 top_color로 덮어씀
+        t = np.clip(np.where(np.isnan(vals), 0.5, (vals - minv) / (maxv - minv)), 0.0, 1.0)
+    colors = np.asarray(cmap, dtype=object)[(t * (len(cmap) - 1)).astype(int)]
+    colors[idx_max] = top_color
+    return colors.tolist()
+
+
+# 3D 서피스 생성: x: MBTI, y: [0,1], z: [zeros ; values]
+def country_surface_figure(mbti_labels, values):
+    values = np.asarray(values, dtype=float)
+    # build z as 2 x N so surface looks like vertical ridges
+    z = np.vstack([np.zeros(len(values)), values])
+
+    x = np.arange(len(values))
+    y = np.array([0, 1])
+
+    fig = go.Figure(data=[
+        go.Surface(
+            z=z,
+            x=x,
+            y=y,
+            surfacecolor=z,
+            colorscale=pcolors.sequential.Viridis,
+            showscale=True,
+            cmin=0,
+            cmax=max(1.0, np.nanmax(values)),
+            hovertemplate='MBTI: %{x}<br>높이: %{z}<extra></extra>'
+        )
+    ])
+
+    fig.update_layout(
+        scene=dict(
+            xaxis=dict(title='MBTI Index', tickmode='array', tickvals=list(range(len(mbti_labels))), ticktext=list(mbti_labels)),
+            yaxis=dict(visible=False),
+            zaxis=dict(title='Value')
+        ),
+        margin=dict(l=0, r=0, t=30, b=0),
+    )
+    return fig
+
+
+def country_bar_figure(country, mbti_labels, values):
+    """국가 MBTI 비율 상세 막대 (1등 빨강, 나머지 그라데이션)"""
+    values = np.asarray(values, dtype=float)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=list(mbti_labels), y=values,
+        marker_color=gradient_colors_except_top(values, top_color='#ff0000'),
+        texttemplate='%{y:.4f}', textposition='auto',
+    ))
+    fig.update_layout(title=f'{country} MBTI 비율 (상세 막대)', xaxis_title='MBTI', yaxis_title='값', margin=dict(l=0, r=0, t=30, b=0))
+    return fig
+
+
+def country_pie_figure(cube, country):
+    import plotly.express as px
+
+    profile = cube.country_profile(country)
+    fig = px.pie(
+        profile,
+        names="MBTI",
+        values="비율",
+        color="MBTI",
+        color_discrete_sequence=pcolors.qualitative.Safe,
+        title=f"🇨🇳 {country}의 MBTI 비율 분포"
+    )
+    fig.update_traces(textinfo="percent+label", pull=[0.1 if i == 0 else 0 for i in range(len(profile))])
+    fig.update_layout(title_x=0.5)
+    return fig
+
+
+def type_ranking_figure(cube, mbti):
+    import plotly.express as px
+
+    fig = px.bar(
+        cube.ranking(mbti),
+        x="Country",
+        y=mbti,
+        text_auto=".2f",
+        color=mbti,
+        color_continuous_scale="RdYlBu_r",
+        title=f"{mbti} 유형이 많은 국가 순위"
+    )
+    fig.update_traces(marker_line_width=1.2, marker_line_color="#333", textposition="outside")
+    fig.update_layout(
+        title_x=0.5,
+        xaxis_title="국가",
+        yaxis_title="비율 (%)",
+        plot_bgcolor="#ffffff",
+        paper_bgcolor="#ffffff",
+        font=dict(size=13)
+    )
+    return fig
+
+
+# 차트 종류 -> (키 종류, 빌더(cube, 키))
+KINDS = {
+    "pie": ("country", country_pie_figure),
+    "surface": ("country", lambda cube, c: country_surface_figure(cube.types, cube.values[cube.country_index[c]])),
+    "bar": ("country", lambda cube, c: country_bar_figure(c, cube.types, cube.values[cube.country_index[c]])),
+    "ranking": ("type", type_ranking_figure),
+}
+
+
+class FigureCache:
+    """figure JSON 문자열을 담는 스레드 안전 LRU 캐시"""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(len(s) for s in self._data.values())
+
+    def get_json(self, key, build):
+        with self._lock:
+            payload = self._data.get(key)
+            if payload is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return payload
+            self.misses += 1
+        # 빌드는 락 밖에서 (다른 키 조회를 막지 않도록)
+        payload = _load_or_build(key, build)
+        with self._lock:
+            self._data[key] = payload
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return payload
+
+    def get(self, key, build):
+        # 캐시된 JSON은 이미 검증을 통과한 figure이므로 재검증 없이 복원
+        return go.Figure(json.loads(self.get_json(key, build)), _validate=False)
+
+
+def _load_or_build(key, build):
+    """디스크 캐시에 있으면 그 JSON, 없으면 만들어서 저장
+
+    페이지 람다는 client/geo 같은 utils 모듈을 부르므로, 키에는 람다가 있는 파일만이 아니라
+    utils 패키지 전체의 소스 해시를 넣는다.
+    """
+    if not resultcache.enabled():
+        return build().to_json()
+    salt = resultcache.source_salt(build.__code__.co_filename)
+    disk_key = hashlib.sha256(json.dumps(["figure", key, salt],
+                                         ensure_ascii=False, default=repr).encode("utf-8")).hexdigest()
+    store = resultcache.result_cache()
+    hit, payload = store.get(disk_key)
+    perf.record_cache("disk:figure", hit)
+    if not hit:
+        payload = build().to_json()
+        store.put(disk_key, f"figure:{key[0]}", payload)
+    return payload
+
+
+_cache = FigureCache()
+
+
+def figure_cache():
+    return _cache
+
+
+def get_figure(kind, key, cube, version):
+    """(차트 종류, 국가/유형, 데이터 버전) 단위로 캐시된 figure"""
+    _, build = KINDS[kind]
+    built = []
+    with perf.span(f"figure:{kind}"):
+        fig = _cache.get((kind, key, version), lambda: built.append(key) or build(cube, key))
+    perf.record_cache(f"figure:{kind}", hit=not built)
+    return fig
+
+
+def prewarm_enabled():
+    return os.environ.get(PREWARM_ENV, "0") == "1"
+
+
+def warm_up(cube, version, kinds):
+    for kind in kinds:
+        key_kind, build = KINDS[kind]
+        keys = cube.countries if key_kind == "country" else cube.types
+        for key in keys:
+            _cache.get_json((kind, key, version), lambda: build(cube, key))
+
+
+def warm_up_async(cube, version, kinds):
+    """백그라운드 데몬 스레드에서 모든 국가/유형 figure를 미리 만든다."""
+    thread = threading.Thread(target=warm_up, args=(cube, version, tuple(kinds)),
+                              name=f"figure-warmup-{version[:8]}", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,284 @@
+"""세계 국가 경계 GeoJSON: 위상 보존 단순화, 수준별 캐시, MBTI 국가 이름 결합.
+
+경계 파일은 번들된 `geo/world.geojson` (Natural Earth 1:110m admin-0, 공개 도메인, geo/README.md) 을 씁니다.
+단순화는 TopoJSON/mapshaper 와 같은 방식으로 합니다.
+
+1. 모든 고리(ring)의 점에서 교차점(이웃 점 구성이 고리마다 다른 공유 점)을 찾고,
+2. 고리를 교차점에서 끊어 호(arc)로 나눈 뒤, 같은 국경(정방향/역방향)은 한 번만
+   Douglas-Peucker 로 단순화해 양쪽 나라가 같은 결과를 쓴다 → 국경 사이에 틈/겹침이 생기지 않음.
+
+수준(TOLERANCES)별 결과는 원본 내용 해시를 키로 `.cache/geo/` 에 저장해 다시 계산하지 않으며,
+각 feature 의 `id` 는 MBTI CSV 표기에 맞춘 국가 이름이라 지도는 이름으로 바로 결합됩니다.
+`world_choropleth` 는 경계를 figure 에 한 번만 싣고 유형 전환은 값 벡터만 바꾸며,
+경계 파일이 없으면 Plotly 내장 세계 지도(locationmode="country names")를 씁니다.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly import colors as pcolors
+
+from utils import data, indicators
+
+WORLD_GEOJSON = os.path.join("geo", "world.geojson")
+GEO_CACHE_DIR = os.path.join(data.CACHE_DIRNAME, "geo")
+# 수준 -> Douglas-Peucker 허용 오차 (도 단위, 클수록 거칠고 작음)
+TOLERANCES = {"low": 0.5, "medium": 0.1, "high": 0.02}
+NAME_KEYS = ("ADMIN", "NAME_LONG", "NAME", "name", "SOVEREIGNT", "admin")
+DECIMALS = 4                # 저장 좌표 자릿수 (약 10m)
+MODES = ("share", "top")    # 유형별 비율 / 국가별 최다 유형
+VALUE_DECIMALS = 4          # 드롭다운 버튼에 싣는 비율 값 자릿수
+
+
+# ------------------------------
+# 위상 보존 단순화
+# ------------------------------
+def douglas_peucker(points, tolerance):
+    """(n, 2) 열린 선 -> 남길 점 표시 (양 끝점은 항상 남김)"""
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, n - 1)]
+    while stack:
+        s, e = stack.pop()
+        if e - s < 2:
+            continue
+        seg = points[e] - points[s]
+        rel = points[s + 1:e] - points[s]
+        length = np.hypot(*seg)
+        if length == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / length
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            m = s + 1 + k
+            keep[m] = True
+            stack.append((s, m))
+            stack.append((m, e))
+    return keep
+
+
+def _rings(geometry):
+    """Polygon/MultiPolygon -> [[고리 좌표 ndarray (닫는 점 제외), ...] 폴리곤별]"""
+    if geometry is None:
+        return []
+    polys = [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+    out = []
+    for poly in polys:
+        rings = []
+        for ring in poly:
+            arr = np.asarray(ring, dtype=np.float64)[:, :2]
+            if len(arr) > 1 and np.array_equal(arr[0], arr[-1]):
+                arr = arr[:-1]
+            if len(arr) >= 3:
+                rings.append(arr)
+        if rings:
+            out.append(rings)
+    return out
+
+
+def point_ids(all_rings):
+    """고리별 점 -> 같은 좌표면 같은 정수 id (고리 순서대로 잘린 id 배열 목록, 전체 점 수)"""
+    if not all_rings:
+        return [], 0
+    stacked = np.round(np.concatenate(all_rings), 9)
+    _, inverse = np.unique(stacked, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    bounds = np.cumsum([0] + [len(r) for r in all_rings])
+    return [inverse[a:b] for a, b in zip(bounds[:-1], bounds[1:])], int(inverse.max()) + 1
+
+
+def find_junctions(ids, n_points):
+    """여러 고리가 공유하되 이웃 점 구성이 서로 다른 점(= 국경이 갈라지는 점) 표시 (n_points,) bool"""
+    if not ids:
+        return np.zeros(n_points, dtype=bool)
+    prev = np.concatenate([np.roll(r, 1) for r in ids])
+    nxt = np.concatenate([np.roll(r, -1) for r in ids])
+    triples = np.unique(np.c_[np.concatenate(ids), np.minimum(prev, nxt), np.maximum(prev, nxt)], axis=0)
+    return np.bincount(triples[:, 0], minlength=n_points) > 1
+
+
+def _ring_arcs(ring, ids, junctions):
+    """고리 -> [(정규 호 키, 뒤집힘 여부, 정규 방향 좌표), ...] (같은 국경은 양쪽 나라에서 같은 키)"""
+    n = len(ring)
+    cuts = np.flatnonzero(junctions[ids]).tolist()
+    if not cuts:
+        # 교차점이 없는 고리(섬, 통째로 둘러싸인 나라와 그 구멍): id 가 가장 작은 점과 그 점에서
+        # 가장 먼 점에서 두 호로 나눔 (시작점이 다른 같은 고리도 같은 곳에서 끊기도록)
+        first = int(np.argmin(ids))
+        far = int(np.argmax(np.hypot(*(ring - ring[first]).T)))
+        cuts = sorted({first, far})
+    arcs = []
+    for a, b in zip(cuts, cuts[1:] + [cuts[0] + n]):
+        idx = np.arange(a, b + 1) % n
+        arc = tuple(ids[idx].tolist())
+        reverse = arc[::-1] < arc
+        arcs.append((arc[::-1] if reverse else arc, reverse, ring[idx[::-1]] if reverse else ring[idx]))
+    return arcs
+
+
+def _assemble(arcs, simplified):
+    return np.concatenate([(simplified[key][::-1] if reverse else simplified[key])[:-1] for key, reverse, _ in arcs])
+
+
+def simplify_features(features, tolerance):
+    """feature 목록 -> 같은 순서의 단순화된 geometry (국경 공유 호는 한 번만 단순화)
+
+    작은 섬/월경지처럼 고리가 점 3개 미만으로 줄어들면 그 고리의 호만 허용 오차를 줄여 다시
+    단순화한다 (호를 공유하는 이웃도 같은 결과를 쓰므로 폴리곤이 사라지거나 틈이 생기지 않음).
+    """
+    shapes = [_rings(f.get("geometry")) for f in features]
+    flat = [r for polys in shapes for rings in polys for r in rings]
+    ids, n_points = point_ids(flat)
+    junctions = find_junctions(ids, n_points)
+    ring_arcs = [_ring_arcs(ring, r_ids, junctions) for ring, r_ids in zip(flat, ids)]
+
+    points, arc_tol, simplified = {}, {}, {}
+    for arcs in ring_arcs:
+        for key, _, pts in arcs:
+            if key not in simplified:
+                points[key], arc_tol[key] = pts, tolerance
+                simplified[key] = pts[douglas_peucker(pts, tolerance)]
+    pending = [arcs for arcs in ring_arcs if len(_assemble(arcs, simplified)) < 3]
+    while pending:
+        for arcs in pending:
+            for key, _, _ in arcs:
+                # 허용 오차가 아주 작아지면 원래 점을 모두 남김 (원래 고리는 점 3개 이상)
+                arc_tol[key] = arc_tol[key] / 4 if arc_tol[key] > tolerance * 1e-3 else -1.0
+                simplified[key] = points[key][douglas_peucker(points[key], arc_tol[key])]
+        pending = [arcs for arcs in pending if len(_assemble(arcs, simplified)) < 3]
+
+    assembled = iter(_assemble(arcs, simplified) for arcs in ring_arcs)
+    out = []
+    for polys in shapes:
+        new_polys = []
+        for rings in polys:
+            new_rings = []
+            for _ in rings:
+                coords = next(assembled)
+                new_rings.append(np.vstack([coords, coords[:1]]).round(DECIMALS).tolist())
+            new_polys.append(new_rings)
+        if not new_polys:
+            out.append(None)
+        elif len(new_polys) == 1:
+            out.append({"type": "Polygon", "coordinates": new_polys[0]})
+        else:
+            out.append({"type": "MultiPolygon", "coordinates": new_polys})
+    return out
+
+
+# ------------------------------
+# 이름 결합 + 수준별 캐시
+# ------------------------------
+def feature_name(feature):
+    props = feature.get("properties") or {}
+    return next((props[k] for k in NAME_KEYS if props.get(k)), None)
+
+
+def country_ids(features, countries):
+    """feature 순서의 MBTI 국가 이름 (맞는 국가가 없으면 None)"""
+    by_norm = {indicators.normalize_country(c): c for c in countries}
+    return [by_norm.get(indicators.normalize_country(feature_name(f))) for f in features]
+
+
+def available(path=WORLD_GEOJSON):
+    return os.path.exists(path)
+
+
+def simplified_geojson(countries, level="medium", path=WORLD_GEOJSON, cache_dir=GEO_CACHE_DIR):
+    """MBTI 국가와 맞는 feature 만 남긴 단순화 GeoJSON (id = 국가 이름), 수준별 파일 캐시"""
+    if level not in TOLERANCES:
+        raise ValueError(f"알 수 없는 지도 세부 수준: {level!r} (가능: {', '.join(TOLERANCES)})")
+    names_key = hashlib.sha256("\n".join(sorted(countries)).encode("utf-8")).hexdigest()[:12]
+    target = os.path.join(cache_dir, f"world-{data.file_sha256(path)[:16]}-{names_key}-{level}.geojson")
+    if os.path.exists(target):
+        with open(target, encoding="utf-8") as f:
+            return json.load(f)
+
+    with open(path, encoding="utf-8") as f:
+        features = json.load(f)["features"]
+    ids = country_ids(features, countries)
+    # 단순화는 전체 feature 로 해야 이웃 나라와 국경이 맞으므로 결합 전에 수행
+    geometries = simplify_features(features, TOLERANCES[level])
+    merged = {}
+    for cid, geom in zip(ids, geometries):
+        if cid is None or geom is None:
+            continue
+        polys = [geom["coordinates"]] if geom["type"] == "Polygon" else geom["coordinates"]
+        merged.setdefault(cid, []).extend(polys)
+    out = {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "id": cid, "properties": {"name": cid},
+         "geometry": {"type": "Polygon", "coordinates": polys[0]} if len(polys) == 1
+         else {"type": "MultiPolygon", "coordinates": polys}}
+        for cid, polys in merged.items()
+    ]}
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(out, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, target)
+    return out
+
+
+# ------------------------------
+# 단계 구분도 (choropleth)
+# ------------------------------
+def _locations(cube, geojson):
+    if geojson is None:
+        return dict(locations=list(cube.countries), locationmode="country names")
+    return dict(locations=list(cube.countries), geojson=geojson, featureidkey="id")
+
+
+def _layout(fig, title, geojson):
+    fig.update_geos(projection_type="natural earth", showframe=False, showcoastlines=geojson is None,
+                    showcountries=geojson is None, showland=True, landcolor="#eeeeee", lataxis_range=[-58, 85])
+    fig.update_layout(title=dict(text=title, x=0.5), height=560, margin=dict(l=0, r=0, t=90, b=0))
+
+
+def world_choropleth(cube, mode="share", geojson=None, initial=None):
+    """세계 지도: share 는 유형 드롭다운(브라우저에서 z 만 바꿈), top 은 국가별 최다 유형 색 구분
+
+    geojson 은 simplified_geojson() 결과 (None 이면 Plotly 내장 국경). 경계는 figure 에 한 번만 싣고
+    드롭다운 버튼에는 유형별 값 벡터만 들어가므로 유형을 바꿔도 서버 왕복이나 경계 재전송이 없다.
+    """
+    if mode not in MODES:
+        raise ValueError(f"알 수 없는 지도 색 기준: {mode!r} (가능: {', '.join(MODES)})")
+    types = list(cube.types)
+    values = np.round(np.asarray(cube.values, dtype=float), VALUE_DECIMALS)
+
+    if mode == "top":
+        top = np.asarray(cube.order_by_country[:, 0])
+        palette = pcolors.qualitative.Alphabet
+        n = len(types)
+        # 정수 코드 -> 계단형 이산 색상표 (유형 하나당 같은 폭의 구간)
+        scale = [[edge, palette[j % len(palette)]] for j in range(n) for edge in (j / n, (j + 1) / n)]
+        fig = go.Figure(go.Choropleth(
+            **_locations(cube, geojson), z=top, zmin=-0.5, zmax=n - 0.5, colorscale=scale,
+            customdata=np.asarray(types, dtype=object)[top], marker_line_width=0.3,
+            colorbar=dict(title="최다 유형", tickvals=list(range(n)), ticktext=types, len=0.9),
+            hovertemplate="%{location}<br>최다 유형: %{customdata}<extra></extra>",
+        ))
+        _layout(fig, "국가별 가장 많은 MBTI 유형", geojson)
+        return fig
+
+    start = types.index(initial) if initial in types else 0
+
+    def state(j):
+        return ({"z": [values[:, j].tolist()], "colorbar.title.text": f"{types[j]} 비율"},
+                {"title.text": f"국가별 {types[j]} 유형 비율"})
+
+    trace, layout = state(start)
+    fig = go.Figure(go.Choropleth(
+        **_locations(cube, geojson), z=trace["z"][0], colorscale="RdYlBu_r", marker_line_width=0.3,
+        colorbar=dict(title=trace["colorbar.title.text"], tickformat=".0%", len=0.9),
+        hovertemplate="%{location}<br>%{z:.2%}<extra></extra>",
+    ))
+    buttons = [dict(label=t, method="update", args=list(state(j))) for j, t in enumerate(types)]
+    _layout(fig, layout["title.text"], geojson)
+    fig.update_layout(updatemenus=[dict(type="dropdown", buttons=buttons, active=start, showactive=True,
+                                        x=0.0, xanchor="left", y=1.12, yanchor="top")])
+    return fig
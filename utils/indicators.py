@@ -0,0 +1,170 @@
+"""외부 국가 지표(GDP, 행복 지수 등)와 MBTI 16유형의 교차 상관.
+
+- 국가 이름 정규화: 대소문자/악센트/문장부호/괄호 안 약칭을 정리한 뒤 별칭 표(ALIASES)로
+  World Bank·UN 식 표기("Korea, Rep.", "Viet Nam", "Congo, Dem. Rep." …)를 CSV 표기에 맞춘다.
+- 결합: 정규화한 이름으로 지표 표를 MBTI 국가 순서에 맞춘 (국가 × 지표) 행렬로 만든다
+  (같은 국가가 여러 줄이면 평균, 없는 국가는 NaN).
+- 상관: 결측이 많은 지표도 `correlation.masked_corr` 마스크 행렬곱 한 번으로
+  16 × 지표 수 pairwise-complete 상관과 쌍별 표본 수를 함께 구한다.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from utils import correlation
+
+METHODS = ("pearson", "spearman")
+MIN_PERIODS = 10            # 쌍별 공통 국가가 이보다 적으면 NaN
+COUNTRY_COLUMN_NAMES = ("country", "country name", "country_name", "nation", "국가", "국가명")
+
+# 정규화된 이름 -> 정규화된 CSV 표기
+ALIASES = {
+    "korea rep": "south korea",
+    "republic of korea": "south korea",
+    "korea republic of": "south korea",
+    "korea south": "south korea",
+    "korea": "south korea",
+    "us": "united states",
+    "usa": "united states",
+    "united states of america": "united states",
+    "uk": "united kingdom",
+    "great britain": "united kingdom",
+    "united kingdom of great britain and northern ireland": "united kingdom",
+    "russian federation": "russia",
+    "czechia": "czech republic",
+    "slovak republic": "slovakia",
+    "kyrgyz republic": "kyrgyzstan",
+    "north macedonia": "macedonia",
+    "republic of north macedonia": "macedonia",
+    "turkiye": "turkey",
+    "viet nam": "vietnam",
+    "lao pdr": "laos",
+    "lao peoples democratic republic": "laos",
+    "syrian arab republic": "syria",
+    "egypt arab rep": "egypt",
+    "yemen rep": "yemen",
+    "brunei darussalam": "brunei",
+    "republic of moldova": "moldova",
+    "moldova republic of": "moldova",
+    "tanzania united republic of": "tanzania",
+    "united republic of tanzania": "tanzania",
+    "bahamas the": "bahamas",
+    "congo dem rep": "congo kinshasa",
+    "democratic republic of the congo": "congo kinshasa",
+    "dr congo": "congo kinshasa",
+    "dem rep congo": "congo kinshasa",
+    "drc": "congo kinshasa",
+    "congo rep": "congo",
+    "republic of the congo": "congo",
+    "congo brazzaville": "congo",
+    "st kitts and nevis": "saint kitts and nevis",
+    "st lucia": "saint lucia",
+    "st vincent and the grenadines": "saint vincent and the grenadines",
+    "faeroe islands": "faroe islands",
+    "uae": "united arab emirates",
+    "bosnia and herz": "bosnia and herzegovina",
+    "dominican rep": "dominican republic",
+    "central african rep": "central african republic",
+    "myanmar burma": "myanmar",
+    "burma": "myanmar",
+}
+
+
+def normalize_country(name):
+    """비교용 국가 이름: 소문자, 악센트/문장부호 제거, 공백 정리, 별칭 치환"""
+    if name is None or (isinstance(name, float) and np.isnan(name)):
+        return ""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    text = text.replace("&", " and ")
+    text = re.sub(r"[^\w\s]", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    if text.startswith("the "):
+        text = text[4:]
+    return ALIASES.get(text, text)
+
+
+def find_country_column(frame):
+    """국가 열 추정: 알려진 이름이 있으면 그 열, 없으면 첫 문자열 열"""
+    for col in frame.columns:
+        if str(col).strip().casefold() in COUNTRY_COLUMN_NAMES:
+            return col
+    text_cols = [c for c in frame.columns if not pd.api.types.is_numeric_dtype(frame[c])]
+    if not text_cols:
+        raise ValueError("국가 이름 열을 찾을 수 없습니다 (문자열 열이 없음)")
+    return text_cols[0]
+
+
+@dataclass(frozen=True)
+class IndicatorJoin:
+    values: np.ndarray          # (MBTI 국가, 지표) float64, 없는 국가는 NaN
+    indicators: tuple           # 지표 이름 (수치형 열)
+    matched: int                # 지표가 하나라도 붙은 MBTI 국가 수
+    unmatched: tuple            # 지표 표에는 있지만 MBTI 국가와 맞지 않은 이름 (원래 표기)
+    missing: tuple              # 지표가 없는 MBTI 국가
+
+
+def join_indicators(countries, table, country_col=None):
+    """지표 표를 MBTI 국가 순서에 맞춘 행렬로 결합"""
+    country_col = find_country_column(table) if country_col is None else country_col
+    numeric = table.drop(columns=[country_col]).apply(pd.to_numeric, errors="coerce")
+    numeric = numeric.loc[:, numeric.notna().any()]
+    keys = table[country_col].map(normalize_country)
+    grouped = numeric.groupby(keys.to_numpy()).mean()
+
+    target = pd.Index([normalize_country(c) for c in countries])
+    aligned = grouped.reindex(target)
+    has_any = aligned.notna().any(axis=1).to_numpy()
+    known = set(target)
+    unmatched = tuple(dict.fromkeys(str(n) for n, k in zip(table[country_col], keys) if k and k not in known))
+    return IndicatorJoin(
+        values=aligned.to_numpy(dtype=np.float64, na_value=np.nan),
+        indicators=tuple(str(c) for c in grouped.columns),
+        matched=int(has_any.sum()),
+        unmatched=unmatched,
+        missing=tuple(c for c, ok in zip(countries, has_any) if not ok),
+    )
+
+
+def cross_corr(type_values, indicator_values, method="pearson", min_periods=MIN_PERIODS):
+    """(국가 × 16) 와 (국가 × 지표) 사이의 pairwise-complete 상관 -> (r (16, 지표), 쌍별 국가 수)
+
+    스피어만은 pandas 처럼 쌍마다 공통 국가만으로 순위를 다시 매긴다 (`correlation.spearman_cross`).
+    """
+    if method not in METHODS:
+        raise ValueError(f"알 수 없는 상관계수 방식: {method!r} (가능: {', '.join(METHODS)})")
+    A = np.asarray(type_values, dtype=np.float64)
+    B = np.asarray(indicator_values, dtype=np.float64)
+    n = (~np.isnan(A)).astype(np.float64).T @ (~np.isnan(B)).astype(np.float64)
+    if method == "spearman":
+        return correlation.spearman_cross(A, B, min_periods=min_periods), n.astype(np.int64)
+    return correlation.masked_corr(A, B, min_periods=min_periods), n.astype(np.int64)
+
+
+def top_cells(r, n, rows, cols, k=20):
+    """|r| 상위 k개 (행, 열) -> DataFrame[MBTI, 지표, 상관계수, 국가 수]"""
+    score = np.where(np.isnan(r), -1.0, np.abs(r)).ravel()
+    k = min(k, int((score >= 0).sum()))
+    if k == 0:
+        return pd.DataFrame(columns=["MBTI", "지표", "상관계수", "국가 수"])
+    idx = np.argpartition(-score, k - 1)[:k]
+    idx = idx[np.argsort(-score[idx], kind="stable")]
+    i, j = np.divmod(idx, r.shape[1])
+    return pd.DataFrame({
+        "MBTI": np.asarray(rows, dtype=object)[i],
+        "지표": np.asarray(cols, dtype=object)[j],
+        "상관계수": r[i, j],
+        "국가 수": n[i, j],
+    })
+
+
+def strongest_columns(r, limit):
+    """히트맵에 보일 지표 열: 행 중 최대 |r| 이 큰 순으로 limit 개 (원래 순서 유지)"""
+    if r.shape[1] <= limit:
+        return np.arange(r.shape[1])
+    score = np.nanmax(np.where(np.isnan(r), -1.0, np.abs(r)), axis=0)
+    return np.sort(np.argpartition(-score, limit - 1)[:limit])
@@ -0,0 +1,190 @@
+"""표 형식 파일 수집 단계: CSV / XLSX / Parquet -> 타입이 정해진 Parquet 캐시.
+
+원본은 내용 해시(sha256)와 변환 방식 리비전(`INGEST_REVISION`)을 키로 한 번만 변환하고, 이후에는 Parquet에서
+필요한 열만 열 단위로 읽습니다. 큰 파일은 `CHUNK_ROWS` 행씩 나눠 읽어
+변환 중 메모리 사용량을 묶어 두며, 열 타입은 첫 `SAMPLE_ROWS` 행으로 추론합니다.
+"""
+
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+
+from utils import data
+
+CHUNK_ROWS = 50_000
+SAMPLE_ROWS = 1_000
+NUMERIC_THRESHOLD = 0.95    # 표본에서 이 비율 이상 숫자로 변환되면 수치형 열로 취급
+# 같은 원본이라도 스키마 추론/타입 변환 방식이 바뀌면 올려서 이전 Parquet 캐시를 쓰지 않게 함
+INGEST_REVISION = 1
+INGEST_DIR = os.path.join(data.CACHE_DIRNAME, "ingest")
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx", ".xlsm", ".parquet")
+
+
+def source_hash(source):
+    """경로(str) 또는 업로드된 bytes의 sha256"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    return data.file_sha256(source)
+
+
+def ingest_key(digest, filename):
+    """(내용 해시, 확장자, 리비전) -> 캐시 파일 이름 키"""
+    payload = json.dumps({"sha256": digest, "ext": os.path.splitext(str(filename))[1].lower(),
+                          "revision": INGEST_REVISION}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def _open(source):
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+
+
+def _unique_columns(header):
+    seen = {}
+    columns = []
+    for i, name in enumerate(header):
+        name = f"Unnamed: {i}" if name is None or str(name).strip() == "" else str(name)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+def _iter_csv(source):
+    # 모든 열을 문자열로 읽고 타입은 표본 기준으로 한 번에 정함 (청크마다 dtype이 달라지지 않도록)
+    yield from pd.read_csv(_open(source), chunksize=CHUNK_ROWS, dtype=str)
+
+
+def _iter_excel(source):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(_open(source), read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _unique_columns(header)
+        batch = []
+        for row in rows:
+            if all(v is None for v in row):
+                continue
+            batch.append(row[:len(columns)])
+            if len(batch) >= CHUNK_ROWS:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+    finally:
+        wb.close()
+
+
+def _iter_parquet(source):
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(_open(source)).iter_batches(batch_size=CHUNK_ROWS):
+        yield batch.to_pandas()
+
+
+def iter_chunks(source, filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".csv":
+        return _iter_csv(source)
+    if ext in (".xlsx", ".xlsm"):
+        return _iter_excel(source)
+    if ext == ".parquet":
+        return _iter_parquet(source)
+    raise ValueError(f"지원하지 않는 파일 형식입니다: {filename} (가능: {', '.join(SUPPORTED_EXTENSIONS)})")
+
+
+def infer_schema(sample):
+    """표본 DataFrame -> {열: "float64" | "string"}"""
+    schema = {}
+    for col in sample.columns:
+        s = sample[col]
+        non_null = s.notna().sum()
+        if non_null == 0:
+            schema[col] = "string"
+            continue
+        numeric = pd.to_numeric(s, errors="coerce")
+        schema[col] = "float64" if numeric.notna().sum() >= NUMERIC_THRESHOLD * non_null else "string"
+    return schema
+
+
+def _coerce(chunk, schema):
+    out = {}
+    for col, dtype in schema.items():
+        s = chunk[col] if col in chunk.columns else pd.Series([None] * len(chunk), dtype=object)
+        if dtype == "float64":
+            out[col] = pd.to_numeric(s, errors="coerce").astype("float64")
+        else:
+            out[col] = s.astype("string")
+    return pd.DataFrame(out)
+
+
+def ingest(source, filename=None, cache_dir=INGEST_DIR):
+    """source(경로 또는 bytes)를 Parquet 캐시로 변환하고 그 경로를 반환 (이미 있으면 재사용)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if filename is None:
+        filename = source
+    target = os.path.join(cache_dir, f"{ingest_key(source_hash(source), filename)}.parquet")
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    writer = None
+    schema = None
+    try:
+        try:
+            for chunk in iter_chunks(source, filename):
+                if schema is None:
+                    schema = infer_schema(chunk.head(SAMPLE_ROWS))
+                table = pa.Table.from_pandas(_coerce(chunk, schema), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema)
+                writer.write_table(table.cast(writer.schema))
+            if writer is None:
+                raise ValueError(f"{filename}: 데이터가 없습니다.")
+        finally:
+            if writer is not None:
+                writer.close()
+        os.replace(tmp, target)
+    except BaseException:
+        # 변환에 실패하면 반쯤 쓴 임시 파일을 남기지 않음
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return target
+
+
+def numeric_columns(parquet_path):
+    """데이터를 읽지 않고 Parquet 스키마만으로 수치형 열 목록을 구함"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(parquet_path)
+    return [f.name for f in schema
+            if pa.types.is_floating(f.type) or pa.types.is_integer(f.type)]
+
+
+def text_columns(parquet_path):
+    """Parquet 스키마에서 문자열 열 목록 (국가 이름처럼 결합 키로 쓸 열 후보)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(parquet_path)
+    return [f.name for f in schema if pa.types.is_string(f.type) or pa.types.is_large_string(f.type)]
+
+
+def read_columns(parquet_path, columns):
+    return pd.read_parquet(parquet_path, columns=list(columns))
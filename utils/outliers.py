@@ -0,0 +1,80 @@
+"""IQR 기반 결측치/이상치 처리 엔진.
+
+모든 열의 사분위수를 행렬 한 번으로 계산하고, 세 가지 처리 방식을 제공합니다.
+
+- ``simultaneous``: 전체 데이터 기준 경계로 모든 열을 한 번에 검사해 행 제거
+- ``sequential``: 기존 main.py 방식 (열 순서대로 걸러진 데이터에서 경계를 다시 계산).
+  결과가 열 순서에 따라 달라지므로 원래 CSV 열 순서(``order``)로 돌아야 기존 결과와 같다.
+- ``clip``: 행은 유지하고 경계를 벗어난 값을 경계값으로 자름 (winsorize)
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+MODES = ("simultaneous", "sequential", "clip")
+
+
+@dataclass(frozen=True)
+class OutlierResult:
+    values: np.ndarray      # 처리 후 행렬
+    keep: np.ndarray        # 원본 행 기준 유지 여부 (bool)
+    lower: np.ndarray       # 열별 하한 (sequential은 마지막으로 적용된 값)
+    upper: np.ndarray       # 열별 상한
+    mode: str
+    rows_removed: int
+    cells_flagged: int      # 경계를 벗어나 제거/클리핑된 셀 수
+
+
+def impute_mean(values):
+    """열 평균으로 결측치를 채운 복사본과 채운 셀 수를 반환"""
+    values = np.array(values, dtype=np.float32)
+    mask = np.isnan(values)
+    n_missing = int(mask.sum())
+    if n_missing:
+        means = np.nanmean(values, axis=0)
+        values[mask] = np.take(means, np.nonzero(mask)[1])
+    return values, n_missing
+
+
+def iqr_bounds(values, k=1.5):
+    """모든 열의 (하한, 상한)을 한 번의 quantile 호출로 계산"""
+    q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+    iqr = q3 - q1
+    return q1 - k * iqr, q3 + k * iqr
+
+
+def remove_outliers(values, mode="simultaneous", k=1.5, order=None):
+    """order: sequential 에서 열을 검사할 순서 (열 인덱스, None 이면 행렬 열 순서)"""
+    if mode not in MODES:
+        raise ValueError(f"알 수 없는 이상치 처리 방식: {mode!r} (가능: {', '.join(MODES)})")
+    values = np.asarray(values)
+    n_rows = values.shape[0]
+
+    if mode == "sequential":
+        # 기존 동작 재현: 열마다 남은 행에서 경계를 다시 구함 (행 복사 없이 인덱스만 줄임)
+        idx = np.arange(n_rows)
+        lower = np.empty(values.shape[1])
+        upper = np.empty(values.shape[1])
+        cells = 0
+        for j in (range(values.shape[1]) if order is None else order):
+            col = values[idx, j]
+            lo, hi = iqr_bounds(col[:, None], k)
+            lower[j], upper[j] = lo[0], hi[0]
+            ok = (col >= lower[j]) & (col <= upper[j])
+            cells += int((~ok).sum())
+            idx = idx[ok]
+        keep = np.zeros(n_rows, dtype=bool)
+        keep[idx] = True
+        return OutlierResult(values[keep], keep, lower, upper, mode, n_rows - len(idx), cells)
+
+    lower, upper = iqr_bounds(values, k)
+    inside = (values >= lower) & (values <= upper)
+    cells = int(inside.size - inside.sum())
+
+    if mode == "clip":
+        keep = np.ones(n_rows, dtype=bool)
+        return OutlierResult(np.clip(values, lower, upper), keep, lower, upper, mode, 0, cells)
+
+    keep = inside.all(axis=1)
+    return OutlierResult(values[keep], keep, lower, upper, mode, int(n_rows - keep.sum()), cells)
@@ -0,0 +1,301 @@
+"""페이지 성능 계측: 구간 시간, 메모리, 캐시 적중/미스, 차트 직렬화 크기.
+
+기본은 꺼져 있으며 꺼진 상태의 span()/cached()/plotly_chart() 는 호출 하나 수준의 비용만 듭니다.
+켜는 방법: 사이드바 '🔧 성능 디버그' 토글, URL 에 ?debug=1, 또는 환경변수 MBTI_PERF=1.
+메모리(tracemalloc)는 패널의 체크박스나 MBTI_PERF_MEM=1 로 따로 켭니다 (켜면 실행이 느려짐).
+tracemalloc 은 프로세스 전체에 하나라서, 메모리 추적을 요청한 세션 수를 세어 첫 세션이 켜고
+마지막 세션이 끌 때만 멈춥니다 (다른 세션의 재실행이 디버깅 중인 세션의 추적을 끊지 않도록).
+
+페이지에서는 다음처럼 씁니다.
+    perf.begin("main")                      # set_page_config 바로 다음
+    @perf.cached(st.cache_data)             # st.cache_data 대신: 호출 시간 + 적중/미스
+    @perf.fragment                          # st.fragment 대신: 구역만 다시 실행될 때도 기록
+    with perf.span("이상치 처리"): ...       # 임의 구간
+    perf.plotly_chart(fig, "파이", ...)     # st.plotly_chart + figure JSON 크기
+    perf.finish()                           # 페이지 끝: 패널 출력 + .cache/perf.jsonl 기록
+"""
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+from utils.data import CACHE_DIRNAME
+
+ENABLE_ENV = "MBTI_PERF"
+MEMORY_ENV = "MBTI_PERF_MEM"
+LOG_PATH = os.path.join(CACHE_DIRNAME, "perf.jsonl")
+TOGGLE_KEY = "_perf_debug"
+MEMORY_KEY = "_perf_memory"
+PAGE_KEY = "_perf_page"
+
+_local = threading.local()          # 스크립트 실행 스레드별 현재 기록
+_log_lock = threading.Lock()
+_memory_lock = threading.Lock()
+_memory_sessions = set()            # 메모리 추적을 요청 중인 세션 id
+_memory_owned = False               # tracemalloc 을 이 모듈이 켰는지 (밖에서 켠 추적은 끄지 않음)
+_NULL = contextlib.nullcontext()
+
+
+@dataclass
+class Run:
+    page: str
+    memory: bool
+    panel: object = None
+    started: float = field(default_factory=time.perf_counter)
+    spans: list = field(default_factory=list)       # (이름, 초, 메모리 최대 증가 바이트 | None)
+    caches: dict = field(default_factory=dict)      # 이름 -> [적중, 미스]
+    figures: list = field(default_factory=list)     # (이름, JSON 바이트)
+    stack: list = field(default_factory=list)       # 열린 구간 [이름, 시작 메모리, 최대 메모리]
+
+
+def current():
+    return getattr(_local, "run", None)
+
+
+def enabled():
+    return current() is not None
+
+
+def _session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def _want_memory(session, want):
+    """세션의 메모리 추적 요청을 갱신: 요청 세션이 0 -> 1 이면 시작, 1 -> 0 이면 (켠 경우만) 멈춤"""
+    global _memory_owned
+    with _memory_lock:
+        if want:
+            _memory_sessions.add(session)
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _memory_owned = True
+        elif session in _memory_sessions:
+            _memory_sessions.discard(session)
+            if not _memory_sessions and _memory_owned and tracemalloc.is_tracing():
+                tracemalloc.stop()
+                _memory_owned = False
+
+
+def begin(page):
+    """페이지 맨 위에서 호출: 디버그 토글을 그리고, 켜져 있으면 이번 실행의 기록을 시작"""
+    import streamlit as st
+
+    panel = st.sidebar.expander("🔧 성능 디버그")
+    forced = os.environ.get(ENABLE_ENV) == "1" or st.query_params.get("debug") == "1"
+    on = panel.toggle("계측 켜기", value=forced, key=TOGGLE_KEY)
+    session = _session_id()
+    if not on:
+        _want_memory(session, False)
+        _local.run = None
+        return None
+    memory = panel.checkbox("메모리 추적 (tracemalloc)", value=os.environ.get(MEMORY_ENV) == "1", key=MEMORY_KEY)
+    _want_memory(session, memory)
+    st.session_state[PAGE_KEY] = page
+    _local.run = Run(page, memory, panel)
+    return _local.run
+
+
+class _Span:
+    __slots__ = ("run", "name", "t0")
+
+    def __init__(self, run, name):
+        self.run, self.name = run, name
+
+    def __enter__(self):
+        run = self.run
+        if run.memory and tracemalloc.is_tracing():
+            cur, peak = tracemalloc.get_traced_memory()
+            if run.stack:
+                # 바깥 구간의 최대치를 넘겨받은 뒤 안쪽 구간용으로 초기화
+                run.stack[-1][2] = max(run.stack[-1][2], peak)
+            tracemalloc.reset_peak()
+            run.stack.append([self.name, cur, cur])
+        else:
+            run.stack.append([self.name, None, None])
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.t0
+        run = self.run
+        path = "/".join(frame[0] for frame in run.stack)
+        _, start, peak = run.stack.pop()
+        grown = None
+        if start is not None and tracemalloc.is_tracing():
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            grown = peak - start
+            if run.stack and run.stack[-1][2] is not None:
+                run.stack[-1][2] = max(run.stack[-1][2], peak)
+            tracemalloc.reset_peak()
+        run.spans.append((path, elapsed, grown))
+        return False
+
+
+def span(name):
+    """이름 붙은 시간 구간 (중첩 가능, 이름은 '바깥/안쪽' 으로 기록)"""
+    run = current()
+    return _Span(run, name) if run is not None else _NULL
+
+
+def record_cache(name, hit):
+    run = current()
+    if run is not None:
+        counts = run.caches.setdefault(name, [0, 0])
+        counts[0 if hit else 1] += 1
+
+
+def cached(cache_decorator, name=None, **kwargs):
+    """st.cache_data / st.cache_resource 대신 쓰는 데코레이터
+
+    캐시 안쪽 본문이 실제로 실행되면 미스, 아니면 적중으로 셉니다.
+    functools.wraps 로 원래 함수 정보를 유지하므로 Streamlit 캐시 키와 `_` 인자 제외 규칙은 그대로입니다.
+    """
+    def wrap(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def body(*args, **kw):
+            run = current()
+            if run is not None:
+                run.caches.setdefault(label, [0, 0])[1] += 1
+            return fn(*args, **kw)
+
+        inner = cache_decorator(**kwargs)(body) if kwargs else cache_decorator(body)
+
+        @functools.wraps(fn)
+        def call(*args, **kw):
+            run = current()
+            if run is None:
+                return inner(*args, **kw)
+            counts = run.caches.setdefault(label, [0, 0])
+            misses = counts[1]
+            with _Span(run, label):
+                out = inner(*args, **kw)
+            if counts[1] == misses:
+                counts[0] += 1
+            return out
+
+        call.clear = inner.clear
+        return call
+
+    return wrap
+
+
+def fragment(fn):
+    """st.fragment 와 같되, 구역만 다시 실행될 때는 '페이지#구역' 이름으로 따로 기록
+
+    구역 단독 실행 중에는 사이드바에 쓸 수 없으므로 패널은 건너뛰고 JSONL 로그에만 남긴다.
+    """
+    import streamlit as st
+
+    @functools.wraps(fn)
+    def body(*args, **kw):
+        # 전체 실행 중(current 있음)이거나 계측이 꺼져 있으면 그대로 실행
+        if current() is not None or not st.session_state.get(TOGGLE_KEY):
+            return fn(*args, **kw)
+        _local.run = Run(f"{st.session_state.get(PAGE_KEY, '?')}#{fn.__name__}", tracemalloc.is_tracing())
+        try:
+            return fn(*args, **kw)
+        finally:
+            finish()
+
+    return st.fragment(body)
+
+
+def plotly_chart(fig, name, **kwargs):
+    """st.plotly_chart 와 같되, 계측 중이면 전송 시간과 figure JSON 크기를 기록"""
+    import streamlit as st
+
+    run = current()
+    if run is None:
+        return st.plotly_chart(fig, **kwargs)
+    with _Span(run, f"차트 전송:{name}"):
+        out = st.plotly_chart(fig, **kwargs)
+    run.figures.append((name, len(fig.to_json())))
+    return out
+
+
+def _record(run, total):
+    return {
+        "ts": time.time(),
+        "page": run.page,
+        "total_ms": round(total * 1e3, 3),
+        "memory": run.memory,
+        "spans": [{"name": n, "ms": round(s * 1e3, 3), "mem_bytes": m} for n, s, m in run.spans],
+        "caches": {n: {"hits": h, "misses": m} for n, (h, m) in run.caches.items()},
+        "figures": dict(run.figures),
+    }
+
+
+def append_log(record, path=LOG_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    line = json.dumps(record, ensure_ascii=False)
+    with _log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def finish():
+    """페이지 맨 끝에서 호출: 패널에 결과를 쓰고 JSONL 로그에 한 줄 추가"""
+    run = current()
+    _local.run = None
+    if run is None:
+        return None
+    import pandas as pd
+
+    total = time.perf_counter() - run.started
+    record = _record(run, total)
+    append_log(record)
+
+    panel = run.panel
+    if panel is None:
+        return record
+    panel.metric("스크립트 실행 시간", f"{total * 1e3:,.0f} ms")
+    spans = pd.DataFrame(record["spans"], columns=["name", "ms", "mem_bytes"])
+    spans.columns = ["구간", "ms", "메모리 증가 (B)"]
+    panel.dataframe(spans.sort_values("ms", ascending=False), hide_index=True)
+    if run.caches:
+        panel.dataframe(pd.DataFrame([(n, h, m) for n, (h, m) in run.caches.items()],
+                                     columns=["캐시", "적중", "미스"]), hide_index=True)
+    if run.figures:
+        panel.dataframe(pd.DataFrame([(n, b / 1024) for n, b in run.figures], columns=["차트", "KB"]),
+                        hide_index=True)
+    panel.caption(f"기록: `{LOG_PATH}`")
+    return record
+
+
+def read_log(path=LOG_PATH):
+    """JSONL 로그 -> 구간 단위 DataFrame (page, ts, name, ms, mem_bytes)"""
+    import pandas as pd
+
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            rec = json.loads(line)
+            rows.append((rec["page"], rec["ts"], "(전체)", rec["total_ms"], None))
+            rows.extend((rec["page"], rec["ts"], s["name"], s["ms"], s["mem_bytes"]) for s in rec["spans"])
+    return pd.DataFrame(rows, columns=["page", "ts", "name", "ms", "mem_bytes"])
+
+
+def summarize_log(path=LOG_PATH):
+    """페이지/구간별 호출 수, 중앙값, p95, 최대 (ms)"""
+    frame = read_log(path)
+    grouped = frame.groupby(["page", "name"])["ms"]
+    summary = grouped.agg(count="count", p50="median", p95=lambda s: s.quantile(0.95), max="max")
+    return summary.sort_values("p95", ascending=False).reset_index()
+
+
+if __name__ == "__main__":
+    import sys
+
+    import pandas as pd
+
+    with pd.option_context("display.max_rows", 200, "display.width", 160):
+        print(summarize_log(sys.argv[1] if len(sys.argv) > 1 else LOG_PATH).to_string(index=False))
@@ -0,0 +1,174 @@
+"""지도 페이지용 POI(관광지) 저장소와 격자 공간 인덱스.
+
+CSV(name, lat, lon, desc) 또는 GeoJSON(Point) 파일에서 POI를 읽어 위경도 격자 셀 단위로
+정렬해 두고, 현재 지도 화면(viewport) 범위에 들어오는 점만 빠르게 찾습니다.
+마커 레이어는 줌 구간별 한도(BUCKET_LIMITS)와 점 개수로 개별 마커 / MarkerCluster /
+FastMarkerCluster 중에서 고릅니다 (멀리서 볼수록 일찍 묶고, 가까이서는 개별 마커를 더 많이 보임).
+페이지는 같은 (도시, 줌에 맞춘 타일 범위) 조회 결과(POI 인덱스)를 캐시하고, 지도 HTML 은 캐시하지 않습니다.
+"""
+
+import json
+import math
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CELL_DEG = 0.01     # 약 1km 격자
+MARKER_LIMIT = 300          # 이하: 개별 마커
+CLUSTER_LIMIT = 2_000       # 이하: MarkerCluster, 초과: FastMarkerCluster (JS 한 번에 생성)
+ZOOM_BUCKETS = ((0, 10, "low"), (11, 14, "mid"), (15, 30, "high"))
+# 줌 구간 -> (개별 마커 한도, MarkerCluster 한도)
+BUCKET_LIMITS = {
+    "low": (50, 1_000),
+    "mid": (MARKER_LIMIT, CLUSTER_LIMIT),
+    "high": (1_000, 5_000),
+}
+
+
+@dataclass(frozen=True)
+class POIStore:
+    names: np.ndarray
+    descs: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    cell_deg: float
+    lat0: float
+    lon0: float
+    n_cols: int
+    n_rows: int
+    order: np.ndarray       # 셀 키 순으로 정렬한 원래 인덱스
+    keys: np.ndarray        # 정렬된 셀 키 (row * n_cols + col)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def extent(self):
+        """(south, west, north, east)"""
+        return float(self.lat.min()), float(self.lon.min()), float(self.lat.max()), float(self.lon.max())
+
+    @property
+    def center(self):
+        s, w, n, e = self.extent
+        return (s + n) / 2, (w + e) / 2
+
+    def query(self, south, west, north, east):
+        """범위 안 POI 인덱스 (격자 셀 행마다 연속 구간을 searchsorted로 찾은 뒤 정확히 거름)"""
+        if len(self) == 0:
+            return np.empty(0, dtype=np.intp)
+        r0 = max(int(math.floor((south - self.lat0) / self.cell_deg)), 0)
+        r1 = min(int(math.floor((north - self.lat0) / self.cell_deg)), self.n_rows - 1)
+        c0 = max(int(math.floor((west - self.lon0) / self.cell_deg)), 0)
+        c1 = min(int(math.floor((east - self.lon0) / self.cell_deg)), self.n_cols - 1)
+        if r0 > r1 or c0 > c1:
+            return np.empty(0, dtype=np.intp)
+        rows = np.arange(r0, r1 + 1)
+        lo = np.searchsorted(self.keys, rows * self.n_cols + c0, side="left")
+        hi = np.searchsorted(self.keys, rows * self.n_cols + c1, side="right")
+        cand = np.concatenate([self.order[a:b] for a, b in zip(lo, hi) if b > a] or [np.empty(0, dtype=np.intp)])
+        inside = ((self.lat[cand] >= south) & (self.lat[cand] <= north)
+                  & (self.lon[cand] >= west) & (self.lon[cand] <= east))
+        return np.sort(cand[inside])
+
+
+def build_store(frame, cell_deg=DEFAULT_CELL_DEG):
+    lat = frame["lat"].to_numpy(dtype=np.float64)
+    lon = frame["lon"].to_numpy(dtype=np.float64)
+    names = frame["name"].astype(str).to_numpy(dtype=object)
+    descs = (frame["desc"] if "desc" in frame else pd.Series([""] * len(frame))).fillna("").astype(str).to_numpy(dtype=object)
+    lat0 = float(lat.min()) if len(lat) else 0.0
+    lon0 = float(lon.min()) if len(lon) else 0.0
+    rows = np.floor((lat - lat0) / cell_deg).astype(np.int64)
+    cols = np.floor((lon - lon0) / cell_deg).astype(np.int64)
+    n_rows = int(rows.max()) + 1 if len(rows) else 1
+    n_cols = int(cols.max()) + 1 if len(cols) else 1
+    keys = rows * n_cols + cols
+    order = np.argsort(keys, kind="stable")
+    return POIStore(names, descs, lat, lon, cell_deg, lat0, lon0, n_cols, n_rows, order, keys[order])
+
+
+def read_pois(path):
+    """CSV(name, lat, lon[, desc]) 또는 GeoJSON(Point, properties.name/desc) -> DataFrame"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".geojson", ".json"):
+        with open(path, encoding="utf-8") as f:
+            features = json.load(f).get("features", [])
+        records = [
+            {
+                "name": feat.get("properties", {}).get("name", ""),
+                "desc": feat.get("properties", {}).get("desc", ""),
+                "lon": feat["geometry"]["coordinates"][0],
+                "lat": feat["geometry"]["coordinates"][1],
+            }
+            for feat in features
+            if feat.get("geometry", {}).get("type") == "Point"
+        ]
+        return pd.DataFrame(records, columns=["name", "lat", "lon", "desc"])
+    frame = pd.read_csv(path)
+    missing = {"name", "lat", "lon"} - set(frame.columns)
+    if missing:
+        raise ValueError(f"{path}: 필요한 열이 없습니다 ({', '.join(sorted(missing))})")
+    return frame
+
+
+def load_store(path, cell_deg=DEFAULT_CELL_DEG):
+    return build_store(read_pois(path), cell_deg)
+
+
+def zoom_bucket(zoom):
+    for lo, hi, name in ZOOM_BUCKETS:
+        if lo <= zoom <= hi:
+            return name
+    return ZOOM_BUCKETS[-1][2]
+
+
+def snap_bounds(south, west, north, east, zoom):
+    """화면 범위를 줌 수준의 타일 격자에 맞춰 넓힘 (캐시 키가 무한히 늘지 않도록)"""
+    tile = 360.0 / (2 ** max(int(zoom), 0))
+    return (
+        math.floor(south / tile) * tile, math.floor(west / tile) * tile,
+        math.ceil(north / tile) * tile, math.ceil(east / tile) * tile,
+    )
+
+
+def marker_layer(store, idx, bucket="mid", icon_color="blue", icon="info-sign", name="POI"):
+    """조회된 POI 인덱스 -> folium FeatureGroup (줌 구간 한도와 개수에 따라 마커/클러스터 방식 선택)"""
+    import folium
+    from folium.plugins import FastMarkerCluster, MarkerCluster
+
+    if bucket not in BUCKET_LIMITS:
+        raise ValueError(f"알 수 없는 줌 구간: {bucket!r} (가능: {', '.join(BUCKET_LIMITS)})")
+    marker_limit, cluster_limit = BUCKET_LIMITS[bucket]
+    fg = folium.FeatureGroup(name=name)
+    if len(idx) > cluster_limit:
+        # 마커 객체를 만들지 않고 좌표 배열과 JS 콜백만 전송
+        data = [list(row) for row in zip(store.lat[idx].tolist(), store.lon[idx].tolist(), store.names[idx].tolist())]
+        FastMarkerCluster(data, callback="""
+            function (row) {
+                var marker = L.marker(new L.LatLng(row[0], row[1]));
+                marker.bindTooltip(row[2]);
+                return marker;
+            };""").add_to(fg)
+        return fg
+
+    parent = MarkerCluster().add_to(fg) if len(idx) > marker_limit else fg
+    for i in idx:
+        folium.Marker(
+            [store.lat[i], store.lon[i]],
+            tooltip=store.names[i],
+            popup=f"<b>{store.names[i]}</b><br>{store.descs[i]}",
+            icon=folium.Icon(color=icon_color, icon=icon),
+        ).add_to(parent)
+    return fg
+
+
+def viewport_from_state(state, store, default_zoom):
+    """st_folium 반환값(bounds, zoom)에서 (south, west, north, east, zoom), 없으면 전체 범위"""
+    bounds = (state or {}).get("bounds") or {}
+    sw, ne = bounds.get("_southWest") or {}, bounds.get("_northEast") or {}
+    zoom = (state or {}).get("zoom") or default_zoom
+    if None in (sw.get("lat"), sw.get("lng"), ne.get("lat"), ne.get("lng")):
+        return (*store.extent, zoom)
+    return sw["lat"], sw["lng"], ne["lat"], ne["lng"], zoom
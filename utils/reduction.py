@@ -0,0 +1,148 @@
+"""PCA + 군집화 엔진 (NumPy 전용, scikit-learn 불필요).
+
+표준화 -> SVD 기반 PCA로 투영/설명 분산/로딩을 구하고, 같은 표준화 데이터에서
+k-means 또는 Ward 계층 군집 레이블을 계산합니다.
+결과는 데이터 버전과 파라미터별로 `.cache/` 의 `.npz` 로 저장해 두어
+새 프로세스에서도 다시 적합하지 않습니다.
+"""
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from utils import data
+
+CLUSTER_METHODS = ("kmeans", "hierarchical", "none")
+
+
+@dataclass(frozen=True)
+class ReductionResult:
+    projection: np.ndarray          # (행, n_components)
+    explained_variance_ratio: np.ndarray
+    loadings: np.ndarray            # (n_components, 특성)
+    labels: np.ndarray              # (행,) 군집 번호, 군집화 안 하면 모두 0
+    method: str
+    n_clusters: int
+
+
+def standardize(values):
+    """StandardScaler와 같은 방식 (모집단 표준편차, 분산 0인 열은 그대로)"""
+    X = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0)
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    return (X - mean) / std
+
+
+def pca(X, n_components=3):
+    """SVD로 PCA. 부호는 각 주성분에서 절대값이 가장 큰 로딩이 양수가 되도록 고정"""
+    Xc = X - X.mean(axis=0)
+    U, S, Vt = np.linalg.svd(Xc, full_matrices=False)
+    signs = np.sign(Vt[np.arange(Vt.shape[0]), np.abs(Vt).argmax(axis=1)])
+    U *= signs
+    Vt *= signs[:, None]
+    var = S ** 2
+    k = min(n_components, Vt.shape[0])
+    return U[:, :k] * S[:k], var[:k] / var.sum(), Vt[:k]
+
+
+def kmeans(X, n_clusters, seed=42, n_init=10, max_iter=300):
+    """k-means++ 초기화 + Lloyd 반복, n_init 중 관성이 가장 작은 결과"""
+    rng = np.random.default_rng(seed)
+    sq = (X ** 2).sum(axis=1)
+    best_labels, best_inertia = None, np.inf
+    for _ in range(n_init):
+        centers = X[[rng.integers(len(X))]]
+        for _ in range(1, n_clusters):
+            d2 = np.min(sq[:, None] - 2 * X @ centers.T + (centers ** 2).sum(axis=1), axis=1).clip(min=0)
+            probs = d2 / d2.sum() if d2.sum() > 0 else None
+            centers = np.vstack([centers, X[rng.choice(len(X), p=probs)]])
+        for _ in range(max_iter):
+            d2 = sq[:, None] - 2 * X @ centers.T + (centers ** 2).sum(axis=1)
+            labels = d2.argmin(axis=1)
+            counts = np.bincount(labels, minlength=n_clusters)
+            sums = np.zeros_like(centers)
+            np.add.at(sums, labels, X)
+            new_centers = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+            if np.allclose(new_centers, centers):
+                break
+            centers = new_centers
+        inertia = d2[np.arange(len(X)), labels].sum()
+        if inertia < best_inertia:
+            best_labels, best_inertia = labels, inertia
+    return _relabel(best_labels)
+
+
+def ward(X, n_clusters):
+    """Ward 계층 군집 (Lance-Williams 갱신, O(n^2) 메모리)"""
+    n = len(X)
+    sq = (X ** 2).sum(axis=1)
+    D = (sq[:, None] - 2 * X @ X.T + sq[None, :]).clip(min=0)
+    np.fill_diagonal(D, np.inf)
+    size = np.ones(n)
+    active = np.ones(n, dtype=bool)
+    members = np.arange(n)
+    for _ in range(n - n_clusters):
+        i, j = np.unravel_index(np.argmin(D), D.shape)
+        if i > j:
+            i, j = j, i
+        si, sj, sk = size[i], size[j], size
+        d_ij = D[i, j]
+        # Ward 거리(제곱 유클리드 기준) 갱신
+        new = ((si + sk) * D[i] + (sj + sk) * D[j] - sk * d_ij) / (si + sj + sk)
+        new[~active] = np.inf
+        D[i], D[:, i] = new, new
+        D[i, i] = np.inf
+        D[j], D[:, j] = np.inf, np.inf
+        size[i] += sj
+        active[j] = False
+        members[members == j] = i
+    return _relabel(members)
+
+
+def _relabel(labels):
+    # 첫 등장 순서대로 0, 1, 2 ... 로 번호를 다시 매겨 실행 간 안정적으로 유지
+    _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    order = np.argsort(np.argsort(first))
+    return order[inverse].astype(np.int32)
+
+
+def compute_reduction(values, n_components=3, method="kmeans", n_clusters=4, seed=42):
+    if method not in CLUSTER_METHODS:
+        raise ValueError(f"알 수 없는 군집화 방식: {method!r} (가능: {', '.join(CLUSTER_METHODS)})")
+    X = standardize(values)
+    projection, evr, loadings = pca(X, n_components)
+    if method == "kmeans":
+        labels = kmeans(X, n_clusters, seed=seed)
+    elif method == "hierarchical":
+        labels = ward(X, n_clusters)
+    else:
+        labels, n_clusters = np.zeros(len(X), dtype=np.int32), 1
+    return ReductionResult(projection, evr, loadings, labels, method, n_clusters)
+
+
+def load_reduction(dataset, path=data.DEFAULT_CSV, n_components=3, method="kmeans", n_clusters=4, seed=42):
+    """데이터 캐시 옆 `.npz` 에 저장된 결과가 있으면 읽고, 없으면 계산 후 저장"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(
+        data.cache_dir_for(path),
+        f"{stem}.{dataset.version[:16]}.pca{n_components}.{method}{n_clusters}.s{seed}.npz",
+    )
+    try:
+        with np.load(cache_path) as z:
+            return ReductionResult(z["projection"], z["evr"], z["loadings"], z["labels"],
+                                   method, int(z["n_clusters"]))
+    except (OSError, KeyError, ValueError):
+        pass
+
+    result = compute_reduction(dataset.values, n_components, method, n_clusters, seed)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = f"{cache_path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, projection=result.projection, evr=result.explained_variance_ratio,
+                 loadings=result.loadings, labels=result.labels, n_clusters=result.n_clusters)
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
+    return result
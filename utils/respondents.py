@@ -0,0 +1,297 @@
+"""응답자 단위 설문 데이터 -> 국가 × 16유형 집계 (스트리밍 + 파일별 체크포인트).
+
+원본 응답 파일(국가, MBTI 유형, 응답 시각 …)을 `CHUNK_ROWS` 행씩 읽으며 국가 × 16 정수 개수 배열에
+더해 가므로, 메모리는 입력 크기가 아니라 출력(국가 수 × 16) 크기에 묶입니다.
+파일 하나를 다 세면 그 결과를 내용 해시(sha256) 키의 체크포인트로 `.cache/respondents/` 에 저장하고,
+다음 실행에서는 바뀐 파일/새 파일만 다시 셉니다. 결과는 페이지가 쓰는 비율 행렬(MBTIDataset)과
+국가별 표본 수이며, CLI 로 countriesMBTI_16types.csv 형식(+ Respondents 열)으로 내보낼 수 있습니다.
+
+    python -m utils.respondents responses/ -o countriesMBTI_16types.csv
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils import data
+
+CHUNK_ROWS = 250_000
+CHECKPOINT_DIR = os.path.join(data.CACHE_DIRNAME, "respondents")
+MANIFEST_NAME = "manifest.json"
+COUNTRY_COLUMN = "country"
+TYPE_COLUMN = "mbti"
+SUPPORTED_EXTENSIONS = (".csv", ".csv.gz", ".parquet", ".xlsx")
+N_TYPES = len(data.MBTI_TYPES)
+
+
+class CountryTypeCounts:
+    """국가 × 16유형 누적 응답 수 (국가는 처음 나온 순서대로 행이 늘어남)"""
+
+    def __init__(self):
+        self.countries = []
+        self.index = {}
+        self._counts = np.zeros((64, N_TYPES), dtype=np.int64)
+        self.rows = 0           # 읽은 응답 수
+        self.invalid = 0        # 국가가 비었거나 유형을 알 수 없어 버린 응답 수
+
+    @property
+    def counts(self):
+        return self._counts[:len(self.countries)]
+
+    def _rows_for(self, names):
+        """국가 이름들 -> 행 번호 (처음 보는 국가는 행을 추가, 용량은 두 배씩 늘림)"""
+        out = np.empty(len(names), dtype=np.int64)
+        for k, name in enumerate(names):
+            i = self.index.get(name)
+            if i is None:
+                i = self.index[name] = len(self.countries)
+                self.countries.append(sys.intern(name))
+            out[k] = i
+        if len(self.countries) > len(self._counts):
+            grown = np.zeros((max(len(self.countries), 2 * len(self._counts)), N_TYPES), dtype=np.int64)
+            grown[:len(self._counts)] = self._counts
+            self._counts = grown
+        return out
+
+    def add(self, countries, types):
+        """국가/유형 열(Series) 한 묶음을 더한다"""
+        country_codes, country_names = _categories(countries)
+        type_codes, type_names = _categories(types)
+        # 고유값(작음)만 정규화하고, 행 단위로는 코드 -> 행/열 번호 조회표만 쓴다 (-1 = 무효)
+        names = pd.Index(country_names.astype(str)).str.strip()
+        row_lut = np.full(len(names) + 1, -1, dtype=np.int64)
+        present = np.flatnonzero(names != "")
+        row_lut[present] = self._rows_for(names[present].tolist())
+        col_lut = np.append(type_index(type_names), -1)
+
+        rows, cols = row_lut[country_codes], col_lut[type_codes]
+        valid = (rows >= 0) & (cols >= 0)
+        n_valid = int(valid.sum())
+        self.rows += len(valid)
+        self.invalid += len(valid) - n_valid
+        if n_valid:
+            flat = rows[valid] * N_TYPES + cols[valid]
+            n = len(self.countries)
+            self._counts[:n] += np.bincount(flat, minlength=n * N_TYPES).reshape(n, N_TYPES)
+        return self
+
+    def merge(self, other):
+        if len(other.countries):
+            rows = self._rows_for(other.countries)
+            self._counts[rows] += other.counts
+        self.rows += other.rows
+        self.invalid += other.invalid
+        return self
+
+    def save(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, countries=np.asarray(self.countries, dtype=str), counts=self.counts,
+                 totals=np.array([self.rows, self.invalid], dtype=np.int64))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        out = cls()
+        with np.load(path) as f:
+            rows = out._rows_for(f["countries"].tolist())
+            out._counts[rows] += f["counts"]
+            out.rows, out.invalid = (int(v) for v in f["totals"])
+        return out
+
+
+def _categories(series):
+    """Series -> (행별 코드, 고유값) — 결측은 코드 -1 (조회표 마지막 칸)"""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype("category")
+    return series.cat.codes.to_numpy(), series.cat.categories
+
+
+def type_index(names):
+    """유형 문자열들 -> MBTI_TYPES 열 번호 (-1 = 알 수 없음). 대소문자/공백, -A/-T 접미사 허용"""
+    norm = pd.Index(names.astype(str)).str.strip().str.upper().str.replace(r"-[AT]$", "", regex=True)
+    return pd.Categorical(norm, categories=data.MBTI_TYPES).codes.astype(np.int64)
+
+
+# ------------------------------
+# 읽기
+# ------------------------------
+def _extension(path):
+    name = os.fspath(path).lower()
+    return next((ext for ext in SUPPORTED_EXTENSIONS if name.endswith(ext)), os.path.splitext(name)[1])
+
+
+def iter_chunks(path, country_col=COUNTRY_COLUMN, type_col=TYPE_COLUMN, chunk_rows=CHUNK_ROWS):
+    """응답 파일에서 두 열만 `chunk_rows` 행 안팎씩 읽어 DataFrame[country_col, type_col] 으로 낸다"""
+    import pyarrow as pa
+
+    ext = _extension(path)
+    columns = [country_col, type_col]
+    if ext in (".csv", ".csv.gz"):
+        import pyarrow.csv as pacsv
+
+        # 문자열 열을 사전 인코딩해 읽으면 pandas 로 넘길 때 곧바로 Categorical 이 된다
+        dict_type = pa.dictionary(pa.int32(), pa.string())
+        reader = pacsv.open_csv(
+            path,
+            read_options=pacsv.ReadOptions(block_size=64 * chunk_rows),
+            convert_options=pacsv.ConvertOptions(include_columns=columns,
+                                                 column_types={c: dict_type for c in columns}),
+        )
+        for batch in reader:
+            yield batch.to_pandas()
+    elif ext == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield pa.Table.from_batches([batch]).to_pandas()
+    elif ext == ".xlsx":
+        from utils import ingest
+
+        for chunk in ingest.iter_chunks(os.fspath(path), os.fspath(path)):
+            missing = [c for c in columns if c not in chunk.columns]
+            if missing:
+                raise ValueError(f"{path}: 필요한 열이 없습니다 ({', '.join(missing)})")
+            yield chunk[columns]
+    else:
+        raise ValueError(f"지원하지 않는 파일 형식입니다: {path} (가능: {', '.join(SUPPORTED_EXTENSIONS)})")
+
+
+def aggregate_stream(chunks, country_col=COUNTRY_COLUMN, type_col=TYPE_COLUMN, chunk_rows=CHUNK_ROWS):
+    """DataFrame 청크 또는 (국가, 유형) 튜플을 내는 반복자 -> CountryTypeCounts"""
+    counts = CountryTypeCounts()
+    it = iter(chunks)
+    for item in it:
+        if isinstance(item, pd.DataFrame):
+            counts.add(item[country_col], item[type_col])
+            continue
+        # 레코드 스트림: chunk_rows 개씩 모아 한 번에 센다
+        batch = list(itertools.chain([item], itertools.islice(it, chunk_rows - 1)))
+        frame = pd.DataFrame.from_records(batch, columns=[country_col, type_col])
+        counts.add(frame[country_col], frame[type_col])
+    return counts
+
+
+def count_file(path, country_col=COUNTRY_COLUMN, type_col=TYPE_COLUMN, chunk_rows=CHUNK_ROWS):
+    return aggregate_stream(iter_chunks(path, country_col, type_col, chunk_rows), country_col, type_col)
+
+
+# ------------------------------
+# 파일별 체크포인트
+# ------------------------------
+def _read_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(path, manifest):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def expand_paths(paths):
+    """파일/디렉터리 목록 -> 지원 형식 파일 경로 (디렉터리는 이름순)"""
+    out = []
+    for p in paths:
+        if os.path.isdir(p):
+            out.extend(os.path.join(p, name) for name in sorted(os.listdir(p))
+                       if _extension(name) in SUPPORTED_EXTENSIONS)
+        else:
+            out.append(os.fspath(p))
+    return out
+
+
+def aggregate_files(paths, checkpoint_dir=CHECKPOINT_DIR, country_col=COUNTRY_COLUMN, type_col=TYPE_COLUMN,
+                    chunk_rows=CHUNK_ROWS):
+    """파일들을 합산 -> (CountryTypeCounts, {"counted": [...], "reused": [...], "version": str})
+
+    stat(mtime, 크기)이 체크포인트 기록과 같으면 해시도 다시 계산하지 않고, 내용이 같은 파일은
+    (이름이 바뀌었어도) 체크포인트를 그대로 씁니다. 새 파일/바뀐 파일만 실제로 읽습니다.
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    manifest_path = os.path.join(checkpoint_dir, MANIFEST_NAME)
+    manifest = _read_manifest(manifest_path)
+    columns_key = f"{country_col}|{type_col}"
+    suffix = hashlib.sha1(columns_key.encode()).hexdigest()[:8]     # 같은 파일도 열 선택이 다르면 다른 체크포인트
+
+    total = CountryTypeCounts()
+    counted, reused, digests = [], [], []
+    for path in expand_paths(paths):
+        key = os.path.abspath(path)
+        mtime_ns, size = data.dataset_stamp(path)
+        entry = manifest.get(key)
+        if entry is None or (entry["mtime_ns"], entry["size"], entry["columns"]) != (mtime_ns, size, columns_key):
+            entry = {"mtime_ns": mtime_ns, "size": size, "columns": columns_key, "sha256": data.file_sha256(path)}
+        checkpoint = os.path.join(checkpoint_dir, f"{entry['sha256']}.{suffix}.npz")
+        if os.path.exists(checkpoint):
+            part = CountryTypeCounts.load(checkpoint)
+            reused.append(path)
+        else:
+            part = count_file(path, country_col, type_col, chunk_rows)
+            part.save(checkpoint)
+            counted.append(path)
+        manifest[key] = entry
+        digests.append(entry["sha256"])
+        total.merge(part)
+    _write_manifest(manifest_path, manifest)
+    version = hashlib.sha256("\n".join(sorted(digests) + [columns_key]).encode()).hexdigest()
+    return total, {"counted": counted, "reused": reused, "version": version}
+
+
+# ------------------------------
+# 출력
+# ------------------------------
+def proportions(counts, min_responses=1):
+    """-> (비율 float32 (국가, 16), 국가 튜플, 표본 수 int64) — 국가 이름순, 응답 min_responses 개 미만 국가 제외"""
+    n = counts.counts.sum(axis=1)
+    keep = [i for i in sorted(range(len(counts.countries)), key=counts.countries.__getitem__)
+            if n[i] >= max(min_responses, 1)]
+    sizes = n[keep]
+    values = (counts.counts[keep] / sizes[:, None]).astype(np.float32)
+    return values, tuple(counts.countries[i] for i in keep), sizes
+
+
+def to_dataset(counts, version, min_responses=1):
+    """페이지가 쓰는 MBTIDataset + 국가별 표본 수"""
+    values, countries, sizes = proportions(counts, min_responses)
+    values.setflags(write=False)
+    return data.MBTIDataset(values, countries, data.MBTI_TYPES, version), sizes
+
+
+def write_csv(counts, path, min_responses=1, decimals=6):
+    """countriesMBTI_16types.csv 형식 (Country, 16유형 비율) + Respondents 열로 저장"""
+    values, countries, sizes = proportions(counts, min_responses)
+    frame = pd.DataFrame(values.round(decimals), columns=list(data.MBTI_TYPES))
+    frame.insert(0, "Country", list(countries))
+    frame["Respondents"] = sizes
+    tmp = f"{path}.{os.getpid()}.tmp"
+    frame.to_csv(tmp, index=False, float_format=f"%.{decimals}f")
+    os.replace(tmp, path)
+    return frame
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="응답 파일 또는 디렉터리 (csv, csv.gz, parquet, xlsx)")
+    parser.add_argument("-o", "--output", default=data.DEFAULT_CSV)
+    parser.add_argument("--country-col", default=COUNTRY_COLUMN)
+    parser.add_argument("--type-col", default=TYPE_COLUMN)
+    parser.add_argument("--min-responses", type=int, default=1)
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR)
+    args = parser.parse_args()
+
+    counts, info = aggregate_files(args.paths, args.checkpoint_dir, args.country_col, args.type_col)
+    frame = write_csv(counts, args.output, args.min_responses)
+    print(f"새로 센 파일 {len(info['counted'])}개, 체크포인트 재사용 {len(info['reused'])}개")
+    print(f"응답 {counts.rows:,}건 (무효 {counts.invalid:,}건) -> 국가 {len(frame):,}개: {args.output}")
@@ -0,0 +1,234 @@
+"""프로세스 재시작 후에도 남는 디스크 결과 캐시 (SQLite, 내용 주소 방식).
+
+키는 (함수 이름, 함수 바이트코드 해시, 소스 솔트, 인자) 의 sha256 입니다. 캐시되는 함수는 대개
+utils 모듈을 부르는 얇은 래퍼라서, 솔트에 utils 패키지 전체와 함수가 정의된 파일의 소스 해시를 넣어
+도우미 모듈이 고쳐지면 이전 결과를 쓰지 않습니다. 데이터 버전(내용 해시)은 각 함수가
+이미 `version` 같은 인자로 받으므로 그대로 키에 들어가고, Streamlit 캐시처럼 `_` 로 시작하는 인자는
+키에서 뺍니다. 값은 pickle 로 `.cache/results.sqlite` 에 저장하며, 전체 크기가 한도를 넘으면
+마지막 사용 시각이 오래된 항목부터 지웁니다 (LRU).
+
+여러 워커 프로세스가 같은 파일을 쓰도록 WAL 모드 + busy timeout 을 쓰고, 쓰기는 BEGIN IMMEDIATE
+트랜잭션 하나로 삽입과 정리를 함께 합니다. 캐시 오류(읽기 전용 디스크, 손상 등)는 미스로 취급해
+페이지 동작에는 영향을 주지 않습니다.
+
+    @perf.cached(st.cache_data)       # 프로세스 안: 메모리
+    @resultcache.cached()             # 재시작 후: 디스크
+    def clean_data(_dataset, version, mode): ...
+
+환경변수 MBTI_RESULT_CACHE=0 으로 끄고, MBTI_RESULT_CACHE_MB 로 한도(MB)를 바꿉니다.
+"""
+
+import functools
+import glob
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from utils import perf
+from utils.data import CACHE_DIRNAME
+
+DB_PATH = os.path.join(CACHE_DIRNAME, "results.sqlite")
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+ENABLE_ENV = "MBTI_RESULT_CACHE"
+MAX_MB_ENV = "MBTI_RESULT_CACHE_MB"
+DEFAULT_MAX_MB = 256
+MAX_ITEM_FRACTION = 0.25    # 한도의 이 비율보다 큰 값은 저장하지 않음 (캐시 하나가 전체를 밀어내지 않도록)
+BUSY_TIMEOUT_S = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    value BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+def enabled():
+    return os.environ.get(ENABLE_ENV, "1") != "0"
+
+
+class ResultCache:
+    """SQLite 파일 하나를 공유하는 크기 제한 LRU 캐시 (스레드/프로세스별 연결)"""
+
+    def __init__(self, path=DB_PATH, max_bytes=None):
+        self.path = path
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(float(os.environ.get(MAX_MB_ENV, DEFAULT_MAX_MB)) * 1024 * 1024)
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        # fork 된 자식 프로세스는 부모의 연결을 쓰면 안 되므로 pid 가 바뀌면 새로 연다
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_S, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        """-> (적중 여부, 값)"""
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False, None
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+            return True, pickle.loads(row[0])
+        except (sqlite3.Error, OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return False, None
+
+    def put(self, key, name, value):
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return False
+        if len(blob) > self.max_bytes * MAX_ITEM_FRACTION:
+            return False
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                             (key, name, len(blob), now, now, blob))
+                self._evict(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except (sqlite3.Error, OSError):
+            return False
+        return True
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        victims, freed = [], 0
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def stats(self):
+        """-> {"entries": 항목 수, "bytes": 크기, "by_name": [(이름, 항목 수, 크기), ...]}"""
+        conn = self._connect()
+        count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        by_name = conn.execute(
+            "SELECT name, COUNT(*), SUM(size) FROM entries GROUP BY name ORDER BY SUM(size) DESC").fetchall()
+        return {"entries": count, "bytes": size, "by_name": by_name}
+
+    def clear(self):
+        self._connect().execute("DELETE FROM entries")
+
+
+_cache = ResultCache()
+
+
+def result_cache():
+    return _cache
+
+
+def code_hash(fn):
+    """함수 본문이 바뀌면 달라지는 해시 (바이트코드 + 상수, 중첩 함수 포함)"""
+    h = hashlib.sha256()
+
+    def feed(code):
+        h.update(code.co_code)
+        for const in code.co_consts:
+            if inspect.iscode(const):
+                feed(const)
+            else:
+                h.update(repr(const).encode("utf-8", "backslashreplace"))
+
+    feed(inspect.unwrap(fn).__code__)
+    return h.hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=256)
+def _file_hash(filename, mtime_ns, size):
+    try:
+        with open(filename, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+def source_salt(*filenames):
+    """utils 패키지 전체 + 주어진 파일의 소스 해시 (stat 이 같으면 다시 읽지 않음)"""
+    files = sorted(set(glob.glob(os.path.join(PACKAGE_DIR, "*.py"))) | {os.path.abspath(f) for f in filenames})
+    h = hashlib.sha256()
+    for filename in files:
+        try:
+            st_ = os.stat(filename)
+        except OSError:
+            continue
+        h.update(_file_hash(filename, st_.st_mtime_ns, st_.st_size).encode("ascii"))
+    return h.hexdigest()[:16]
+
+
+def make_key(name, fn_hash, signature, args, kwargs):
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    params = {k: v for k, v in bound.arguments.items() if not k.startswith("_")}
+    payload = json.dumps([name, fn_hash, params], sort_keys=True, ensure_ascii=False, default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached(name=None, cache=None):
+    """결과를 디스크 캐시에 두는 데코레이터 (키에 들어가는 인자는 값이 repr/JSON 으로 안정적이어야 함)"""
+    def wrap(fn):
+        label = name or fn.__qualname__
+        fn_hash = code_hash(fn)
+        fn_file = inspect.unwrap(fn).__code__.co_filename
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            store = cache or _cache
+            if not enabled():
+                return fn(*args, **kwargs)
+            key = make_key(label, f"{fn_hash}:{source_salt(fn_file)}", signature, args, kwargs)
+            with perf.span(f"디스크 캐시:{label}"):
+                hit, value = store.get(key)
+            perf.record_cache(f"disk:{label}", hit)
+            if hit:
+                return value
+            value = fn(*args, **kwargs)
+            store.put(key, label, value)
+            return value
+
+        return call
+
+    return wrap
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] == ["clear"]:
+        _cache.clear()
+        print(f"비움: {DB_PATH}")
+    else:
+        stats = _cache.stats()
+        print(f"{DB_PATH}: {stats['entries']:,}개, {stats['bytes'] / 1024 / 1024:,.1f} MB "
+              f"(한도 {_cache.max_bytes / 1024 / 1024:,.0f} MB)")
+        for label, count, size in stats["by_name"]:
+            print(f"  {label:<40} {count:>6,}개 {size / 1024:>10,.1f} KB")
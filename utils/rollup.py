@@ -0,0 +1,138 @@
+"""성향 축(E/I·S/N·T/F·J/P) 비율과 대륙/사용자 정의 지역 묶음 집계.
+
+- 축 비율: (국가 × 16) @ (16 × 8) 행렬 곱 한 번. 각 유형은 축마다 글자 하나에 속하므로
+  축의 두 값은 합이 행 합계와 같고, 행 합계로 나눠 0~1 비율로 만든다.
+- 지역 묶음: 지역 × 국가 희소 소속 행렬(행마다 가중치 합 1)과 [값 | 결측 아님] 을 한 번 곱해
+  모든 지역의 16유형 가중 평균을 구하고 (국가 행은 합 1 로 맞추고, 결측 칸은 가중치에서 제외),
+  축 비율은 그 결과에서 다시 계산.
+  가중치는 국가 단순 평균 또는 regions.csv 의 인구.
+
+scipy 가 있으면 소속 행렬을 CSR 희소 행렬로, 없으면 같은 값의 NumPy 배열로 만듭니다.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_REGIONS = "regions.csv"
+AXES = (("E", "I"), ("S", "N"), ("T", "F"), ("J", "P"))
+AXIS_LETTERS = tuple(letter for pair in AXES for letter in pair)
+VIEWS = ("types", "axes")
+GROUPINGS = ("country", "continent")
+WEIGHTINGS = ("equal", "population")
+UNASSIGNED = "기타"
+
+
+def axis_matrix(types):
+    """(유형 수 × 8) 0/1 행렬: 유형 j 가 축 글자 k 를 가지면 1"""
+    A = np.zeros((len(types), len(AXIS_LETTERS)), dtype=np.float64)
+    for j, t in enumerate(types):
+        for k, pair in enumerate(AXES):
+            if len(t) != len(AXES) or t[k] not in pair:
+                raise ValueError(f"알 수 없는 MBTI 유형: {t!r} (가능: 4글자 {'/'.join(''.join(p) for p in AXES)})")
+            A[j, 2 * k + pair.index(t[k])] = 1.0
+    return A
+
+
+def axis_shares(values, types):
+    """(행 × 16) 유형 비율 -> (행 × 8) 축 비율 (결측 유형은 0 으로 보고 남은 합으로 나눔)"""
+    V = np.nan_to_num(np.asarray(values, dtype=np.float64))
+    total = V.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (V @ axis_matrix(types)) / total
+
+
+def load_regions(path=DEFAULT_REGIONS):
+    """regions.csv -> DataFrame[Country, Continent, Population] (인구는 대략적인 2023년 추정치)"""
+    return pd.read_csv(path, dtype={"Country": str, "Continent": str, "Population": "float64"})
+
+
+def continent_of(regions=None):
+    """국가 -> 대륙 사전 (regions: load_regions() 결과)"""
+    if regions is None:
+        regions = load_regions()
+    return dict(zip(regions["Country"], regions["Continent"]))
+
+
+def region_names(countries, region_of):
+    """membership_matrix 와 같은 순서의 지역 이름 (행렬을 만들지 않고 목록만 필요할 때)"""
+    return tuple(sorted({region_of.get(c, UNASSIGNED) for c in countries}))
+
+
+def membership_matrix(countries, region_of, weights=None):
+    """국가 -> 지역 사전으로 (지역 이름, 지역 × 국가 소속 행렬) 을 만든다 (행마다 가중치 합 1)
+
+    사전에 없는 국가는 UNASSIGNED 지역으로, weights 가 NaN 인 국가는 알려진 가중치의 평균으로 둔다.
+    """
+    labels = [region_of.get(c, UNASSIGNED) for c in countries]
+    codes, names = pd.factorize(pd.Series(labels, dtype=object), sort=True)
+    if weights is None:
+        w = np.ones(len(countries))
+    else:
+        w = np.asarray(weights, dtype=np.float64)
+        known = np.isfinite(w) & (w > 0)
+        w = np.where(known, w, w[known].mean() if known.any() else 1.0)
+    w = w / np.bincount(codes, weights=w, minlength=len(names))[codes]
+    shape = (len(names), len(countries))
+    try:
+        from scipy import sparse
+    except ImportError:
+        M = np.zeros(shape)
+        M[codes, np.arange(len(countries))] = w
+    else:
+        M = sparse.csr_matrix((w, (codes, np.arange(len(countries)))), shape=shape)
+    return tuple(names), M
+
+
+@dataclass(frozen=True)
+class Rollup:
+    names: tuple            # 행 이름 (국가 또는 지역)
+    types: np.ndarray       # (행, 16) 유형 비율
+    axes: np.ndarray        # (행, 8) 축 비율
+    members: np.ndarray     # 행마다 묶인 국가 수
+
+    def view(self, kind, type_names):
+        """-> (값 행렬, 열 이름) : kind 는 VIEWS 중 하나"""
+        if kind == "types":
+            return self.types, tuple(type_names)
+        if kind == "axes":
+            return self.axes, AXIS_LETTERS
+        raise ValueError(f"알 수 없는 보기: {kind!r} (가능: {', '.join(VIEWS)})")
+
+
+def rollup(values, countries, types, region_of=None, weights=None):
+    """국가 행렬 -> Rollup. region_of 가 None 이면 국가 그대로 축 비율만 추가"""
+    values = np.asarray(values, dtype=np.float64)
+    if region_of is None:
+        return Rollup(tuple(countries), values, axis_shares(values, types), np.ones(len(countries), dtype=int))
+
+    names, M = membership_matrix(countries, region_of, weights)
+    # 합이 1 에서 크게 벗어난 행(원본 단위 오류 등)이 지역 평균을 끌고 가지 않도록 국가별로 합 1 로 맞춤
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = values / np.nansum(values, axis=1, keepdims=True)
+    present = ~np.isnan(values)
+    # [값 | 결측 아님 표시] 를 한 번에 곱해 가중합과 유효 가중치 합을 같이 얻는다
+    stacked = M @ np.hstack([np.where(present, values, 0.0), present])
+    m = values.shape[1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        region_values = stacked[:, :m] / stacked[:, m:]
+    members = np.asarray((M > 0).sum(axis=1)).ravel()
+    return Rollup(names, region_values, axis_shares(region_values, types), members)
+
+
+def rollup_by(values, countries, types, grouping="country", weighting="equal", regions=None):
+    """GROUPINGS/WEIGHTINGS 이름으로 Rollup 을 만든다 (regions: load_regions() 결과)"""
+    if grouping not in GROUPINGS:
+        raise ValueError(f"알 수 없는 묶음 단위: {grouping!r} (가능: {', '.join(GROUPINGS)})")
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"알 수 없는 가중 방식: {weighting!r} (가능: {', '.join(WEIGHTINGS)})")
+    if grouping == "country":
+        return rollup(values, countries, types)
+    if regions is None:
+        regions = load_regions()
+    region_of = continent_of(regions)
+    weights = None
+    if weighting == "population":
+        weights = regions.set_index("Country")["Population"].reindex(list(countries)).to_numpy()
+    return rollup(values, countries, types, region_of, weights)
@@ -0,0 +1,131 @@
+"""여행 일정 경로 계산: 하버사인 거리 행렬 + 일자별 군집 + 최근접 이웃/2-opt 순서.
+
+POI를 `days` 개 지리적 군집으로 나눈 뒤(일자별 방문지), 각 군집 안에서
+최근접 이웃으로 초기 경로를 만들고 2-opt로 교차 구간을 풀어 이동 거리를 줄입니다.
+거리 행렬은 군집 단위로만 만들기 때문에 POI 수천 개도 메모리 부담이 작습니다.
+"""
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from utils import reduction
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_TIME_BUDGET = 0.3   # 전체 2-opt 개선에 쓰는 최대 시간 (초), 일자 수로 나눠 사용
+
+
+@dataclass(frozen=True)
+class DayPlan:
+    day: int
+    stops: np.ndarray       # 방문 순서대로의 POI 인덱스
+    distance_km: float
+
+
+def _unit_vectors(lat, lon):
+    p, l = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(p) * np.cos(l), np.cos(p) * np.sin(l), np.sin(p)])
+
+
+def haversine_matrix(lat, lon, lat2=None, lon2=None):
+    """(n, m) 대원 거리 행렬 (km)
+
+    단위 벡터 사이 현(chord) 길이 c 에서 d = 2R·asin(c/2) 로 구하며 하버사인 공식과 같은 값이다.
+    삼각함수는 점마다 한 번만 계산하고 쌍별 연산은 행렬곱 하나로 끝난다.
+    """
+    U = _unit_vectors(np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64))
+    V = U if lat2 is None else _unit_vectors(np.asarray(lat2, dtype=np.float64), np.asarray(lon2, dtype=np.float64))
+    out = U @ V.T                       # 이후 연산은 임시 배열 없이 제자리에서
+    out *= -2.0
+    out += 2.0
+    np.clip(out, 0.0, 4.0, out=out)
+    np.sqrt(out, out=out)
+    out *= 0.5
+    np.arcsin(out, out=out)
+    out *= 2 * EARTH_RADIUS_KM
+    return out
+
+
+def cluster_days(lat, lon, days, seed=42):
+    """일자 수만큼 지리적 군집 (경도는 위도 보정한 평면 근사로 k-means)"""
+    k = max(1, min(days, len(lat)))
+    X = np.column_stack([lat, lon * np.cos(np.radians(np.mean(lat)))])
+    return reduction.kmeans(X, k, seed=seed, n_init=4)
+
+
+def nearest_neighbor_route(D, start=0):
+    n = len(D)
+    visited = np.zeros(n, dtype=bool)
+    route = np.empty(n, dtype=np.intp)
+    cur = start
+    for step in range(n):
+        route[step] = cur
+        visited[cur] = True
+        if step == n - 1:
+            break
+        d = np.where(visited, np.inf, D[cur])
+        cur = int(np.argmin(d))
+    return route
+
+
+def two_opt(route, D, max_sweeps=50, time_limit=None):
+    """열린 경로(시작점 고정) 2-opt, 각 i에 대해 모든 j의 개선량을 한 번에 계산
+
+    마지막 j는 뒤따르는 간선이 없으므로 (a,b)->(a,c) 교체 이득만 계산한다.
+    time_limit(초)을 넘기면 그때까지의 경로를 돌려준다.
+    """
+    r = np.array(route, dtype=np.intp)
+    n = len(r)
+    if n < 4:
+        return r
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    for _ in range(max_sweeps):
+        improved = False
+        for i in range(n - 2):
+            a, b = r[i], r[i + 1]
+            c, d = r[i + 2:], r[i + 3:]             # j = i+2 .. n-1 의 (route[j], route[j+1])
+            gain = D[a, c] - D[a, b]
+            gain[:-1] += D[b, d] - D[c[:-1], d]
+            j = int(gain.argmin())
+            if gain[j] < -1e-9:
+                r[i + 1:i + 3 + j] = r[i + 1:i + 3 + j][::-1]
+                improved = True
+            if deadline is not None and i % 64 == 0 and time.perf_counter() > deadline:
+                return r
+        if not improved:
+            break
+    return r
+
+
+def route_length(route, D):
+    return float(D[route[:-1], route[1:]].sum()) if len(route) > 1 else 0.0
+
+
+def plan_itinerary(lat, lon, days, start=None, seed=42, time_budget=DEFAULT_TIME_BUDGET):
+    """POI 좌표 -> 일자별 DayPlan 목록 (start: (lat, lon) 출발 기준점, 기본은 전체 중심)"""
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    if len(lat) == 0:
+        return [DayPlan(d + 1, np.empty(0, dtype=np.intp), 0.0) for d in range(days)]
+    if start is None:
+        start = (float(lat.mean()), float(lon.mean()))
+    labels = cluster_days(lat, lon, days, seed)
+
+    groups = []
+    for c in range(labels.max() + 1):
+        idx = np.flatnonzero(labels == c)
+        from_start = haversine_matrix(np.array([start[0]]), np.array([start[1]]), lat[idx], lon[idx])[0]
+        groups.append((from_start.min(), idx, from_start))
+    # 출발점에서 가까운 군집부터 1일차
+    groups.sort(key=lambda g: g[0])
+
+    plans = []
+    for day, (_, idx, from_start) in enumerate(groups, start=1):
+        D = haversine_matrix(lat[idx], lon[idx])
+        route = nearest_neighbor_route(D, start=int(np.argmin(from_start)))
+        route = two_opt(route, D, time_limit=None if time_budget is None else time_budget / len(groups))
+        plans.append(DayPlan(day, idx[route], route_length(route, D)))
+    for day in range(len(plans) + 1, days + 1):
+        plans.append(DayPlan(day, np.empty(0, dtype=np.intp), 0.0))
+    return plans
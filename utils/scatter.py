@@ -0,0 +1,102 @@
+"""대용량 산점도 백엔드: 닫힌 형식 OLS + 밀도/표본 렌더링.
+
+추세선(기울기, 절편, R²)은 statsmodels 없이 NumPy로 전체 데이터에서 한 번 계산하고,
+점을 그대로 보내기엔 행이 너무 많으면 서버에서 2D 히스토그램으로 집계하거나
+x 구간별 층화 표본만 보내서 브라우저 부담을 행 수와 무관하게 유지합니다.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import plotly.graph_objects as go
+
+MODES = ("points", "density", "sample")
+POINT_LIMIT = 50_000        # 이 행 수를 넘으면 자동으로 밀도 모드
+SAMPLE_SIZE = 20_000
+DENSITY_BINS = 120
+_STRATA = 20
+
+
+@dataclass(frozen=True)
+class OLSFit:
+    slope: float
+    intercept: float
+    r2: float
+    n: int
+
+
+def _paired(x, y):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = ~(np.isnan(x) | np.isnan(y))
+    return x[ok], y[ok]
+
+
+def ols_fit(x, y):
+    """y = slope * x + intercept (결측 쌍 제외)"""
+    x, y = _paired(x, y)
+    n = len(x)
+    if n < 2:
+        return OLSFit(np.nan, np.nan, np.nan, n)
+    mx, my = x.mean(), y.mean()
+    dx, dy = x - mx, y - my
+    sxx, syy, sxy = dx @ dx, dy @ dy, dx @ dy
+    if sxx == 0:
+        return OLSFit(np.nan, np.nan, np.nan, n)
+    slope = sxy / sxx
+    r2 = sxy * sxy / (sxx * syy) if syy > 0 else np.nan
+    return OLSFit(float(slope), float(my - slope * mx), float(r2), n)
+
+
+def choose_mode(n_rows, limit=POINT_LIMIT):
+    return "points" if n_rows <= limit else "density"
+
+
+def stratified_sample(x, size=SAMPLE_SIZE, strata=_STRATA, seed=0):
+    """x 분위 구간마다 비슷한 개수를 뽑은 행 인덱스 (분포 꼬리가 사라지지 않도록)"""
+    n = len(x)
+    if n <= size:
+        return np.arange(n)
+    rng = np.random.default_rng(seed)
+    edges = np.quantile(x, np.linspace(0, 1, strata + 1)[1:-1])
+    stratum = np.searchsorted(edges, x, side="right")
+    counts = np.bincount(stratum, minlength=strata)
+    # 구간별 채택 확률 (구간당 size / strata 개 기대), 정렬 없이 O(n)
+    prob = np.minimum(1.0, (size / strata) / np.maximum(counts, 1))
+    return np.flatnonzero(rng.random(n) < prob[stratum])
+
+
+def _trend_trace(x, fit, line_color):
+    lo, hi = np.nanmin(x), np.nanmax(x)
+    return go.Scatter(
+        x=[lo, hi], y=[fit.intercept + fit.slope * lo, fit.intercept + fit.slope * hi],
+        mode="lines", line=dict(color=line_color), name="OLS trendline",
+        hovertemplate=f"y = {fit.slope:.4g}x + {fit.intercept:.4g}<br>R² = {fit.r2:.4f}<extra></extra>",
+    )
+
+
+def scatter_figure(x, y, x_name, y_name, fit, mode, point_color, line_color, title=None):
+    """mode: points(전체 점) / density(2D 히스토그램) / sample(층화 표본), 추세선은 항상 전체 데이터 기준"""
+    x, y = _paired(x, y)
+    if mode == "density":
+        counts, xe, ye = np.histogram2d(x, y, bins=DENSITY_BINS)
+        z = np.where(counts > 0, counts, np.nan).T
+        data = go.Heatmap(
+            x=(xe[:-1] + xe[1:]) / 2, y=(ye[:-1] + ye[1:]) / 2, z=z,
+            colorscale=[[0, "#f7f7f7"], [1, point_color]], colorbar=dict(title="개수"),
+            hovertemplate=f"{x_name}: %{{x}}<br>{y_name}: %{{y}}<br>개수: %{{z}}<extra></extra>",
+        )
+    elif mode in ("points", "sample"):
+        idx = stratified_sample(x) if mode == "sample" else slice(None)
+        data = go.Scattergl(
+            x=x[idx], y=y[idx], mode="markers", name="",
+            marker=dict(size=10, color=point_color, opacity=0.7),
+        )
+    else:
+        raise ValueError(f"알 수 없는 산점도 방식: {mode!r} (가능: {', '.join(MODES)})")
+
+    fig = go.Figure([data])
+    if not np.isnan(fit.slope):
+        fig.add_trace(_trend_trace(x, fit, line_color))
+    fig.update_layout(title=title, xaxis_title=x_name, yaxis_title=y_name, showlegend=False)
+    return fig
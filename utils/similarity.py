@@ -0,0 +1,153 @@
+"""국가 MBTI 프로필 최근접 이웃 인덱스.
+
+16유형 프로필 행렬에 대해 유클리드/코사인/Jensen-Shannon 거리를 벡터 연산으로 계산하고
+`query(name, k)` 로 가장 비슷한 k개를 돌려줍니다.
+
+- 행 수가 `DENSE_LIMIT` 이하: 전체 거리 행렬과 행별 상위 이웃을 미리 계산해 조회는 배열 인덱싱
+- 그보다 크면: scipy가 있으면 KD-트리 (코사인은 단위 벡터, JS는 sqrt(p) 공간에서 후보를 뽑아
+  정확한 JS 거리로 재정렬), 없으면 한 행 대 전체 벡터 연산
+"""
+
+import numpy as np
+import pandas as pd
+
+METRICS = ("euclidean", "cosine", "jensenshannon")
+DENSE_LIMIT = 4096
+PRECOMPUTED_K = 50
+JS_CANDIDATE_FACTOR = 8
+_BLOCK_ROWS = 1024
+
+
+def _as_probabilities(X):
+    X = np.clip(np.nan_to_num(X, nan=0.0), 0.0, None)
+    s = X.sum(axis=1, keepdims=True)
+    s[s == 0] = 1.0
+    return X / s
+
+
+def _unit_rows(X):
+    X = np.nan_to_num(X, nan=0.0)
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return X / norms
+
+
+def _euclidean(A, B):
+    d2 = (A ** 2).sum(1)[:, None] - 2 * A @ B.T + (B ** 2).sum(1)[None, :]
+    return np.sqrt(np.clip(d2, 0.0, None))
+
+
+def _jensenshannon(P, Q):
+    """JS 거리 (밑 2, sqrt(divergence)), P: (a, m) Q: (b, m) -> (a, b)"""
+    def plogp(x):
+        return np.where(x > 0, x * np.log2(np.where(x > 0, x, 1.0)), 0.0)
+    M = 0.5 * (P[:, None, :] + Q[None, :, :])
+    h_m = plogp(M).sum(axis=2)
+    h_p = plogp(P).sum(axis=1)[:, None]
+    h_q = plogp(Q).sum(axis=1)[None, :]
+    js = np.clip(h_p / 2 + h_q / 2 - h_m, 0.0, None)
+    return np.sqrt(js)
+
+
+def prepare(values, metric):
+    """거리 계산에 맞게 행렬을 미리 변환 (cosine: 단위 벡터, JS: 확률 분포)"""
+    if metric not in METRICS:
+        raise ValueError(f"알 수 없는 거리: {metric!r} (가능: {', '.join(METRICS)})")
+    X = np.asarray(values, dtype=np.float64)
+    if metric == "cosine":
+        return _unit_rows(X)
+    if metric == "jensenshannon":
+        return _as_probabilities(X)
+    return np.nan_to_num(X, nan=0.0)
+
+
+def distances(A, B, metric):
+    """전처리된 A, B 사이 거리 행렬 (블록 단위로 메모리 제한)"""
+    out = np.empty((len(A), len(B)), dtype=np.float32)
+    for start in range(0, len(A), _BLOCK_ROWS):
+        a = A[start:start + _BLOCK_ROWS]
+        if metric == "euclidean":
+            out[start:start + len(a)] = _euclidean(a, B)
+        elif metric == "cosine":
+            out[start:start + len(a)] = np.clip(1.0 - a @ B.T, 0.0, 2.0)
+        else:
+            # (a, b, m) 중간 배열이 커지지 않도록 열 방향도 나눔
+            step = max(1, _BLOCK_ROWS * 64 // max(len(a), 1))
+            for j in range(0, len(B), step):
+                out[start:start + len(a), j:j + step] = _jensenshannon(a, B[j:j + step])
+    return out
+
+
+def pairwise(values, metric="euclidean"):
+    X = prepare(values, metric)
+    return distances(X, X, metric)
+
+
+class SimilarityIndex:
+    def __init__(self, values, labels, metric="euclidean"):
+        self.metric = metric
+        self.labels = np.asarray(labels, dtype=object)
+        self.label_index = {name: i for i, name in enumerate(self.labels)}
+        self._X = prepare(values, metric)
+        n = len(self._X)
+        self.dense = n <= DENSE_LIMIT
+        self._tree = None
+        if self.dense:
+            self.matrix = distances(self._X, self._X, metric)
+            np.fill_diagonal(self.matrix, np.inf)
+            k = min(PRECOMPUTED_K, n - 1)
+            if k > 0:
+                part = np.argpartition(self.matrix, k - 1, axis=1)[:, :k]
+                rows = np.arange(n)[:, None]
+                order = np.argsort(self.matrix[rows, part], axis=1, kind="stable")
+                self.neighbors = part[rows, order]
+            else:
+                self.neighbors = np.empty((n, 0), dtype=np.intp)
+        else:
+            self.matrix = None
+            try:
+                from scipy.spatial import cKDTree
+            except ImportError:
+                cKDTree = None
+            if cKDTree is not None:
+                # JS 거리는 트리로 바로 쓸 수 없어 Hellinger(sqrt(p)) 공간에서 후보를 찾는다
+                self._tree = cKDTree(np.sqrt(self._X) if metric == "jensenshannon" else self._X)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _query_index(self, i, k):
+        if self.dense and k <= self.neighbors.shape[1]:
+            idx = self.neighbors[i, :k]
+            return idx, self.matrix[i, idx]
+        if self._tree is not None and self.metric == "jensenshannon":
+            n_cand = min(k * JS_CANDIDATE_FACTOR + 1, len(self._X))
+            _, cand = self._tree.query(np.sqrt(self._X[i]), k=n_cand)
+            cand = cand[cand != i]
+            dist = _jensenshannon(self._X[i:i + 1], self._X[cand])[0]
+            order = np.argsort(dist, kind="stable")[:k]
+            return cand[order], dist[order]
+        if self._tree is not None:
+            dist, idx = self._tree.query(self._X[i], k=k + 1)
+            keep = idx != i
+            idx, dist = idx[keep][:k], dist[keep][:k]
+            if self.metric == "cosine":
+                # 단위 벡터 사이 유클리드 거리 d -> 코사인 거리 d^2 / 2
+                dist = dist ** 2 / 2
+            return idx, dist
+        row = self.matrix[i] if self.dense else distances(self._X[i:i + 1], self._X, self.metric)[0]
+        row = row.copy()
+        row[i] = np.inf
+        k = min(k, len(row) - 1)
+        idx = np.argpartition(row, k - 1)[:k] if k > 0 else np.empty(0, dtype=np.intp)
+        idx = idx[np.argsort(row[idx], kind="stable")]
+        return idx, row[idx]
+
+    def query(self, label, k=5):
+        """label과 가장 가까운 k개 -> DataFrame[순위, Country, 거리]"""
+        idx, dist = self._query_index(self.label_index[label], k)
+        return pd.DataFrame({
+            "순위": np.arange(1, len(idx) + 1),
+            "Country": self.labels[idx],
+            "거리": np.asarray(dist, dtype=float),
+        })
@@ -0,0 +1,40 @@
+"""CPU 작업용 공유 스레드 풀 (켄달 행렬, 부트스트랩).
+
+Streamlit 서버는 스레드가 여러 개인 프로세스라 fork 로 자식을 만들면 다른 스레드가 쥐고 있던 락을
+물려받아 자식이 멈출 수 있고, 스크립트 실행 중에는 `__main__` 이 페이지 스크립트로 바뀌어 있어
+spawn/forkserver 자식은 페이지를 다시 실행하려 합니다. 그래서 프로세스 대신, 무거운 부분이 GIL 을
+놓는 NumPy/BLAS·scipy 커널이라는 점을 이용해 프로세스당 하나인 스레드 풀을 처음 쓸 때 만들어
+재사용합니다 (배열 복사/직렬화 없음).
+워커 수는 환경변수 MBTI_WORKERS 로 정하며, 기본은 CPU 수 (최대 MAX_WORKERS) 입니다.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+WORKERS_ENV = "MBTI_WORKERS"
+MAX_WORKERS = 8
+
+_lock = threading.Lock()
+_pool = None
+
+
+def max_workers():
+    try:
+        n = int(os.environ.get(WORKERS_ENV, "0"))
+    except ValueError:
+        n = 0
+    return max(1, n or min(os.cpu_count() or 1, MAX_WORKERS))
+
+
+def shared_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max_workers(), thread_name_prefix="mbti-worker")
+        return _pool
+
+
+def map_jobs(fn, jobs):
+    """jobs 를 공유 풀에서 실행한 결과 목록 (입력 순서 유지)"""
+    return list(shared_pool().map(fn, jobs))